@@ -0,0 +1,46 @@
+"""
+Compare per-task and batched allocation on a large task wave.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_allocation
+"""
+import random
+import time
+
+from models.event_manager import EventManager
+from models.graph_builder import GraphBuilder
+from models.task_allocator import TaskAllocator
+
+
+def build(num_users, num_enterprises, tasks_per_enterprise, seed=0):
+    builder = GraphBuilder()
+    builder.create_random_graph(num_users, num_enterprises, connection_probability=0.01, seed=seed)
+    graph = builder.get_graph()
+    rng = random.Random(seed)
+    for node, data in graph.nodes(data=True):
+        if data["type"] == "enterprise":
+            for _ in range(tasks_per_enterprise):
+                data["data"].create_task(rng.uniform(1e10, 5e11), rng.uniform(5, 50))
+    return graph
+
+
+def main(num_users=10_000, num_enterprises=100, tasks_per_enterprise=1_000):
+    num_tasks = num_enterprises * tasks_per_enterprise
+    for strategy in ("shortest_queue", "earliest_finish"):
+        for batched in (False, True):
+            graph = build(num_users, num_enterprises, tasks_per_enterprise)
+            allocator = TaskAllocator(graph, EventManager(), verbose=False, strategy=strategy)
+            start = time.perf_counter()
+            if batched:
+                allocator.allocate_batch(d=3)
+            else:
+                allocator.allocate_tasks(d=3)
+            elapsed = time.perf_counter() - start
+            makespan = max(user.free_at for user in allocator.users)
+            print(f"{strategy:>15} {'batch' if batched else 'per-task':>9}: {num_tasks} tasks in "
+                  f"{elapsed:6.2f}s ({num_tasks / elapsed:>9,.0f} tasks/s), projected makespan {makespan:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark the headless SimulationEngine event loop.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_engine
+"""
+import random
+
+from models.event_manager import EventManager
+from models.graph_builder import GraphBuilder
+from simulation.engine import SimulationEngine
+
+
+SIZES = [100_000, 1_000_000]
+
+
+def build_timeline(graph, num_events, seed=0):
+    """
+    Build a synthetic timeline alternating transmissions and calculations.
+
+    :param graph: Graph whose user nodes the events refer to.
+    :param num_events: Number of events to generate.
+    :param seed: Seed for event timestamps and endpoints.
+    :return: EventManager preloaded with the timeline.
+    """
+    rng = random.Random(seed)
+    users = [n for n, d in graph.nodes(data=True) if d["type"] == "user"]
+    events = []
+    for i in range(num_events):
+        t = rng.uniform(0, 3600)
+        if i % 2:
+            events.append({"time": t, "type": "calculation", "node": rng.choice(users)})
+        else:
+            from_node, to_node = rng.sample(users, 2)
+            events.append({
+                "time": t, "type": "data_transmission", "from_node": from_node,
+                "to_node": to_node, "size": 10.0, "edge": (from_node, to_node),
+            })
+    event_manager = EventManager()
+    event_manager.add_events_bulk(events)
+    return event_manager
+
+
+def main():
+    builder = GraphBuilder()
+    builder.create_empty_graph(100, 10)
+    graph = builder.get_graph()
+
+    for size in SIZES:
+        event_manager = build_timeline(graph, size)
+        result = SimulationEngine(graph, event_manager).run_to_completion()
+        print(f"{size:>10} events: {result.events_per_second:>12,.0f} events/s "
+              f"({result.events_per_second * 60 / 1e6:.1f}M events/min)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark writing and memory-mapping event traces.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_event_log
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from models.records import Event
+from simulation.event_log import EventLog, EventLogWriter
+
+
+SIZES = [1_000_000, 10_000_000]
+NUM_NODES = 10_000
+
+
+def make_events(num_events, seed=0):
+    rng = np.random.default_rng(seed)
+    times = np.sort(rng.uniform(0, num_events / 100, num_events)).tolist()
+    nodes = [f"user_{i}" for i in range(NUM_NODES)]
+    picks = rng.integers(0, NUM_NODES, (num_events, 2)).tolist()
+    for t, (a, b) in zip(times, picks):
+        yield Event(t, "data_transmission", from_node=nodes[a], to_node=nodes[b], size=10.0,
+                    edge=(nodes[a], nodes[b]), start=t - 0.5)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        for num_events in SIZES:
+            path = os.path.join(directory, f"trace_{num_events}.npy")
+            start = time.perf_counter()
+            with EventLogWriter(path) as writer:
+                for event in make_events(num_events):
+                    writer.observe(event)
+            write_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            log = EventLog.open(path)
+            open_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            index = log.seek(float(log.column("time")[num_events // 2]))
+            window = list(log.events(index, index + 1000))
+            seek_time = time.perf_counter() - start
+
+            print(f"{num_events:>10} events: generate + write {write_time:6.2f}s, "
+                  f"{os.path.getsize(path) / num_events:.0f} B/event, open {open_time * 1000:6.2f}ms, "
+                  f"seek + decode {len(window)} events {seek_time * 1000:6.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark the EventManager timeline at increasing sizes.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_event_manager
+"""
+import random
+import time
+
+from models.event_manager import EventManager
+
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def bench(num_events, seed=0):
+    """
+    Measure insert, bulk-load and drain throughput for a timeline.
+
+    :param num_events: Number of events to push through the timeline.
+    :param seed: Seed for the random timestamps.
+    :return: Dict of events per second for each phase.
+    """
+    rng = random.Random(seed)
+    times = [rng.uniform(0, 1000) for _ in range(num_events)]
+
+    manager = EventManager()
+
+    def insert():
+        for t in times:
+            manager.add_event(t, "calculation", node="user_0")
+
+    def drain():
+        while manager.get_next_event() is not None:
+            pass
+
+    insert_time = _timed(insert)
+    drain_time = _timed(drain)
+
+    bulk_manager = EventManager()
+    events = [{"time": t, "type": "calculation", "node": "user_0"} for t in times]
+    bulk_time = _timed(lambda: bulk_manager.add_events_bulk(events))
+
+    return {
+        "insert": num_events / insert_time,
+        "bulk_load": num_events / bulk_time,
+        "drain": num_events / drain_time,
+    }
+
+
+def main():
+    print(f"{'events':>10} {'insert/s':>14} {'bulk_load/s':>14} {'drain/s':>14}")
+    for size in SIZES:
+        rates = bench(size)
+        print(f"{size:>10} {rates['insert']:>14,.0f} {rates['bulk_load']:>14,.0f} {rates['drain']:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
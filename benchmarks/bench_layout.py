@@ -0,0 +1,50 @@
+"""
+Benchmark the deterministic node layout against spring_layout.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_layout
+"""
+import tempfile
+import time
+
+import networkx as nx
+
+from models.graph_builder import GraphBuilder
+from simulation.layout import compute_layout, fixed_layout
+
+
+CASES = [
+    # (num_users, num_enterprises, connection_probability)
+    (1_000, 10, 0.05),
+    (100_000, 100, 0.001),
+]
+SPRING_LAYOUT_LIMIT = 2_000  # spring_layout is too slow to time beyond this
+
+
+def main():
+    for num_users, num_enterprises, probability in CASES:
+        builder = GraphBuilder(columnar=True)
+        builder.create_random_graph(num_users, num_enterprises, probability, seed=0)
+        graph = builder.get_graph()
+
+        for cluster in (False, True):
+            start = time.perf_counter()
+            compute_layout(graph, seed=0, cluster=cluster)
+            elapsed = time.perf_counter() - start
+            print(f"{graph.number_of_nodes():>7} nodes, cluster={cluster!s:<5}: computed in {elapsed:6.3f}s")
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            fixed_layout(graph, seed=0, cache_dir=cache_dir)
+            start = time.perf_counter()
+            fixed_layout(graph, seed=0, cache_dir=cache_dir)
+            print(f"{graph.number_of_nodes():>7} nodes, cached:      loaded in {time.perf_counter() - start:6.3f}s")
+
+        if graph.number_of_nodes() <= SPRING_LAYOUT_LIMIT:
+            start = time.perf_counter()
+            nx.spring_layout(graph, seed=0)
+            print(f"{graph.number_of_nodes():>7} nodes, spring_layout: {time.perf_counter() - start:6.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Compare the memory footprint of dict events with slotted Event records.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_records
+"""
+import tracemalloc
+
+from models.records import Event, SubTask, Task
+
+
+NUM_EVENTS = 200_000
+
+
+def measure(factory):
+    """
+    :param factory: Callable building one event from an integer index.
+    :return: Bytes allocated per event.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    events = [factory(i) for i in range(NUM_EVENTS)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del events
+    return (after - before) / NUM_EVENTS
+
+
+def dict_event(i):
+    task = {"complexity": 1e11, "data_size": 20.0, "completed": False}
+    return {
+        "time": float(i), "type": "calculation", "node": "user_1",
+        "task": {"portion": 3e10, "total_task": task}, "edge": ("user_0", "user_1"),
+    }
+
+
+def record_event(i):
+    task = Task(i, 1e11, 20.0)
+    return Event(float(i), "calculation", node="user_1",
+                 task=SubTask(3e10, 20.0, 0.5, task), edge=("user_0", "user_1"))
+
+
+def main():
+    dict_bytes = measure(dict_event)
+    record_bytes = measure(record_event)
+    print(f"dict events:   {dict_bytes:7.0f} bytes/event")
+    print(f"Event records: {record_bytes:7.0f} bytes/event ({dict_bytes / record_bytes:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Compare live chain execution with and without work stealing.
+
+Tasks arrive as a Poisson stream faster than the users can serve them and
+are placed on arrival, so some queues build up behind slow transfers while
+other users run dry. With stealing, a user that finds its queue empty takes
+a waiting subtask from a backlogged user whenever shipping the input over
+still finishes it earlier.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_work_stealing
+"""
+import random
+import time
+
+import numpy as np
+
+from models.event_manager import EventManager
+from models.graph_builder import GraphBuilder
+from models.task_allocator import TaskAllocator
+from simulation.arrivals import TaskArrivalProcess, poisson_task_source
+from simulation.chain_executor import ChainExecutor
+from simulation.engine import SimulationEngine
+from simulation.trace import TaskTrace
+
+
+def run(num_users, num_enterprises, connection_probability, rate, horizon, work_stealing):
+    builder = GraphBuilder()
+    builder.create_random_graph(num_users, num_enterprises, connection_probability, seed=1)
+    graph = builder.get_graph()
+
+    random.seed(0)
+    event_manager = EventManager()
+    engine = SimulationEngine(graph, event_manager)
+    executor = ChainExecutor(graph, event_manager, contention=False, work_stealing=work_stealing)
+    executor.attach(engine)
+    allocator = TaskAllocator(graph, event_manager, verbose=False, executor=executor)
+    enterprises = [node for node, data in graph.nodes(data=True) if data["type"] == "enterprise"]
+    sources = {enterprise: poisson_task_source(rate, seed=i + 1, horizon=horizon)
+               for i, enterprise in enumerate(enterprises)}
+    TaskArrivalProcess(graph, event_manager, allocator, sources).attach(engine)
+    trace = TaskTrace()
+    engine.add_observer(trace.observe)
+
+    start = time.perf_counter()
+    result = engine.run_to_completion()
+    return result, trace, executor, time.perf_counter() - start
+
+
+def main(horizon=100.0):
+    scenarios = [("30 users", 30, 2, 0.3, 2.0), ("300 users", 300, 10, 0.01, 12.0)]
+    for label, num_users, num_enterprises, connection_probability, rate in scenarios:
+        baseline = None
+        for work_stealing in (False, True):
+            result, trace, executor, elapsed = run(num_users, num_enterprises, connection_probability,
+                                                   rate, horizon, work_stealing)
+            baseline = baseline or result.final_time
+            latencies = trace.latencies()
+            print(f"{label:>9} stealing={'on' if work_stealing else 'off':>3}: {result.completed_tasks} tasks, "
+                  f"makespan {result.final_time:6.1f}s ({result.final_time / baseline:4.2f}x), "
+                  f"latency mean {latencies.mean():6.1f}s p99 {np.percentile(latencies, 99):6.1f}s, "
+                  f"{executor.steals} steals moving {executor.stolen_mb:.0f} MB ({elapsed:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,14 +11,13 @@ def generate_tasks(graph, num_tasks_per_enterprise):
     :param graph: The graph representing the network.
     :param num_tasks_per_enterprise: Number of tasks to generate for each enterprise.
     """
-    for node, data in graph.nodes(data=True):
+    for _, data in graph.nodes(data=True):
         if data["type"] == "enterprise":
             enterprise_node = data["data"]
             for _ in range(num_tasks_per_enterprise):
                 complexity = random.uniform(1e10, 5e11)  # Reduced FLOPS
                 data_size = random.uniform(5, 50)  # Reduced MB
                 enterprise_node.create_task(complexity, data_size)
-                print(f"Task created for {node}: {complexity:.2e} FLOPS, {data_size:.2f} MB")
 
 
 
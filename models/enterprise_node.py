@@ -1,12 +1,72 @@
+from array import array
+from bisect import insort
+from heapq import merge
+from operator import attrgetter
+from models.records import Task
+
+_task_id = attrgetter("id")
+
+
+class CompletedTaskArchive:
+    """
+    Compact column store for completed tasks.
+
+    Keeps only the numeric fields of each task in typed arrays, so finished
+    work costs a few bytes per task instead of a live dict. Times a TaskTrace
+    did not fill in are stored as 0.
+    """
+    FIELDS = {"id": "q", "complexity": "d", "data_size": "d", "gpu_time": "d", "transmission_time": "d"}
+
+    def __init__(self):
+        self.columns = {name: array(typecode) for name, typecode in self.FIELDS.items()}
+
+    def __len__(self):
+        return len(self.columns["id"])
+
+    def append(self, task):
+        """
+        Archive a completed task.
+
+        :param task: The completed task.
+        """
+        for name, column in self.columns.items():
+            column.append(task.get(name, 0))
+
+
 class EnterpriseNode:
-    def __init__(self, node_id):
+    __slots__ = ("node_id", "pending", "completed", "completed_count", "archive", "_next_task_id")
+
+    def __init__(self, node_id, archive_completed=False):
         """
         Initialize the enterprise node.
 
         :param node_id: Unique identifier for the enterprise node.
+        :param archive_completed: Move completed tasks into a compact CompletedTaskArchive
+            instead of keeping them as live dicts.
         """
         self.node_id = node_id
-        self.task_queue = []
+        self.pending = {}  # Task id -> pending task, in creation order
+        self.completed = []  # Completed tasks in creation order, when they are not archived
+        self.completed_count = 0
+        self.archive = CompletedTaskArchive() if archive_completed else None
+        self._next_task_id = 0
+
+    @property
+    def pending_count(self):
+        """
+        Number of pending tasks, in O(1).
+        """
+        return len(self.pending)
+
+    @property
+    def task_queue(self):
+        """
+        All live tasks (pending and non-archived completed) in creation order.
+
+        Both sources are already in creation order, so this is a linear merge.
+        Kept for compatibility; prefer pending, completed and pending_count.
+        """
+        return list(merge(self.completed, self.pending.values(), key=_task_id))
 
     def create_task(self, complexity, data_size):
         """
@@ -14,13 +74,12 @@ class EnterpriseNode:
 
         :param complexity: Computational complexity of the task in FLOPS.
         :param data_size: Data size associated with the task in MB.
+        :return: The created task.
         """
-        task = {
-            "complexity": complexity,
-            "data_size": data_size,
-            "completed": False
-        }
-        self.task_queue.append(task)
+        task = Task(self._next_task_id, complexity, data_size)
+        self._next_task_id += 1
+        self.pending[task.id] = task
+        return task
 
     def get_pending_tasks(self):
         """
@@ -28,7 +87,7 @@ class EnterpriseNode:
 
         :return: List of pending tasks.
         """
-        return [task for task in self.task_queue if not task["completed"]]
+        return list(self.pending.values())
 
     def mark_task_completed(self, task):
         """
@@ -36,7 +95,15 @@ class EnterpriseNode:
 
         :param task: The task to mark as completed.
         """
+        if task["completed"]:
+            return
         task["completed"] = True
+        self.pending.pop(task["id"], None)
+        self.completed_count += 1
+        if self.archive is not None:
+            self.archive.append(task)
+        else:
+            insort(self.completed, task, key=_task_id)  # Tasks mostly return in order, so this appends
 
     def __repr__(self):
-        return f"EnterpriseNode({self.node_id}, Pending Tasks: {len(self.get_pending_tasks())})"
+        return f"EnterpriseNode({self.node_id}, Pending Tasks: {self.pending_count})"
@@ -1,9 +1,22 @@
+import heapq
+import itertools
+from models.records import Event
+
+
 class EventManager:
     """
     Manages a global timeline of events during the simulation.
+
+    Events are stored in a binary heap keyed on ``(time, sequence)``, so adding
+    and removing an event costs O(log n) and events that share a timestamp come
+    out in the order they were added.
     """
     def __init__(self):
-        self.events = []
+        self.events = []  # Heap of (time, sequence, event) entries
+        self._sequence = itertools.count()
+
+    def __len__(self):
+        return len(self.events)
 
     def add_event(self, time, event_type, **kwargs):
         """
@@ -12,9 +25,41 @@ class EventManager:
         :param time: Timestamp of the event.
         :param event_type: Type of event ('data_transmission', 'calculation', etc.).
         :param kwargs: Additional data for the event.
+        :return: The event that was added.
+        """
+        event = Event(time, event_type, **kwargs)
+        heapq.heappush(self.events, (time, next(self._sequence), event))
+        return event
+
+    def add_events_bulk(self, events):
         """
-        self.events.append({"time": time, "type": event_type, **kwargs})
-        self.events.sort(key=lambda e: e["time"])  # Keep events sorted by time
+        Add many events to the timeline at once.
+
+        Large batches are appended and the heap is rebuilt in O(n), which is
+        much cheaper than pushing events one by one when preloading a timeline.
+
+        :param events: Iterable of Event objects or dicts with "time" and "type" keys.
+        """
+        entries = [
+            (event.time, next(self._sequence), event)
+            for event in (e if isinstance(e, Event) else Event.from_dict(e) for e in events)
+        ]
+        if len(entries) * 4 < len(self.events):
+            for entry in entries:
+                heapq.heappush(self.events, entry)
+        else:
+            self.events.extend(entries)
+            heapq.heapify(self.events)
+
+    def peek(self):
+        """
+        Get the next event in the timeline without removing it.
+
+        :return: The earliest event, or None if the timeline is empty.
+        """
+        if not self.events:
+            return None
+        return self.events[0][2]
 
     def get_next_event(self):
         """
@@ -22,4 +67,16 @@ class EventManager:
         """
         if not self.events:
             return None
-        return self.events.pop(0)
+        return heapq.heappop(self.events)[2]
+
+    def pop_until(self, time):
+        """
+        Remove and return every event scheduled at or before a given time.
+
+        :param time: Inclusive upper bound on the event timestamps.
+        :return: List of events in timeline order.
+        """
+        popped = []
+        while self.events and self.events[0][0] <= time:
+            popped.append(heapq.heappop(self.events)[2])
+        return popped
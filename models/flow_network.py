@@ -0,0 +1,341 @@
+import heapq
+import itertools
+
+
+class Flow:
+    """
+    A transfer in progress on a FlowNetwork.
+    """
+    __slots__ = ("source", "destination", "size", "start", "latency", "cap", "up", "down", "payload",
+                 "remaining", "rate", "updated_at", "finish", "entry", "active")
+
+    def __init__(self, source, destination, size, start, latency, cap, up, down, payload=None):
+        """
+        :param source: Source node identifier.
+        :param destination: Destination node identifier.
+        :param size: Data size in MB.
+        :param start: Simulation time the transfer started.
+        :param latency: Link latency in seconds, added once the data is through.
+        :param cap: Bandwidth of the link itself in Mbps.
+        :param up: Resource id of the source's uplink.
+        :param down: Resource id of the destination's downlink.
+        :param payload: Anything the caller wants back when the flow completes.
+        """
+        self.source = source
+        self.destination = destination
+        self.size = size
+        self.start = start
+        self.latency = latency
+        self.cap = cap
+        self.up = up
+        self.down = down
+        self.payload = payload
+        self.remaining = size
+        self.rate = 0.0
+        self.updated_at = start  # Time ``remaining`` was last brought up to date; the completion time once done
+        self.finish = None  # Projected time the last byte is sent
+        self.entry = None  # Live completion heap entry
+        self.active = True
+
+    def __repr__(self):
+        return f"Flow({self.source} -> {self.destination}, remaining={self.remaining:.2f}, rate={self.rate:.2f})"
+
+
+class FlowNetwork:
+    """
+    Flow-level model of concurrent transfers sharing node capacity.
+
+    Every node has an uplink and a downlink whose capacity is its bandwidth
+    in the LinkModel. A flow from a to b uses a's uplink and b's downlink and
+    is also capped by the bandwidth of the a-b link, so a flow on its own runs
+    exactly as fast as LinkModel.transfer_time assumes. Concurrent flows share
+    capacity max-min fairly.
+
+    Rates only depend on saturated resources, so when flows start or end the
+    network re-rates just the flows coupled to them through saturated uplinks
+    and downlinks; everything else keeps its rate and projected completion.
+    Changes are collected and applied together by update(), so a burst of
+    transfers starting at the same time is rated once. Completions are kept
+    in a heap with lazily invalidated entries.
+    """
+    def __init__(self, link_model, tolerance=1e-9):
+        """
+        :param link_model: LinkModel giving node bandwidths and link characteristics.
+        :param tolerance: Relative slack under which a resource counts as saturated.
+        """
+        self.link_model = link_model
+        self.tolerance = tolerance
+        self._bandwidth = link_model.bandwidth.tolist()
+        self.flows_at = {}  # Resource id -> set of flows using it
+        self.load = {}  # Resource id -> sum of the rates of its flows
+        self._heap = []  # (finish, sequence, flow) completion entries
+        self._sequence = itertools.count()
+        self._new_flows = []  # Flows added since the last update
+        self._dirty = set()  # Saturated resources whose flows changed since the last update
+        self.active_flows = 0
+        self.rerated_flows = 0  # Rate changes applied so far, for profiling the incremental updates
+
+    def __len__(self):
+        return self.active_flows
+
+    def capacity(self, resource):
+        """
+        :param resource: Resource id; 2 * i is node i's uplink and 2 * i + 1 its downlink.
+        :return: Capacity in Mbps.
+        """
+        return self._bandwidth[resource >> 1]
+
+    def add_flow(self, source, destination, size, now, payload=None):
+        """
+        Start a transfer. It is rated by the next update().
+
+        :param source: Source node identifier.
+        :param destination: Destination node identifier.
+        :param size: Data size in MB.
+        :param now: Current simulation time.
+        :param payload: Returned with the flow when it completes.
+        :return: The new Flow.
+        """
+        bandwidth, latency = self.link_model.link(source, destination)
+        index = self.link_model.index
+        flow = Flow(source, destination, size, now, latency, bandwidth,
+                    2 * index[source], 2 * index[destination] + 1, payload)
+        for resource in (flow.up, flow.down):
+            flows = self.flows_at.get(resource)
+            if flows is None:
+                self.flows_at[resource] = {flow}
+                self.load[resource] = 0.0
+            else:
+                if self._saturated(resource):
+                    self._dirty.add(resource)
+                flows.add(flow)
+        self._new_flows.append(flow)
+        self.active_flows += 1
+        return flow
+
+    def remove_flows(self, flows):
+        """
+        Stop transfers (finished or cancelled). The flows they shared capacity
+        with are re-rated by the next update().
+
+        :param flows: Flows to remove.
+        """
+        for flow in flows:
+            if not flow.active:
+                continue
+            for resource in (flow.up, flow.down):
+                if self._saturated(resource):
+                    self._dirty.add(resource)
+                users = self.flows_at[resource]
+                users.discard(flow)
+                if users:
+                    self.load[resource] -= flow.rate
+                else:
+                    del self.flows_at[resource]
+                    del self.load[resource]  # Also drops accumulated rounding error
+            flow.active = False
+            flow.entry = None
+            self.active_flows -= 1
+
+    def update(self, now):
+        """
+        Re-rate the flows affected by the changes since the last update.
+
+        :param now: Current simulation time; must be the time of those changes.
+        """
+        new_flows = [flow for flow in self._new_flows if flow.active]
+        dirty = [resource for resource in self._dirty if resource in self.flows_at]
+        self._new_flows, self._dirty = [], set()
+        if new_flows or dirty:
+            self._rerate(dirty, now, new_flows)
+
+    def next_completion(self):
+        """
+        :return: Time the next flow sends its last byte as of the last update,
+            or None without active flows.
+        """
+        heap = self._heap
+        while heap and heap[0][2].entry is not heap[0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def pop_completed(self, now):
+        """
+        Update the network and remove every flow that has sent all its data.
+
+        :param now: Current simulation time.
+        :return: List of the completed flows, in completion order.
+        """
+        self.update(now)
+        heap = self._heap
+        completed = []
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            flow = entry[2]
+            if flow.entry is entry:
+                flow.remaining = 0.0
+                flow.updated_at = flow.finish
+                completed.append(flow)
+        self.remove_flows(completed)
+        self.update(now)
+        return completed
+
+    def _saturated(self, resource):
+        capacity = self._bandwidth[resource >> 1]
+        return self.load[resource] >= capacity - self.tolerance * capacity
+
+    def _rerate(self, seeds, now, new_flows):
+        """
+        Recompute max-min fair rates for the flows coupled to some changes.
+
+        In a max-min fair allocation every flow is held back by its link cap
+        or by a saturated resource where it runs at the top rate. So the
+        region to solve holds the new flows plus, at every saturated resource
+        reached, only the flows running at its top rate; flows held back
+        elsewhere keep their rates as fixed load. After solving, any resource
+        whose saturation or top rate changed pulls in the outside flows it
+        may now hold back or release, and the region is solved again.
+        """
+        flows_at, bandwidth, load = self.flows_at, self._bandwidth, self.load
+        saturated, tolerance = self._saturated, self.tolerance
+        region = set(new_flows)
+        expanded = set()
+        frontier = list(seeds)
+
+        def include(flow):
+            region.add(flow)
+            for other in (flow.up, flow.down):
+                if other not in expanded and saturated(other):
+                    frontier.append(other)
+
+        while True:
+            while frontier:
+                resource = frontier.pop()
+                if resource in expanded:
+                    continue
+                expanded.add(resource)
+                flows = flows_at[resource]
+                top = max(flow.rate for flow in flows) * (1 - tolerance)
+                for flow in flows:
+                    if flow.rate >= top and flow not in region:
+                        include(flow)
+
+            rates = self._max_min(region)
+
+            # Resources where the region's rates changed: [load change, top region rate]
+            touched = {}
+            grew = False
+            for flow in region:
+                rate = rates[flow]
+                if flow.finish is not None and abs(rate - flow.rate) <= tolerance * rate:
+                    continue
+                for resource in (flow.up, flow.down):
+                    change = touched.get(resource)
+                    if change is None:
+                        touched[resource] = [rate - flow.rate, rate]
+                    else:
+                        change[0] += rate - flow.rate
+                        change[1] = max(change[1], rate)
+            for resource, (delta, region_top) in touched.items():
+                flows = flows_at[resource]
+                limit = bandwidth[resource >> 1] * (1 - tolerance)
+                # Saturated before: flows held back here may be released.
+                # Saturated after: flows above the region's top rate must give way.
+                threshold = float("inf")
+                if load[resource] >= limit:
+                    threshold = max(flow.rate for flow in flows)
+                if load[resource] + delta >= limit:
+                    threshold = min(threshold, region_top)
+                if threshold == float("inf"):
+                    continue
+                threshold *= 1 - tolerance
+                for flow in flows:
+                    if flow.rate >= threshold and flow not in region:
+                        include(flow)
+                        grew = True
+            if not grew:
+                break
+
+        self._apply(region, rates, now)
+
+    def _max_min(self, region):
+        """
+        Max-min fair rates of the region's flows by progressive filling.
+
+        All unfrozen flows share one rising level; a resource saturates once
+        the level reaches its spare capacity divided among its unfrozen flows,
+        and a flow stops at its link cap. Both are kept in a heap, so solving
+        costs O((flows + resources) log) instead of one pass per level.
+        """
+        bandwidth, load = self._bandwidth, self.load
+        spare, members = {}, {}
+        for flow in region:
+            for resource in (flow.up, flow.down):
+                flows = members.get(resource)
+                if flows is None:
+                    members[resource] = [flow]
+                    spare[resource] = bandwidth[resource >> 1] - load[resource] + flow.rate
+                else:
+                    flows.append(flow)
+                    spare[resource] += flow.rate  # Region flows are re-rated from scratch
+
+        sequence = itertools.count()
+        heap = [(flow.cap, next(sequence), None, flow) for flow in region]
+        counts, level_of = {}, {}
+        for resource, flows in members.items():
+            counts[resource] = len(flows)
+            level_of[resource] = level = max(spare[resource], 0.0) / len(flows)
+            heap.append((level, next(sequence), resource, None))
+        heapq.heapify(heap)
+
+        rates = {}
+        while heap and len(rates) < len(region):
+            level, _, resource, flow = heapq.heappop(heap)
+            if flow is not None:
+                if flow in rates:
+                    continue
+                pending = (flow,)
+            elif level_of[resource] == level:
+                level_of[resource] = None
+                pending = [flow for flow in members[resource] if flow not in rates]
+            else:
+                continue
+            for flow in pending:
+                rates[flow] = level
+                for other in (flow.up, flow.down):
+                    spare[other] -= level
+                    counts[other] -= 1
+                    if level_of[other] is not None:
+                        if counts[other]:
+                            level_of[other] = other_level = max(spare[other], 0.0) / counts[other]
+                            heapq.heappush(heap, (other_level, next(sequence), other, None))
+                        else:
+                            level_of[other] = None
+        return rates
+
+    def _apply(self, region, rates, now):
+        """
+        Advance the region's flows to ``now`` and reschedule those whose rate changed.
+        """
+        heap, load, sequence = self._heap, self.load, self._sequence
+        tolerance = self.tolerance
+        for flow in region:
+            rate = rates[flow]
+            old_rate = flow.rate
+            if flow.finish is not None and abs(rate - old_rate) <= tolerance * rate:
+                continue
+            flow.remaining = max(flow.remaining - old_rate * (now - flow.updated_at), 0.0)
+            flow.updated_at = now
+            load[flow.up] += rate - old_rate
+            load[flow.down] += rate - old_rate
+            flow.rate = rate
+            self.rerated_flows += 1
+            if rate > 0:
+                flow.finish = now + flow.remaining / rate
+                flow.entry = (flow.finish, next(sequence), flow)
+                heapq.heappush(heap, flow.entry)
+            else:
+                flow.finish, flow.entry = float("inf"), None  # Starved until capacity frees up
+        if len(heap) > 2 * self.active_flows + 64:
+            self._heap = [entry for entry in heap if entry[2].entry is entry]
+            heapq.heapify(self._heap)
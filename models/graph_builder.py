@@ -1,12 +1,43 @@
+import json
+import os
 import networkx as nx
-import random
+import numpy as np
 from models.user_node import UserNode
 from models.enterprise_node import EnterpriseNode
+from models.node_store import EnterpriseNodeView, NodeStore, UserNodeView
+
+
+DENSE_PAIR_LIMIT = 1 << 22  # Above this many user-enterprise pairs, sample edges sparsely
+SNAPSHOT_VERSION = 1
+# Arrays of a saved topology, one .npy file each. Node arrays follow graph order,
+# user attributes follow user order and edges are CSR over the node order.
+SNAPSHOT_ARRAYS = ("node_ids", "is_user", "gpu_power", "bandwidth", "latency",
+                   "indptr", "indices", "edge_bandwidth", "edge_latency")
 
 
 class GraphBuilder:
-    def __init__(self):
-        self.graph = nx.DiGraph()
+    def __init__(self, columnar=False, archive_completed=False):
+        """
+        Initialize the builder.
+
+        :param columnar: Keep node attributes in a NumPy-backed NodeStore and
+            attach UserNodeView/EnterpriseNodeView proxies to the graph.
+        :param archive_completed: Have enterprises move completed tasks into a
+            compact archive instead of keeping them as dicts.
+        """
+        self._graph = nx.DiGraph()
+        self.store = NodeStore() if columnar else None
+        self.archive_completed = archive_completed
+        self.snapshot = None  # Arrays of a loaded topology, see load()
+
+    @property
+    def graph(self):
+        """
+        The graph, built from the loaded snapshot on first access.
+        """
+        if self._graph is None:
+            self._graph = self._graph_from_snapshot()
+        return self._graph
 
     def add_user_node(self, node_id, gpu_power, bandwidth, latency):
         """
@@ -17,7 +48,10 @@ class GraphBuilder:
         :param bandwidth: Network bandwidth in Mbps.
         :param latency: Network latency in ms.
         """
-        user_node = UserNode(node_id, gpu_power, bandwidth, latency)
+        if self.store is not None:
+            user_node = self.store.add_user(node_id, gpu_power, bandwidth, latency)
+        else:
+            user_node = UserNode(node_id, gpu_power, bandwidth, latency)
         self.graph.add_node(node_id, data=user_node, type="user")
 
     def add_enterprise_node(self, node_id):
@@ -26,7 +60,10 @@ class GraphBuilder:
 
         :param node_id: Unique identifier for the enterprise node.
         """
-        enterprise_node = EnterpriseNode(node_id)
+        if self.store is not None:
+            enterprise_node = self.store.add_enterprise(node_id, self.archive_completed)
+        else:
+            enterprise_node = EnterpriseNode(node_id, self.archive_completed)
         self.graph.add_node(node_id, data=enterprise_node, type="enterprise")
 
     def add_edge(self, user_node_id, enterprise_node_id, bandwidth, latency):
@@ -45,21 +82,78 @@ class GraphBuilder:
             latency=latency,
         )
 
-    def create_empty_graph(self, num_users, num_enterprises):
+    def create_empty_graph(self, num_users, num_enterprises, seed=None):
         """
         Generate an empty graph with nodes but no edges.
+
+        :param num_users: Number of user nodes.
+        :param num_enterprises: Number of enterprise nodes.
+        :param seed: Seed for the random node attributes.
         """
-        for i in range(num_users):
-            self.add_user_node(
-                node_id=f"user_{i}",
-                gpu_power=random.uniform(1.5, 3.0),  # Random GPU power in TFLOPS
-                bandwidth=random.randint(10, 100),  # Random bandwidth in Mbps
-                latency=random.randint(10, 50),  # Random latency in ms
-            )
+        self.create_random_graph(num_users, num_enterprises, connection_probability=0, seed=seed)
+
+    def create_random_graph(
+        self,
+        num_users,
+        num_enterprises,
+        connection_probability,
+        seed=None,
+        gpu_power_range=(1.5, 3.0),
+        bandwidth_range=(10, 100),
+        latency_range=(10, 50),
+    ):
+        """
+        Generate users and enterprises in bulk and connect each user-enterprise
+        pair independently with a given probability.
+
+        All attributes are drawn with single NumPy calls and nodes and edges
+        are inserted with add_nodes_from/add_edges_from, so large topologies
+        build in seconds.
 
-        for j in range(num_enterprises):
-            self.add_enterprise_node(node_id=f"enterprise_{j}")
+        :param num_users: Number of user nodes.
+        :param num_enterprises: Number of enterprise nodes.
+        :param connection_probability: Probability of an edge between a user and an enterprise.
+        :param seed: Seed for the random generator.
+        :param gpu_power_range: (min, max) GPU power in TFLOPS.
+        :param bandwidth_range: (min, max) bandwidth in Mbps, inclusive.
+        :param latency_range: (min, max) latency in ms, inclusive.
+        """
+        rng = np.random.default_rng(seed)
+        user_ids = [f"user_{i}" for i in range(num_users)]
+        enterprise_ids = [f"enterprise_{j}" for j in range(num_enterprises)]
+
+        gpu_power = rng.uniform(*gpu_power_range, size=num_users)
+        bandwidth = rng.integers(bandwidth_range[0], bandwidth_range[1] + 1, size=num_users)
+        latency = rng.integers(latency_range[0], latency_range[1] + 1, size=num_users)
 
+        if self.store is not None:
+            user_nodes = self.store.add_users(user_ids, gpu_power, bandwidth, latency)
+            enterprise_nodes = [
+                self.store.add_enterprise(node_id, self.archive_completed) for node_id in enterprise_ids
+            ]
+        else:
+            user_nodes = [
+                UserNode(node_id, g, b, l)
+                for node_id, g, b, l in zip(user_ids, gpu_power.tolist(), bandwidth.tolist(), latency.tolist())
+            ]
+            enterprise_nodes = [EnterpriseNode(node_id, self.archive_completed) for node_id in enterprise_ids]
+
+        self.graph.add_nodes_from(
+            (node_id, {"data": node, "type": "user"}) for node_id, node in zip(user_ids, user_nodes)
+        )
+        self.graph.add_nodes_from(
+            (node_id, {"data": node, "type": "enterprise"})
+            for node_id, node in zip(enterprise_ids, enterprise_nodes)
+        )
+
+        pairs = _sample_pairs(rng, num_users * num_enterprises, connection_probability)
+        users, enterprises = np.divmod(pairs, max(num_enterprises, 1))
+        edge_bandwidth = rng.integers(bandwidth_range[0], bandwidth_range[1] + 1, size=len(pairs))
+        edge_latency = rng.integers(latency_range[0], latency_range[1] + 1, size=len(pairs))
+        self.graph.add_edges_from(
+            (user_ids[u], enterprise_ids[e], {"bandwidth": b, "latency": l})
+            for u, e, b, l in zip(users.tolist(), enterprises.tolist(), edge_bandwidth.tolist(), edge_latency.tolist())
+        )
 
     def get_graph(self):
         """
@@ -68,3 +162,170 @@ class GraphBuilder:
         :return: The graph.
         """
         return self.graph
+
+    def save(self, path):
+        """
+        Save the topology as a directory of NumPy arrays.
+
+        Node ids, types and user attributes are stored as columns and edges
+        as a CSR list with bandwidth and latency arrays. Tasks and queues are
+        not part of the topology and are not saved.
+
+        :param path: Directory to write; created if needed.
+        """
+        graph = self.graph
+        node_ids = list(graph.nodes)
+        index = {node_id: i for i, node_id in enumerate(node_ids)}
+        is_user = np.fromiter((data["type"] == "user" for _, data in graph.nodes(data=True)),
+                              dtype=bool, count=len(node_ids))
+        users = [data["data"] for _, data in graph.nodes(data=True) if data["type"] == "user"]
+
+        edges = list(graph.edges(data=True))
+        sources = np.fromiter((index[u] for u, _, _ in edges), dtype=np.int64, count=len(edges))
+        order = np.argsort(sources, kind="stable")
+        indices = np.fromiter((index[v] for _, v, _ in edges), dtype=np.int64, count=len(edges))
+        edge_bandwidth = np.array([data.get("bandwidth", np.nan) for _, _, data in edges], dtype=np.float64)
+        edge_latency = np.array([data.get("latency", np.nan) for _, _, data in edges], dtype=np.float64)
+
+        arrays = {
+            "node_ids": np.array(node_ids),
+            "is_user": is_user,
+            "gpu_power": np.array([user.gpu_power for user in users], dtype=np.float64),
+            "bandwidth": np.array([user.bandwidth for user in users], dtype=np.float64),
+            "latency": np.array([user.latency for user in users], dtype=np.float64),
+            "indptr": np.concatenate(([0], np.cumsum(np.bincount(sources, minlength=len(node_ids))))),
+            "indices": indices[order],
+            "edge_bandwidth": edge_bandwidth[order],
+            "edge_latency": edge_latency[order],
+        }
+        if arrays["node_ids"].dtype.kind not in "iuU":
+            raise ValueError("Only graphs with string or integer node ids can be saved.")
+
+        os.makedirs(path, exist_ok=True)
+        for name, array in arrays.items():
+            np.save(os.path.join(path, f"{name}.npy"), array)
+        with open(os.path.join(path, "topology.json"), "w") as f:
+            json.dump({"version": SNAPSHOT_VERSION, "num_nodes": len(node_ids),
+                       "num_users": len(users), "num_edges": len(edges)}, f)
+
+    @classmethod
+    def load(cls, path, columnar=True, archive_completed=False, mmap=True):
+        """
+        Load a topology written by save().
+
+        The arrays are memory-mapped, so loading is quick and the pages are
+        shared read-only between processes loading the same topology. With
+        ``columnar`` the NodeStore reads the user attributes straight from
+        the mapped arrays. The networkx graph itself is only built when
+        ``graph`` or get_graph() is first used; array consumers can read
+        ``snapshot`` instead.
+
+        :param path: Directory written by save().
+        :param columnar: Back the nodes with a NodeStore instead of UserNode objects.
+        :param archive_completed: Have enterprises archive completed tasks.
+        :param mmap: Memory-map the arrays instead of reading them into memory.
+        :return: A GraphBuilder.
+        """
+        with open(os.path.join(path, "topology.json")) as f:
+            metadata = json.load(f)
+        if metadata["version"] != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported topology version {metadata['version']}.")
+
+        snapshot = {name: _load_array(os.path.join(path, f"{name}.npy"), mmap) for name in SNAPSHOT_ARRAYS}
+        builder = cls(columnar=columnar, archive_completed=archive_completed)
+        builder.snapshot = snapshot
+        builder._graph = None
+
+        if columnar:
+            is_user = np.asarray(snapshot["is_user"])
+            node_ids = snapshot["node_ids"]
+            builder.store.users.load_columns(
+                node_ids[is_user].tolist(),
+                gpu_power=snapshot["gpu_power"],
+                bandwidth=snapshot["bandwidth"],
+                latency=snapshot["latency"],
+            )
+            builder.store.enterprises.load_columns(node_ids[~is_user].tolist())
+        return builder
+
+    def _graph_from_snapshot(self):
+        """
+        Build the networkx graph of a loaded topology.
+        """
+        snapshot = self.snapshot
+        node_ids = snapshot["node_ids"].tolist()
+        is_user = np.asarray(snapshot["is_user"])
+
+        if self.store is not None:
+            users = [UserNodeView(self.store, row) for row in range(len(self.store.users))]
+            enterprises = [EnterpriseNodeView(self.store, row, self.archive_completed)
+                           for row in range(len(self.store.enterprises))]
+        else:
+            users = []
+            for node_id, gpu_power, bandwidth, latency in zip(
+                [node_id for node_id, user in zip(node_ids, is_user.tolist()) if user],
+                snapshot["gpu_power"].tolist(), snapshot["bandwidth"].tolist(), snapshot["latency"].tolist(),
+            ):
+                user = UserNode(node_id, 0, bandwidth, latency)
+                user.gpu_power = gpu_power  # Saved values are already scaled
+                users.append(user)
+            enterprises = [EnterpriseNode(node_id, self.archive_completed)
+                           for node_id, user in zip(node_ids, is_user.tolist()) if not user]
+
+        graph = nx.DiGraph()
+        users, enterprises = iter(users), iter(enterprises)
+        graph.add_nodes_from(
+            (node_id, {"data": next(users), "type": "user"} if user else {"data": next(enterprises), "type": "enterprise"})
+            for node_id, user in zip(node_ids, is_user.tolist())
+        )
+
+        indptr = np.asarray(snapshot["indptr"])
+        sources = np.repeat(np.arange(len(node_ids)), np.diff(indptr)).tolist()
+        graph.add_edges_from(
+            (node_ids[u], node_ids[v], {key: value for key, value in (("bandwidth", b), ("latency", l)) if value == value})
+            for u, v, b, l in zip(sources, snapshot["indices"].tolist(),
+                                  snapshot["edge_bandwidth"].tolist(), snapshot["edge_latency"].tolist())
+        )
+        return graph
+
+
+def _load_array(path, mmap):
+    """
+    Load a .npy file, memory-mapped when requested and possible.
+    """
+    if mmap:
+        try:
+            return np.load(path, mmap_mode="r")
+        except ValueError:
+            pass  # Empty arrays cannot be mapped
+    return np.load(path)
+
+
+def _sample_pairs(rng, num_pairs, probability):
+    """
+    Sample indices of a Bernoulli(probability) mask over ``num_pairs`` slots.
+
+    Small problems draw the mask directly. Large ones draw the geometric gaps
+    between successive hits instead, so the cost scales with the number of
+    edges rather than the number of possible pairs.
+
+    :param rng: NumPy random Generator.
+    :param num_pairs: Number of candidate pairs.
+    :param probability: Probability that each pair is selected.
+    :return: Sorted int64 array of selected pair indices.
+    """
+    if num_pairs == 0 or probability <= 0:
+        return np.empty(0, dtype=np.int64)
+    if probability >= 1:
+        return np.arange(num_pairs, dtype=np.int64)
+    if num_pairs <= DENSE_PAIR_LIMIT:
+        return np.flatnonzero(rng.random(num_pairs) < probability)
+
+    chunk_size = int(num_pairs * probability * 1.05) + 1024
+    chunks = []
+    position = -1
+    while position < num_pairs:
+        hits = position + np.cumsum(rng.geometric(probability, size=chunk_size))
+        position = hits[-1]
+        chunks.append(hits[hits < num_pairs])
+    return np.concatenate(chunks)
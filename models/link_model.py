@@ -0,0 +1,137 @@
+import numpy as np
+
+
+class LinkModel:
+    """
+    Precomputed network cost model for transfers between nodes.
+
+    Every node gets an integer index and per-node bandwidth (Mbps) and latency
+    (ms) arrays are built once from the UserNode attributes. Enterprises use
+    fixed defaults. Edges carrying explicit "bandwidth"/"latency" attributes
+    (e.g. from GraphBuilder.add_edge) override the node-derived values in
+    both directions. Otherwise a link runs at the slower endpoint's bandwidth
+    with the endpoints' latencies added up.
+
+    Scalar lookups are memoized and O(1). transfer_times() evaluates whole
+    arrays of (source, destination) pairs at once.
+    """
+    def __init__(self, graph, enterprise_bandwidth=1000.0, enterprise_latency=0.0, max_cache_size=1 << 20):
+        """
+        :param graph: The graph representing the network.
+        :param enterprise_bandwidth: Bandwidth assumed for enterprise endpoints in Mbps.
+        :param enterprise_latency: Latency assumed for enterprise endpoints in ms.
+        :param max_cache_size: Number of memoized pairs kept before the cache is reset.
+        """
+        self.node_ids = list(graph.nodes)
+        self.index = {node: i for i, node in enumerate(self.node_ids)}
+        self.num_nodes = len(self.node_ids)
+        self.bandwidth = np.full(self.num_nodes, enterprise_bandwidth, dtype=np.float64)
+        self.latency = np.full(self.num_nodes, enterprise_latency, dtype=np.float64)
+
+        for i, (node, data) in enumerate(graph.nodes(data=True)):
+            if data["type"] == "user":
+                self.bandwidth[i] = data["data"].bandwidth
+                self.latency[i] = data["data"].latency
+
+        # Explicit edge attributes, as a sorted key array for vectorized lookups
+        overrides = {}
+        for u, v, data in graph.edges(data=True):
+            if "bandwidth" not in data:
+                continue
+            a, b = self.index[u], self.index[v]
+            link = (float(data["bandwidth"]), float(data.get("latency", self.latency[a] + self.latency[b])))
+            overrides[a * self.num_nodes + b] = link
+            overrides.setdefault(b * self.num_nodes + a, link)
+        self._override_keys = np.array(sorted(overrides), dtype=np.int64)
+        self._override_bandwidth = np.array([overrides[k][0] for k in self._override_keys.tolist()])
+        self._override_latency = np.array([overrides[k][1] for k in self._override_keys.tolist()])
+        self._overrides = overrides
+
+        self._cache = {}
+        self.max_cache_size = max_cache_size
+
+    @classmethod
+    def for_graph(cls, graph):
+        """
+        Get the link model shared by everything simulating a graph.
+
+        The model is cached on the graph and rebuilt if nodes were added or
+        removed since it was computed.
+
+        :param graph: The graph representing the network.
+        :return: A LinkModel.
+        """
+        model = graph.graph.get("link_model")
+        if model is None or model.num_nodes != graph.number_of_nodes():
+            model = graph.graph["link_model"] = cls(graph)
+        return model
+
+    def link(self, from_node, to_node):
+        """
+        Get the effective bandwidth and latency between two nodes.
+
+        :param from_node: Source node identifier.
+        :param to_node: Destination node identifier.
+        :return: (bandwidth in Mbps, latency in seconds).
+        """
+        key = (from_node, to_node)
+        link = self._cache.get(key)
+        if link is None:
+            a, b = self.index[from_node], self.index[to_node]
+            override = self._overrides.get(a * self.num_nodes + b)
+            if override is not None:
+                bandwidth, latency = override
+            else:
+                bandwidth = min(self.bandwidth[a], self.bandwidth[b])
+                latency = self.latency[a] + self.latency[b]
+            if len(self._cache) >= self.max_cache_size:
+                self._cache.clear()
+            link = self._cache[key] = (float(bandwidth), float(latency) / 1000.0)
+        return link
+
+    def transfer_time(self, from_node, to_node, size):
+        """
+        Time needed to ship data between two nodes.
+
+        :param from_node: Source node identifier.
+        :param to_node: Destination node identifier.
+        :param size: Data size in MB.
+        :return: Transfer time in seconds.
+        """
+        bandwidth, latency = self.link(from_node, to_node)
+        return latency + size / bandwidth
+
+    def transfer_times(self, sources, destinations, sizes):
+        """
+        Vectorized transfer times for arrays of node indices.
+
+        :param sources: Integer array of source node indices (see ``index``).
+        :param destinations: Integer array of destination node indices.
+        :param sizes: Array of data sizes in MB, broadcastable to the index arrays.
+        :return: Array of transfer times in seconds.
+        """
+        bandwidth, latency = self.links(sources, destinations)
+        return latency + np.asarray(sizes) / bandwidth
+
+    def links(self, sources, destinations):
+        """
+        Vectorized link characteristics for arrays of node indices.
+
+        :param sources: Integer array of source node indices (see ``index``).
+        :param destinations: Integer array of destination node indices.
+        :return: (array of bandwidths in Mbps, array of latencies in seconds).
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        destinations = np.asarray(destinations, dtype=np.int64)
+        bandwidth = np.minimum(self.bandwidth[sources], self.bandwidth[destinations])
+        latency = self.latency[sources] + self.latency[destinations]
+
+        if len(self._override_keys):
+            keys = sources * self.num_nodes + destinations
+            positions = np.searchsorted(self._override_keys, keys)
+            positions = np.minimum(positions, len(self._override_keys) - 1)
+            hits = self._override_keys[positions] == keys
+            bandwidth = np.where(hits, self._override_bandwidth[positions], bandwidth)
+            latency = np.where(hits, self._override_latency[positions], latency)
+
+        return bandwidth, latency / 1000.0
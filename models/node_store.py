@@ -0,0 +1,311 @@
+from collections import deque
+import numpy as np
+from models.user_node import UserNode, GPU_POWER_SCALE
+from models.enterprise_node import EnterpriseNode
+
+
+USER_COLUMNS = {
+    "gpu_power": np.float64,  # Effective GPU power in TFLOPS (already scaled)
+    "bandwidth": np.float64,  # Mbps
+    "latency": np.float64,  # ms
+    "queue_length": np.int64,
+    "active": np.bool_,
+    "backlog": np.float64,  # Seconds of GPU work queued or in progress
+    "free_at": np.float64,  # Projected time the queued work is done
+}
+
+ENTERPRISE_COLUMNS = {
+    "task_count": np.int64,
+    "completed_count": np.int64,
+}
+
+
+class ColumnTable:
+    """
+    Growable set of NumPy columns indexed by an integer row id.
+    """
+    def __init__(self, columns, capacity=1024):
+        """
+        :param columns: Mapping of column name to NumPy dtype.
+        :param capacity: Initial number of rows to allocate.
+        """
+        self.ids = []  # Row index -> node id
+        self._index = {}  # Node id -> row index, rebuilt on demand after load_columns
+        self.size = 0
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in columns.items()}
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def index(self):
+        """
+        Mapping of node id to row index.
+        """
+        if self._index is None:
+            self._index = dict(zip(self.ids, range(self.size)))
+        return self._index
+
+    def column(self, name):
+        """
+        Get a view of the live rows of a column.
+
+        :param name: Column name.
+        :return: NumPy array view of length ``size``.
+        """
+        return self.columns[name][:self.size]
+
+    def append(self, node_id, **values):
+        """
+        Add one row.
+
+        :param node_id: Identifier of the node stored in the row.
+        :param values: Initial values for some of the columns.
+        :return: The row index.
+        """
+        self._reserve(self.size + 1)
+        row = self.size
+        for name, value in values.items():
+            self.columns[name][row] = value
+        self.ids.append(node_id)
+        self.index[node_id] = row
+        self.size += 1
+        return row
+
+    def extend(self, node_ids, **values):
+        """
+        Add many rows at once.
+
+        :param node_ids: Sequence of node identifiers.
+        :param values: Arrays of initial values, one entry per node.
+        :return: range of the new row indices.
+        """
+        count = len(node_ids)
+        self._reserve(self.size + count)
+        rows = range(self.size, self.size + count)
+        for name, array in values.items():
+            self.columns[name][rows.start:rows.stop] = array
+        self.ids.extend(node_ids)
+        self.index.update(zip(node_ids, rows))
+        self.size += count
+        return rows
+
+    def load_columns(self, node_ids, **values):
+        """
+        Replace the table with existing rows, adopting the given arrays as columns.
+
+        The arrays are used as they are (e.g. memory-mapped, read-only); the
+        remaining columns are allocated empty. Growing the table later copies
+        every column into fresh arrays.
+
+        :param node_ids: List of node identifiers, one per row.
+        :param values: Arrays of column values, one entry per node.
+        """
+        self.ids = node_ids
+        self._index = None  # Built on first use; loading a large table stays cheap
+        self.size = len(node_ids)
+        capacity = max(self.size, 1)
+        for name, array in self.columns.items():
+            self.columns[name] = values[name] if name in values else np.zeros(capacity, dtype=array.dtype)
+
+    def _reserve(self, size):
+        """
+        Grow every column geometrically so it can hold ``size`` rows.
+        """
+        capacity = len(next(iter(self.columns.values())))
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name, array in self.columns.items():
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[:self.size] = array[:self.size]
+            self.columns[name] = grown
+
+
+class NodeStore:
+    """
+    Columnar backend for user and enterprise nodes.
+
+    Per-node attributes live in NumPy arrays indexed by an integer node id,
+    and the graph holds thin UserNodeView/EnterpriseNodeView proxies so code
+    written against UserNode and EnterpriseNode keeps working.
+    """
+    def __init__(self, capacity=1024):
+        self.users = ColumnTable(USER_COLUMNS, capacity)
+        self.enterprises = ColumnTable(ENTERPRISE_COLUMNS, max(capacity // 64, 16))
+        self.queues = {}  # User row -> queued (task, start_time) entries, created on demand
+        self.active_tasks = {}  # User row -> task being processed
+
+    @property
+    def gpu_power(self):
+        return self.users.column("gpu_power")
+
+    @property
+    def bandwidth(self):
+        return self.users.column("bandwidth")
+
+    @property
+    def latency(self):
+        return self.users.column("latency")
+
+    @property
+    def queue_length(self):
+        return self.users.column("queue_length")
+
+    @property
+    def active(self):
+        return self.users.column("active")
+
+    @property
+    def backlog(self):
+        return self.users.column("backlog")
+
+    @property
+    def free_at(self):
+        return self.users.column("free_at")
+
+    def add_user(self, node_id, gpu_power, bandwidth, latency):
+        """
+        Add a user node.
+
+        :param node_id: Unique identifier for the user node.
+        :param gpu_power: Nominal GPU power in TFLOPS.
+        :param bandwidth: Network bandwidth in Mbps.
+        :param latency: Network latency in ms.
+        :return: UserNodeView for the new row.
+        """
+        row = self.users.append(
+            node_id,
+            gpu_power=gpu_power * GPU_POWER_SCALE,
+            bandwidth=bandwidth,
+            latency=latency,
+        )
+        return UserNodeView(self, row)
+
+    def add_users(self, node_ids, gpu_power, bandwidth, latency):
+        """
+        Add many user nodes from attribute arrays.
+
+        :param node_ids: Sequence of user node identifiers.
+        :param gpu_power: Array of nominal GPU powers in TFLOPS.
+        :param bandwidth: Array of bandwidths in Mbps.
+        :param latency: Array of latencies in ms.
+        :return: List of UserNodeView objects, one per node.
+        """
+        rows = self.users.extend(
+            node_ids,
+            gpu_power=np.asarray(gpu_power, dtype=np.float64) * GPU_POWER_SCALE,
+            bandwidth=bandwidth,
+            latency=latency,
+        )
+        return [UserNodeView(self, row) for row in rows]
+
+    def add_enterprise(self, node_id, archive_completed=False):
+        """
+        Add an enterprise node.
+
+        :param node_id: Unique identifier for the enterprise node.
+        :param archive_completed: Archive completed tasks instead of keeping them as dicts.
+        :return: EnterpriseNodeView for the new row.
+        """
+        return EnterpriseNodeView(self, self.enterprises.append(node_id), archive_completed)
+
+
+class UserNodeView(UserNode):
+    """
+    UserNode proxy whose attributes live in a NodeStore.
+    """
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+        self.pools = []
+
+    @property
+    def node_id(self):
+        return self.store.users.ids[self.index]
+
+    @property
+    def gpu_power(self):
+        return self.store.users.columns["gpu_power"][self.index]
+
+    @property
+    def bandwidth(self):
+        return self.store.users.columns["bandwidth"][self.index]
+
+    @property
+    def latency(self):
+        return self.store.users.columns["latency"][self.index]
+
+    @property
+    def queue(self):
+        queue = self.store.queues.get(self.index)
+        if queue is None:
+            queue = self.store.queues[self.index] = deque()
+        return queue
+
+    @property
+    def active_task(self):
+        return self.store.active_tasks.get(self.index)
+
+    @active_task.setter
+    def active_task(self, task):
+        if task is None:
+            self.store.active_tasks.pop(self.index, None)
+        else:
+            self.store.active_tasks[self.index] = task
+        self.store.users.columns["active"][self.index] = task is not None
+
+    @property
+    def backlog(self):
+        return float(self.store.users.columns["backlog"][self.index])
+
+    @backlog.setter
+    def backlog(self, value):
+        self.store.users.columns["backlog"][self.index] = value
+
+    @property
+    def free_at(self):
+        return float(self.store.users.columns["free_at"][self.index])
+
+    @free_at.setter
+    def free_at(self, value):
+        self.store.users.columns["free_at"][self.index] = value
+
+    def _notify_pool(self):
+        """
+        Mirror the queue length into the store, release an empty queue and
+        re-index the user.
+        """
+        queue = self.store.queues.get(self.index)
+        if queue is not None and not queue:
+            del self.store.queues[self.index]
+        self.store.users.columns["queue_length"][self.index] = len(queue) if queue else 0
+        super()._notify_pool()
+
+    def __repr__(self):
+        return f"UserNodeView({self.node_id}, row={self.index})"
+
+
+class EnterpriseNodeView(EnterpriseNode):
+    """
+    EnterpriseNode whose task counters are mirrored into a NodeStore.
+    """
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index, archive_completed=False):
+        super().__init__(store.enterprises.ids[index], archive_completed)
+        self.store = store
+        self.index = index
+
+    def create_task(self, complexity, data_size):
+        task = super().create_task(complexity, data_size)
+        self.store.enterprises.columns["task_count"][self.index] += 1
+        return task
+
+    def mark_task_completed(self, task):
+        if not task["completed"]:
+            self.store.enterprises.columns["completed_count"][self.index] += 1
+        super().mark_task_completed(task)
@@ -0,0 +1,155 @@
+class Record:
+    """
+    Base class for compact, slotted simulation records.
+
+    Records support the dict-style access the simulator was written against
+    (``record["time"]``, ``record.get("edge")``, ``"node" in record``) while
+    storing fields in ``__slots__``. Fields left as None count as absent, the
+    way a missing dict key would.
+    """
+    __slots__ = ()
+    _fields = ()
+
+    def __getitem__(self, key):
+        value = getattr(self, key, None) if key in self._fields else None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key not in self._fields:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self._fields and getattr(self, key) is not None
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None) if key in self._fields else None
+        return default if value is None else value
+
+    def keys(self):
+        return list(self.to_dict())
+
+    def to_dict(self):
+        """
+        :return: Dict of the fields that are set.
+        """
+        return {key: value for key in self._fields if (value := getattr(self, key)) is not None}
+
+    def __repr__(self):
+        fields = ", ".join(f"{key}={value!r}" for key, value in self.to_dict().items())
+        return f"{type(self).__name__}({fields})"
+
+
+class Task(Record):
+    """
+    A unit of work created by an enterprise.
+    """
+    __slots__ = ("id", "complexity", "data_size", "completed", "gpu_time", "transmission_time")
+    _fields = __slots__
+
+    def __init__(self, id, complexity, data_size, completed=False):
+        """
+        :param id: Identifier of the task within its enterprise.
+        :param complexity: Computational complexity in FLOPS.
+        :param data_size: Data size in MB.
+        :param completed: Whether the task has returned to its enterprise.
+        """
+        self.id = id
+        self.complexity = complexity
+        self.data_size = data_size
+        self.completed = completed
+        self.gpu_time = None  # Seconds of GPU time, filled in by a TaskTrace
+        self.transmission_time = None  # Seconds spent in transfers, filled in by a TaskTrace
+
+
+class SubTask(Record):
+    """
+    The portion of a task processed by one user in a chain.
+    """
+    __slots__ = ("portion", "data_size", "duration", "task", "hop")
+    _fields = __slots__
+
+    def __init__(self, portion, data_size, duration, task=None, hop=None):
+        """
+        :param portion: Share of the task's complexity in FLOPS.
+        :param data_size: Data size shipped to the user in MB.
+        :param duration: GPU time needed for the portion in seconds.
+        :param task: The Task this portion belongs to.
+        :param hop: Position of the user in the task's chain, starting at 0.
+        """
+        self.portion = portion
+        self.data_size = data_size
+        self.duration = duration
+        self.task = task
+        self.hop = hop
+
+
+class Event(Record):
+    """
+    An entry of the simulation timeline.
+
+    Fields used by the built-in event types are slots. Anything else passed
+    as a keyword is kept in a small side dict that is only allocated when used.
+    Events mark the end of an activity (a transfer or a computation); ``start``
+    is the time that activity began.
+    """
+    __slots__ = ("time", "type", "from_node", "to_node", "node", "size", "edge", "task", "start", "extra")
+    _fields = __slots__[:-1]
+
+    def __init__(self, time, type, from_node=None, to_node=None, node=None,
+                 size=None, edge=None, task=None, start=None, **extra):
+        self.time = time
+        self.type = type
+        self.from_node = from_node
+        self.to_node = to_node
+        self.node = node
+        self.size = size
+        self.edge = edge
+        self.task = task
+        self.start = start
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build an Event from a dict with at least "time" and "type" keys.
+        """
+        return cls(**data)
+
+    def __getitem__(self, key):
+        if key in self._fields:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        elif self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._fields:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        if key in self._fields:
+            return getattr(self, key) is not None
+        return self.extra is not None and key in self.extra
+
+    def get(self, key, default=None):
+        if key in self._fields:
+            value = getattr(self, key)
+            return default if value is None else value
+        if self.extra is not None:
+            return self.extra.get(key, default)
+        return default
+
+    def to_dict(self):
+        data = super().to_dict()
+        if self.extra:
+            data.update(self.extra)
+        return data
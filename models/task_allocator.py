@@ -1,24 +1,104 @@
+import gc
 import random
+import numpy as np
+from models.link_model import LinkModel
+from models.records import Event, SubTask
+from models.user_pool import UserPool
+
+STRATEGIES = ("shortest_queue", "earliest_finish")
+
 
 class TaskAllocator:
     """
     Manages the allocation of tasks from enterprise nodes to user nodes in a sequential manner.
+
+    Two chain selection strategies are available:
+
+    - "shortest_queue": the ``d`` users with the least queued GPU work
+      (UserNode.backlog), each processing an equal share of the task.
+    - "earliest_finish": HEFT-style list scheduling. Each hop goes to the
+      candidate user that would finish it first given its projected free
+      time, the transfer cost and its GPU power. The task's complexity is
+      then split across the chain in proportion to GPU power.
+
+    By default every transfer and computation of a chain is scheduled up
+    front from the LinkModel. With an ``executor`` (e.g. a ChainExecutor) the
+    subtasks are only queued and the chain is handed over to be run inside
+    the event loop.
+
+    Static schedules can be pipelined: with ``micro_batches`` m > 1 a task's
+    data is cut into m micro-batches that move through the chain one after
+    another. A hop starts on the first micro-batch as soon as it arrives and
+    forwards each result while computing the next, so the hops of a chain
+    overlap instead of running store-and-forward. Each link sends one
+    micro-batch at a time. Every hop but the last produces an activation of
+    its own size (``activation_sizes``), which is what travels on to the
+    next hop and finally back to the enterprise.
     """
-    def __init__(self, graph, event_manager):
+    def __init__(self, graph, event_manager, verbose=True, link_model=None,
+                 strategy="shortest_queue", candidate_factor=4, executor=None,
+                 micro_batches=1, activation_sizes=None):
         """
         Initialize the TaskAllocator with a graph and event manager.
 
         :param graph: The graph representing the network.
         :param event_manager: The event manager for tracking events.
+        :param verbose: Print the chain chosen for every task.
+        :param link_model: LinkModel for transfer costs; defaults to the graph's shared model.
+        :param strategy: Chain selection strategy, one of STRATEGIES.
+        :param candidate_factor: With "earliest_finish", how many of the earliest
+            free users (times ``d``) are considered for each chain.
+        :param executor: Object whose ``submit_chain(enterprise, task, hops, time)``
+            runs chains in the event loop; None to schedule their events up front.
+        :param micro_batches: Number of micro-batches each task is pipelined in; 1 for store-and-forward.
+        :param activation_sizes: Output size in MB of each hop of a chain, the last being returned
+            to the enterprise; None to ship the task's data size at every hop.
         """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown allocation strategy {strategy!r}, expected one of {STRATEGIES}")
+        if micro_batches < 1:
+            raise ValueError(f"micro_batches must be at least 1, got {micro_batches}")
+        if executor is not None and micro_batches > 1:
+            raise ValueError("Chains run by an executor are not pipelined; use micro_batches=1")
+
         self.graph = graph
         self.event_manager = event_manager
         self.current_time = 0
+        self.verbose = verbose
+        self.link_model = link_model or LinkModel.for_graph(graph)
+        self.strategy = strategy
+        self.candidate_factor = candidate_factor
+        self.executor = executor
+        self.micro_batches = micro_batches
+        self.activation_sizes = None if activation_sizes is None else [float(size) for size in activation_sizes]
+
+        # Index user nodes by load so choosing a chain does not scan the graph
+        if strategy == "earliest_finish":
+            self.user_pool = UserPool(key=self.projected_free_time)
+        else:
+            self.user_pool = UserPool()
+        self.users = []
+        for node, data in graph.nodes(data=True):
+            if data["type"] == "user":
+                self.users.append(data["data"])
+                self.user_pool.add(data["data"])
 
     def allocate_tasks(self, d=3):
         """
         Allocate tasks from all enterprises to users, allowing parallel chains.
         """
+        tasks_to_allocate = self._collect_pending_tasks()
+
+        # Allocate tasks
+        for enterprise, task in tasks_to_allocate:
+            self.allocate_task(enterprise, task, d)
+
+    def _collect_pending_tasks(self):
+        """
+        Collect the pending tasks of every enterprise, shuffled.
+
+        :return: List of (enterprise id, task) pairs.
+        """
         tasks_to_allocate = []  # Collect tasks from all enterprises
 
         for enterprise, data in self.graph.nodes(data=True):
@@ -29,82 +109,404 @@ class TaskAllocator:
 
         # Shuffle tasks to mix enterprises (optional, to improve fairness)
         random.shuffle(tasks_to_allocate)
+        return tasks_to_allocate
 
-        # Allocate tasks
-        for enterprise, task in tasks_to_allocate:
-            available_users = [
-                (user, self.graph.nodes[user]["data"])
-                for user in self.graph.nodes
-                if self.graph.nodes[user]["type"] == "user"
-            ]
-            available_users = sorted(
-                available_users,
-                key=lambda x: x[1].get_priority()
-            )[:d]
+    def allocate_batch(self, tasks=None, d=3):
+        """
+        Allocate a whole wave of tasks with vectorized timing.
 
-            print(f"available users : {[( available_user[1].node_id,available_user[1].queue) for available_user in available_users]}")
+        Tasks are assigned in rounds of up to ``len(users) // d`` chains.
+        In each round the best ranked users are dealt out to the chains hop
+        by hop, and the transfer, wait and GPU times of every chain are
+        computed at once with NumPy. All events are then added to the
+        EventManager in a single bulk insert.
 
+        Users are ranked by the allocation strategy's load: "shortest_queue"
+        by queued GPU work, as in allocate_task. "earliest_finish" ranks by
+        when a user would finish an equal share of the round's mean task,
+        given its projected free time and GPU power. Unlike allocate_task it
+        does not weigh each hop's transfer cost. Portions and waiting also
+        follow the strategy, as in allocate_task.
 
-            if len(available_users) < d:
-                print(f"Not enough devices available for chain from {enterprise}")
+        :param tasks: List of (enterprise id, task) pairs; defaults to every pending task.
+        :param d: Number of users in each chain.
+        :return: Number of tasks allocated.
+        """
+        if tasks is None:
+            tasks = self._collect_pending_tasks()
+        num_users = len(self.users)
+        chains_per_round = num_users // d
+        if not tasks or chains_per_round == 0:
+            if tasks and self.verbose:
+                print(f"Not enough devices available for chains of {d} users")
+            return 0
+
+        index = self.link_model.index
+        user_ids = [user.node_id for user in self.users]
+        user_index = np.array([index[node_id] for node_id in user_ids], dtype=np.int64)
+        gpu_power = np.array([user.gpu_power for user in self.users], dtype=np.float64) * 1e12
+        free_at = np.array([user.free_at for user in self.users], dtype=np.float64)
+        backlog = np.array([user.backlog for user in self.users], dtype=np.float64)
+        complexity = np.array([task["complexity"] for _, task in tasks], dtype=np.float64)
+        data_size = np.array([task["data_size"] for _, task in tasks], dtype=np.float64)
+        enterprise_index = np.array([index[enterprise] for enterprise, _ in tasks], dtype=np.int64)
+
+        # A wave creates millions of small acyclic records; keep the cyclic
+        # collector from repeatedly walking the whole graph meanwhile
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self._allocate_rounds(tasks, d, chains_per_round, user_index, gpu_power, free_at, backlog,
+                                  complexity, data_size, enterprise_index)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        return len(tasks)
+
+    def _allocate_rounds(self, tasks, d, chains_per_round, user_index, gpu_power, free_at, backlog,
+                         complexity, data_size, enterprise_index):
+        """
+        Run the vectorized allocation rounds of allocate_batch and bulk-insert the events.
+        """
+        wait_for_free_user = self.strategy == "earliest_finish"
+        batches = self.micro_batches
+        activation_sizes = self._activation_sizes(d)
+        touched = np.zeros(len(self.users), dtype=bool)
+        events = []
+        for start in range(0, len(tasks), chains_per_round):
+            stop = min(start + chains_per_round, len(tasks))
+            count = stop - start
+            sizes = data_size[start:stop]
+
+            # chain_users[h, j] is the user running hop h of chain j
+            if wait_for_free_user:
+                load = free_at + complexity[start:stop].mean() / d / gpu_power
+            else:
+                load = backlog
+            order = np.argsort(load, kind="stable")[:count * d]
+            chain_users = order.reshape(d, count)
+            touched[order] = True
+            if wait_for_free_user:
+                shares = gpu_power[chain_users] / gpu_power[chain_users].sum(axis=0)
+            else:
+                shares = np.full((d, count), 1.0 / d)
+            portions = shares * complexity[start:stop]
+
+            # Timing arrays are indexed [hop, micro-batch, chain]
+            previous = enterprise_index[start:stop]
+            ready = np.full((batches, count), float(self.current_time))
+            departures = np.empty((d, batches, count))
+            arrivals = np.empty((d, batches, count))
+            starts = np.empty((d, batches, count))
+            finishes = np.empty((d, batches, count))
+            for hop in range(d):
+                users = chain_users[hop]
+                if activation_sizes is not None and hop > 0:
+                    sizes = activation_sizes[hop - 1]
+                departures[hop], arrivals[hop] = self._pipeline_transfers(previous, user_index[users], sizes, ready)
+                duration = portions[hop] / gpu_power[users]
+                gpu_free = free_at[users] if wait_for_free_user else np.full(count, -np.inf)
+                for batch in range(batches):
+                    starts[hop, batch] = np.maximum(arrivals[hop, batch], gpu_free)
+                    finishes[hop, batch] = gpu_free = starts[hop, batch] + duration / batches
+                # Same projection as UserNode.add_task: queued work runs back to back
+                free_at[users] = np.maximum(np.maximum(free_at[users], starts[hop, 0]) + duration, finishes[hop, -1])
+                backlog[users] += duration
+                previous, ready = user_index[users], finishes[hop]
+            if activation_sizes is not None:
+                sizes = activation_sizes[-1]
+            return_departures, returns = self._pipeline_transfers(previous, enterprise_index[start:stop], sizes, ready)
+
+            self._emit_batch(tasks[start:stop], chain_users, portions, departures, arrivals, starts, finishes,
+                             return_departures, returns, events)
+
+        # Subtasks were queued without notifying; re-index every touched user once
+        for position in np.flatnonzero(touched).tolist():
+            self.users[position]._notify_pool()
+        self.event_manager.add_events_bulk(events)
+
+    def _emit_batch(self, tasks, chain_users, portions, departures, arrivals, starts, finishes,
+                    return_departures, returns, events):
+        """
+        Queue subtasks on users and build the events of one batch round.
+        """
+        chain_users = chain_users.T.tolist()
+        portions = portions.T.tolist()
+
+        def per_chain(times):
+            # Flattened per chain, so micro-batch k of hop h is at h * micro_batches + k
+            return times.transpose(2, 0, 1).reshape(len(tasks), -1).tolist()
+
+        departures, arrivals = per_chain(departures), per_chain(arrivals)
+        starts, finishes = per_chain(starts), per_chain(finishes)
+        return_departures, returns = return_departures.T.tolist(), returns.T.tolist()
+        batches = self.micro_batches
+        partials = [{"batch": batch} for batch in range(batches - 1)] + [{}]  # Extra fields of each micro-batch
+        activation_sizes = self.activation_sizes  # Checked by _allocate_rounds
+        users, append = self.users, events.append
+        for j, (enterprise, task) in enumerate(tasks):
+            previous_node = enterprise
+            size = task["data_size"]
+            chain_departures, chain_arrivals = departures[j], arrivals[j]
+            chain_starts, chain_finishes = starts[j], finishes[j]
+            hops = []
+            for hop, (position, portion) in enumerate(zip(chain_users[j], portions[j])):
+                user = users[position]
+                node_id = user.node_id
+                first = hop * batches
+                if activation_sizes is not None and hop > 0:
+                    size = activation_sizes[hop - 1]
+                user_task = SubTask(portion, size, portion / (user.gpu_power * 1e12), task, hop)
+                user.add_task(user_task, chain_starts[first], notify=False)
+                if batches > 1:
+                    user.free_at = max(user.free_at, chain_finishes[first + batches - 1])
+                hops.append((node_id, user_task))
+                if self.executor is None:
+                    edge_to_user = (previous_node, node_id)
+                    piece = size / batches
+                    for k, partial in enumerate(partials, first):
+                        append(Event(chain_arrivals[k], "data_transmission", from_node=previous_node,
+                                     to_node=node_id, size=piece, edge=edge_to_user, task=user_task,
+                                     start=chain_departures[k], **partial))
+                        append(Event(chain_finishes[k], "calculation", node=node_id, task=user_task,
+                                     edge=edge_to_user, start=chain_starts[k], **partial))
+                previous_node = node_id
+            if activation_sizes is not None:
+                size = activation_sizes[-1]
+            if self.executor is not None:
+                self.executor.submit_chain(enterprise, task, hops, self.current_time, size)
                 continue
+            piece = size / batches
+            edge_to_enterprise = (previous_node, enterprise)
+            for departure, arrival, partial in zip(return_departures[j], returns[j], partials):
+                append(Event(arrival, "data_transmission", from_node=previous_node, to_node=enterprise,
+                             size=piece, edge=edge_to_enterprise, task=task, start=departure, **partial))
+
+    def _activation_sizes(self, d):
+        """
+        :param d: Number of users in each chain.
+        :return: The configured activation sizes, checked against the chain length, or None.
+        """
+        if self.activation_sizes is not None and len(self.activation_sizes) != d:
+            raise ValueError(f"Got {len(self.activation_sizes)} activation sizes for chains of {d} users")
+        return self.activation_sizes
+
+    def _chain_sizes(self, task, d):
+        """
+        Data shipped along a chain.
+
+        :return: (list of input sizes in MB for each hop, size in MB returned to the enterprise).
+        """
+        activation_sizes = self._activation_sizes(d)
+        if activation_sizes is None:
+            return [task["data_size"]] * d, task["data_size"]
+        return [task["data_size"]] + activation_sizes[:-1], activation_sizes[-1]
+
+    def _pipeline_transfers(self, sources, destinations, sizes, ready):
+        """
+        Vectorized timing of one hop's micro-batch transfers.
 
-            # Assign the task to the chain of users
-            self._assign_chain(enterprise, task, available_users)
+        Micro-batch k leaves once it is ready and the link has finished
+        sending micro-batch k - 1, so the link carries one at a time while
+        latency overlaps. With a single micro-batch this is the plain
+        LinkModel transfer time.
 
+        :param sources: Integer array of source node indices, one per chain.
+        :param destinations: Integer array of destination node indices.
+        :param sizes: Data sizes in MB of the whole transfer, broadcastable to the index arrays.
+        :param ready: Array [micro-batch, chain] of times the micro-batches are ready to leave.
+        :return: (departure times, arrival times), both shaped like ``ready``.
+        """
+        bandwidth, latency = self.link_model.links(sources, destinations)
+        occupancy = np.asarray(sizes) / len(ready) / bandwidth
+        departures = np.empty_like(ready)
+        link_free = np.full(ready.shape[1], -np.inf)
+        for batch in range(len(ready)):
+            departures[batch] = link_free = np.maximum(ready[batch], link_free)
+            link_free = link_free + occupancy
+        return departures, departures + (latency + occupancy)
 
+    def projected_free_time(self, user):
+        """
+        Time at which a user finishes all work allocated to it so far.
 
-    def _assign_chain(self, enterprise_id, task, chain_users):
+        :param user: The UserNode.
+        :return: Projected free time in seconds.
+        """
+        return user.free_at
+
+    def allocate_task(self, enterprise, task, d=3, candidates=None):
+        """
+        Allocate a single task to a chain of users picked by the allocation strategy.
+
+        :param enterprise: Identifier of the enterprise that owns the task.
+        :param task: The task to allocate.
+        :param d: Number of users in the chain.
+        :param candidates: UserNodes to pick the chain from, least loaded first;
+            None to take them from the user pool.
+        :return: True if a chain was assigned, False if too few users were available.
+        """
+        portions = None
+        if self.strategy == "earliest_finish":
+            available_users, portions = self._earliest_finish_chain(enterprise, task, d, candidates)
+        else:
+            users = self.user_pool.smallest(d) if candidates is None else candidates[:d]
+            available_users = [(user.node_id, user) for user in users]
+
+        if self.verbose:
+            print(f"available users : {[( available_user[1].node_id,available_user[1].queue) for available_user in available_users]}")
+
+        if len(available_users) < d:
+            if self.verbose:
+                print(f"Not enough devices available for chain from {enterprise}")
+            return False
+
+        # Assign the task to the chain of users
+        self._assign_chain(enterprise, task, available_users, portions)
+        return True
+
+    def _earliest_finish_chain(self, enterprise, task, d, candidates=None):
+        """
+        Pick a chain hop by hop, each time taking the candidate that finishes first.
+
+        Candidates default to the ``candidate_factor * d`` users that become
+        free earliest. Finish times are estimated with an equal share per hop,
+        since the final split depends on the chain.
+
+        :return: (chain users as (node_id, UserNode) pairs, complexity portions),
+            or ([], None) if too few users are available.
+        """
+        if candidates is None:
+            candidates = self.user_pool.smallest(self.candidate_factor * d)
+        else:
+            candidates = list(candidates)
+        if len(candidates) < d:
+            return [(user.node_id, user) for user in candidates], None
+
+        share = task["complexity"] / d
+        previous_node, ready_time = enterprise, self.current_time
+        chain = []
+        for _ in range(d):
+            best_user, best_finish = None, None
+            for user in candidates:
+                arrival = ready_time + self.link_model.transfer_time(previous_node, user.node_id, task["data_size"])
+                finish = max(arrival, self.projected_free_time(user)) + share / (user.gpu_power * 1e12)
+                if best_finish is None or finish < best_finish:
+                    best_user, best_finish = user, finish
+            candidates.remove(best_user)
+            chain.append((best_user.node_id, best_user))
+            previous_node, ready_time = best_user.node_id, best_finish
+
+        total_power = sum(user.gpu_power for _, user in chain)
+        portions = [task["complexity"] * user.gpu_power / total_power for _, user in chain]
+        return chain, portions
+
+    def _assign_chain(self, enterprise_id, task, chain_users, portions=None):
         """
         Assign a chain of devices to process a task, prioritizing users with shorter queues.
+
+        :param portions: Complexity assigned to each user; defaults to an equal split.
         """
         previous_node = enterprise_id
-        portion_size = task["complexity"] / len(chain_users)
-        current_time = self.current_time
+        if portions is None:
+            portions = [task["complexity"] / len(chain_users)] * len(chain_users)
+        wait_for_free_user = self.strategy == "earliest_finish"
+        batches = self.micro_batches
+        sizes, return_size = self._chain_sizes(task, len(chain_users))
+        ready = [self.current_time] * batches  # Time each micro-batch is ready to leave the previous node
+        hops = []
 
-        for i, (node_id, user_data) in enumerate(chain_users):
-            transmission_time = task["data_size"] / random.randint(10, 100)  # Simulated bandwidth
+        for hop, ((node_id, user_data), portion_size) in enumerate(zip(chain_users, portions)):
+            transfers = self._micro_batch_transfers(previous_node, node_id, sizes[hop], ready)
             gpu_time = portion_size / (user_data.gpu_power * 1e12)
+            gpu_free = user_data.free_at if wait_for_free_user else None
+            starts, ready = [], []
+            for _, arrival_time in transfers:
+                start_time = arrival_time if gpu_free is None else max(arrival_time, gpu_free)
+                gpu_free = start_time + gpu_time / batches
+                starts.append(start_time)
+                ready.append(gpu_free)
 
             # Add task to user's queue
-            user_task = {
-                "portion": portion_size,
-                "data_size": task["data_size"],
-                "duration": gpu_time
-            }
-            user_data.add_task(user_task, current_time + transmission_time)
-
-            # Transmission to the user
-            edge_to_user = (previous_node, node_id)
-            self.event_manager.add_event(
-                current_time + transmission_time,
-                "data_transmission",
-                from_node=previous_node,
-                to_node=node_id,
-                size=task["data_size"],
-                edge=edge_to_user
-            )
+            user_task = SubTask(portion_size, sizes[hop], gpu_time, task, hop)
+            if batches == 1:
+                user_data.add_task(user_task, starts[0])
+            else:
+                # Waiting between micro-batches can make the hop outlast its GPU time
+                user_data.add_task(user_task, starts[0], notify=False)
+                user_data.free_at = max(user_data.free_at, ready[-1])
+                user_data._notify_pool()
+            hops.append((node_id, user_task))
 
-            # Calculation at the user
-            self.event_manager.add_event(
-                current_time + transmission_time + gpu_time,
-                "calculation",
-                node=node_id,
-                task={"portion": portion_size, "total_task": task},
-                edge=edge_to_user
-            )
+            if self.executor is None:
+                edge_to_user = (previous_node, node_id)
+                for batch, ((departure_time, arrival_time), start_time, finish_time) in enumerate(
+                        zip(transfers, starts, ready)):
+                    partial = {"batch": batch} if batch < batches - 1 else {}
+
+                    # Transmission to the user
+                    self.event_manager.add_event(
+                        arrival_time,
+                        "data_transmission",
+                        from_node=previous_node,
+                        to_node=node_id,
+                        size=sizes[hop] / batches,
+                        edge=edge_to_user,
+                        task=user_task,
+                        start=departure_time,
+                        **partial
+                    )
+
+                    # Calculation at the user
+                    self.event_manager.add_event(
+                        finish_time,
+                        "calculation",
+                        node=node_id,
+                        task=user_task,
+                        edge=edge_to_user,
+                        start=start_time,
+                        **partial
+                    )
 
-            # Update current time for this chain
-            current_time += transmission_time + gpu_time
             previous_node = node_id
 
+        if self.executor is not None:
+            self.executor.submit_chain(enterprise_id, task, hops, self.current_time, return_size)
+            return
+
         # Transmission back to the enterprise
         edge_to_enterprise = (previous_node, enterprise_id)
-        self.event_manager.add_event(
-            current_time,
-            "data_transmission",
-            from_node=previous_node,
-            to_node=enterprise_id,
-            size=task["data_size"],
-            edge=edge_to_enterprise
-        )
+        transfers = self._micro_batch_transfers(previous_node, enterprise_id, return_size, ready)
+        for batch, (departure_time, arrival_time) in enumerate(transfers):
+            partial = {"batch": batch} if batch < batches - 1 else {}
+            self.event_manager.add_event(
+                arrival_time,
+                "data_transmission",
+                from_node=previous_node,
+                to_node=enterprise_id,
+                size=return_size / batches,
+                edge=edge_to_enterprise,
+                task=task,
+                start=departure_time,
+                **partial
+            )
+
+    def _micro_batch_transfers(self, source, destination, size, ready):
+        """
+        Timing of one hop's micro-batch transfers; see _pipeline_transfers.
+
+        :param size: Data size in MB of the whole transfer.
+        :param ready: Times the micro-batches are ready to leave the source.
+        :return: List of (departure time, arrival time) per micro-batch.
+        """
+        piece = size / len(ready)
+        transfer_time = self.link_model.transfer_time(source, destination, piece)
+        if len(ready) == 1:
+            return [(ready[0], ready[0] + transfer_time)]
+        bandwidth, _ = self.link_model.link(source, destination)
+        transfers, link_free = [], None
+        for ready_time in ready:
+            departure_time = ready_time if link_free is None else max(ready_time, link_free)
+            link_free = departure_time + piece / bandwidth
+            transfers.append((departure_time, departure_time + transfer_time))
+        return transfers
@@ -1,44 +1,119 @@
+from collections import deque
+
+GPU_POWER_SCALE = 0.05  # Fraction of the nominal GPU power available to the simulation
+
+
 class UserNode:
     """
     Represents a user node in the graph (e.g., an iPhone with GPU capabilities).
     """
+    __slots__ = ("node_id", "gpu_power", "bandwidth", "latency", "queue", "active_task", "pools",
+                 "backlog", "free_at")
+
     def __init__(self, node_id, gpu_power, bandwidth, latency):
         self.node_id = node_id
-        self.gpu_power = gpu_power * 0.05  # Reduce GPU power by a factor
+        self.gpu_power = gpu_power * GPU_POWER_SCALE  # Reduce GPU power by a factor
         self.bandwidth = bandwidth
         self.latency = latency
-        self.queue = []  # Queue for tasks
+        self.queue = deque()  # Queue for tasks
         self.active_task = None  # Current task being processed
+        self.pools = []  # UserPools indexing this user's load
+        self.backlog = 0.0  # Seconds of GPU work queued or in progress
+        self.free_at = 0.0  # Projected time at which all that work is done
 
     def get_priority(self):
         """
-        Calculate the priority of the user based on queue length and activity.
-        """
-        return len(self.queue) + (1 if self.active_task else 0)
-
+        Calculate the priority of the user from its outstanding work.
 
+        :return: Seconds of GPU work queued or in progress.
+        """
+        return self.backlog
 
-    def add_task(self, task, start_time):
+    def add_task(self, task, start_time, notify=True):
         """
         Add a task to the user's queue.
+
+        :param task: The task, with a "duration" in seconds.
+        :param start_time: Earliest time the task can start.
+        :param notify: Re-index the user in its pool; callers queueing many
+            tasks at once can pass False and call _notify_pool themselves.
         """
         self.queue.append((task, start_time))
+        duration = task["duration"]
+        self.backlog += duration
+        self.free_at = max(self.free_at, start_time) + duration
+        if notify:
+            self._notify_pool()
+
+    def remove_task(self, task):
+        """
+        Take a task that has not started yet back out of the queue, e.g. to move it to another user.
+
+        :param task: The queued task.
+        """
+        self._dequeue(task)
+        duration = task["duration"]
+        self.backlog -= duration
+        self.free_at -= duration  # Queued work runs back to back, so the rest moves up
+        if not self.queue and self.active_task is None:
+            self.backlog = 0.0
+        self._notify_pool()
 
     def process_next_task(self, current_time):
         """
         Process the next task in the queue if available.
         """
         if self.active_task is None and self.queue:
-            self.active_task, start_time = self.queue.pop(0)
+            self.active_task, start_time = self.queue.popleft()
             completion_time = current_time + self.active_task["duration"]
+            self.free_at = max(self.free_at, completion_time)
+            self._notify_pool()
 
             # Return the task and its completion time
             return self.active_task, completion_time
         return None, None
 
+    def finish_task(self, task):
+        """
+        Mark a specific task as done, whether it was active or still queued.
+
+        Static schedules time every subtask up front, and their calculation
+        events say which subtask ended; with overlapping subtasks that need
+        not be the head of the queue. The projected free time is unchanged,
+        since the work ran as projected.
+
+        :param task: The finished task.
+        """
+        if self.active_task is task:
+            self.active_task = None
+        else:
+            self._dequeue(task)
+        self.backlog -= task["duration"]
+        if not self.queue and self.active_task is None:
+            self.backlog = 0.0  # Idle; also drops accumulated rounding error
+        self._notify_pool()
 
     def complete_task(self):
         """
         Mark the current task as complete.
         """
-        self.active_task = None
+        if self.active_task is not None:
+            self.backlog -= self.active_task["duration"]
+            self.active_task = None
+        if not self.queue:
+            self.backlog = 0.0  # Idle; also drops accumulated rounding error
+        self._notify_pool()
+
+    def _dequeue(self, task):
+        for position, (queued, _) in enumerate(self.queue):
+            if queued is task:
+                del self.queue[position]
+                return
+        raise ValueError(f"{self.node_id} has no queued task {task!r}")
+
+    def _notify_pool(self):
+        """
+        Let every indexing pool know that this user's load changed.
+        """
+        for pool in self.pools:
+            pool.update(self)
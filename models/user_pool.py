@@ -0,0 +1,93 @@
+import heapq
+import itertools
+
+
+class UserPool:
+    """
+    Priority index over user nodes, ordered by load.
+
+    Users notify the pool whenever their load changes, so picking the ``d``
+    least loaded users costs O(d log N) instead of scanning and sorting every
+    user node for each task. Outdated heap entries are invalidated lazily and
+    the heap is compacted once they outnumber the live ones.
+    """
+    def __init__(self, key=None):
+        """
+        Initialize an empty pool.
+
+        :param key: Function mapping a UserNode to its load; defaults to UserNode.get_priority.
+        """
+        self.key = key or (lambda user: user.get_priority())
+        self._heap = []
+        self._entries = {}  # node_id -> live heap entry
+        self._sequence = itertools.count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, node_id):
+        return node_id in self._entries
+
+    def add(self, user):
+        """
+        Register a user node with the pool.
+
+        A user may belong to several pools, e.g. when two allocators share a
+        graph; it keeps every one of them up to date.
+
+        :param user: The UserNode to index.
+        """
+        if self not in user.pools:
+            user.pools.append(self)
+        self.update(user)
+
+    def remove(self, user):
+        """
+        Remove a user node from the pool.
+
+        :param user: The UserNode to drop.
+        """
+        entry = self._entries.pop(user.node_id, None)
+        if entry is not None:
+            entry[-1] = None
+        if self in user.pools:
+            user.pools.remove(self)
+
+    def update(self, user):
+        """
+        Re-index a user node after its load changed.
+
+        :param user: The UserNode whose load changed.
+        """
+        old_entry = self._entries.get(user.node_id)
+        if old_entry is not None:
+            old_entry[-1] = None  # Invalidate the outdated entry
+        entry = [self.key(user), next(self._sequence), user]
+        self._entries[user.node_id] = entry
+        heapq.heappush(self._heap, entry)
+
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._compact()
+
+    def smallest(self, d):
+        """
+        Get the ``d`` least loaded users without removing them from the pool.
+
+        :param d: Number of users to return.
+        :return: List of UserNode objects, least loaded first.
+        """
+        selected = []
+        while self._heap and len(selected) < d:
+            entry = heapq.heappop(self._heap)
+            if entry[-1] is not None:
+                selected.append(entry)
+        for entry in selected:
+            heapq.heappush(self._heap, entry)
+        return [entry[-1] for entry in selected]
+
+    def _compact(self):
+        """
+        Rebuild the heap from live entries only.
+        """
+        self._heap = list(self._entries.values())
+        heapq.heapify(self._heap)
@@ -0,0 +1,124 @@
+import csv
+
+import numpy as np
+
+
+def poisson_task_source(rate, complexity_range=(1e10, 5e11), data_size_range=(5, 50),
+                        seed=None, start_time=0.0, horizon=None, block_size=1024):
+    """
+    Lazily generate a Poisson stream of tasks.
+
+    Inter-arrival gaps and task sizes are drawn in blocks with NumPy, but only
+    one block is alive at a time, so memory does not grow with the horizon.
+
+    :param rate: Mean number of tasks per second.
+    :param complexity_range: (min, max) task complexity in FLOPS.
+    :param data_size_range: (min, max) task data size in MB.
+    :param seed: Seed for the random generator.
+    :param start_time: Simulation time the stream starts at.
+    :param horizon: Stop once arrivals pass this simulation time; None for an endless stream.
+    :param block_size: Number of arrivals drawn per NumPy call.
+    :return: Iterator of (time, complexity, data_size) tuples.
+    """
+    rng = np.random.default_rng(seed)
+    time = start_time
+    while True:
+        times = time + np.cumsum(rng.exponential(1.0 / rate, size=block_size))
+        complexities = rng.uniform(*complexity_range, size=block_size)
+        data_sizes = rng.uniform(*data_size_range, size=block_size)
+        for arrival in zip(times.tolist(), complexities.tolist(), data_sizes.tolist()):
+            if horizon is not None and arrival[0] > horizon:
+                return
+            yield arrival
+        time = times[-1]
+
+
+def trace_task_source(path):
+    """
+    Lazily read tasks from a CSV trace.
+
+    The file needs "time", "complexity" and "data_size" columns and must be
+    sorted by time.
+
+    :param path: Path to the CSV trace.
+    :return: Iterator of (time, complexity, data_size) tuples.
+    """
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            yield float(row["time"]), float(row["complexity"]), float(row["data_size"])
+
+
+class TaskArrivalProcess:
+    """
+    Injects tasks into the simulation as simulation time advances.
+
+    Each enterprise has a task source; only its next arrival is scheduled on
+    the timeline, as a "task_arrival" event. When that event is processed the
+    task is created, allocated at the arrival time (or handed to an
+    OnlineScheduler) and the following arrival is scheduled. Memory is
+    bounded by in-flight work, not total workload.
+    """
+    def __init__(self, graph, event_manager, allocator, sources, chain_length=3, scheduler=None):
+        """
+        :param graph: The graph representing the network.
+        :param event_manager: The event manager holding the timeline.
+        :param allocator: TaskAllocator used to place arriving tasks.
+        :param sources: Mapping of enterprise id to an iterator of (time, complexity, data_size).
+        :param chain_length: Number of users in each task's chain.
+        :param scheduler: OnlineScheduler that queues arriving tasks until users free up;
+            None to allocate them on arrival.
+        """
+        self.graph = graph
+        self.event_manager = event_manager
+        self.allocator = allocator
+        self.sources = {enterprise: iter(source) for enterprise, source in sources.items()}
+        self.chain_length = chain_length
+        self.scheduler = scheduler
+        self.arrived_tasks = 0
+        self.dropped_tasks = 0
+
+    def attach(self, engine):
+        """
+        Register the arrival handler with an engine and schedule the first arrivals.
+
+        :param engine: SimulationEngine (or DynamicSimulator) processing the timeline.
+        """
+        engine.handlers["task_arrival"] = self.handle_arrival
+        for enterprise in self.sources:
+            self._schedule_next(enterprise)
+
+    def handle_arrival(self, event):
+        """
+        Create and allocate an arriving task, then schedule the next one.
+
+        :param event: The "task_arrival" event.
+        """
+        enterprise = event["node"]
+        enterprise_node = self.graph.nodes[enterprise]["data"]
+        task = enterprise_node.create_task(event["complexity"], event["data_size"])
+        self.arrived_tasks += 1
+
+        if self.scheduler is not None:
+            self.scheduler.submit(enterprise, task, event["time"])
+        else:
+            self.allocator.current_time = event["time"]
+            if not self.allocator.allocate_task(enterprise, task, self.chain_length):
+                self.dropped_tasks += 1
+
+        self._schedule_next(enterprise)
+
+    def _schedule_next(self, enterprise):
+        """
+        Put the next arrival of an enterprise's source on the timeline.
+        """
+        arrival = next(self.sources[enterprise], None)
+        if arrival is None:
+            return
+        time, complexity, data_size = arrival
+        self.event_manager.add_event(
+            time,
+            "task_arrival",
+            node=enterprise,
+            complexity=complexity,
+            data_size=data_size,
+        )
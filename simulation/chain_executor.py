@@ -0,0 +1,239 @@
+import heapq
+
+from models.flow_network import FlowNetwork
+from models.link_model import LinkModel
+
+
+class ChainExecutor:
+    """
+    Runs allocated task chains inside the event loop over a shared network.
+
+    The static allocator precomputes every transfer as if it had its links to
+    itself. With an executor, the allocator only picks the chain and queues
+    the subtasks; the transfers then become flows on a FlowNetwork, where
+    concurrent transfers out of the same node or into the same node share its
+    capacity. A user starts a subtask once the subtask reached the head of its
+    queue and its input data arrived, and hands the result on to the next hop
+    (or back to the enterprise) when the computation ends.
+
+    The executor emits the usual events: "data_transmission" when data
+    arrives and "calculation" when a computation ends, both with ``start``
+    set, so traces, metrics and rendering work unchanged. Flow progress is
+    driven by "flow_completion" wake-up events; transfers started at the same
+    time are rated together by the wake-up scheduled for that time.
+
+    Without ``contention`` every transfer has its link to itself, as in the
+    static schedule, but users still run their queues live.
+
+    With ``work_stealing``, a user that finishes a computation and finds its
+    queue empty takes a waiting subtask from one of the most backlogged
+    users. Only subtasks whose input already arrived are stolen, last queued
+    first, and only if shipping the input over and computing it on the idle
+    user finishes earlier than waiting in the victim's queue. The input is
+    then sent to the thief as a "data_transmission" carrying the extra
+    ``stolen_from`` field.
+    """
+    def __init__(self, graph, event_manager, link_model=None, contention=True, work_stealing=False,
+                 steal_candidates=4):
+        """
+        :param graph: The graph representing the network.
+        :param event_manager: The event manager holding the timeline.
+        :param link_model: LinkModel for node and link bandwidths; defaults to the graph's shared model.
+        :param contention: Share node bandwidth between concurrent transfers on a FlowNetwork;
+            False to give every transfer the plain LinkModel transfer time.
+        :param work_stealing: Let users that run out of work steal subtasks from backlogged users.
+        :param steal_candidates: Number of most backlogged users an idle user tries to steal from.
+        """
+        self.graph = graph
+        self.event_manager = event_manager
+        self.link_model = link_model or LinkModel.for_graph(graph)
+        self.network = FlowNetwork(self.link_model) if contention else None
+        self.routes = {}  # SubTask -> (node its result goes to, SubTask or Task sent there, result size)
+        self.arrived = {}  # SubTask -> edge its input arrived on, until it starts
+        self.peak_flows = 0
+        self.work_stealing = work_stealing
+        self.steal_candidates = steal_candidates
+        self.waiting = {}  # User id -> number of its subtasks whose input arrived, until they start
+        self.busy_until = {}  # User id -> time its active subtask completes
+        self.migrating = {}  # Stolen SubTask -> user it was taken from, until its input arrives
+        self.steals = 0
+        self.stolen_mb = 0.0
+        self._wakeup = None  # Time of the earliest pending "flow_completion" event
+        self._deliver = None
+
+    def attach(self, engine):
+        """
+        Take over transfer and calculation handling of an engine.
+
+        :param engine: SimulationEngine (or DynamicSimulator) processing the timeline.
+        """
+        self._deliver = engine.handlers.get("data_transmission")
+        engine.handlers["data_transmission"] = self.handle_data_transmission
+        engine.handlers["calculation"] = self.handle_calculation
+        engine.handlers["flow_completion"] = self.handle_flow_completion
+
+    def submit_chain(self, enterprise, task, hops, time, return_size=None):
+        """
+        Start executing an allocated chain.
+
+        The subtasks must already be queued on their users (UserNode.add_task).
+        Each subtask's ``data_size`` is the input it is sent.
+
+        :param enterprise: Identifier of the enterprise that owns the task.
+        :param task: The Task.
+        :param hops: List of (user id, SubTask) pairs in chain order.
+        :param time: Simulation time the task leaves the enterprise.
+        :param return_size: Size in MB of the result sent back; defaults to the task's data size.
+        """
+        if return_size is None:
+            return_size = task["data_size"]
+        for (node_id, subtask), (next_node, next_payload) in zip(hops, hops[1:] + [(enterprise, task)]):
+            size = return_size if next_payload is task else next_payload["data_size"]
+            self.routes[subtask] = (next_node, next_payload, size)
+        first_node, first_subtask = hops[0]
+        self._send(enterprise, first_node, first_subtask["data_size"], time, first_subtask)
+
+    def handle_flow_completion(self, event):
+        """
+        Deliver every flow whose data is through, after its link latency.
+
+        :param event: The "flow_completion" wake-up event.
+        """
+        now = event.time
+        if self._wakeup is not None and now >= self._wakeup:
+            self._wakeup = None
+        for flow in self.network.pop_completed(now):
+            self._schedule_arrival(flow.updated_at + flow.latency, flow.source, flow.destination, flow.size,
+                                   flow.payload, flow.start)
+        self._schedule_wakeup(self.network.next_completion())
+
+    def handle_data_transmission(self, event):
+        """
+        Record an arrival and start the receiving user if it was waiting for it.
+
+        :param event: The "data_transmission" event.
+        """
+        if self._deliver is not None:
+            self._deliver(event)
+        subtask = event.task
+        if subtask in self.routes:
+            self.arrived[subtask] = event.edge
+            self.waiting[event.to_node] = self.waiting.get(event.to_node, 0) + 1
+            self._start_next(event.to_node, event.time)
+
+    def handle_calculation(self, event):
+        """
+        Send a finished subtask's result on and start the user's next subtask.
+
+        :param event: The "calculation" event.
+        """
+        node, subtask = event.node, event.task
+        route = self.routes.pop(subtask, None)
+        if route is None:
+            return
+        user = self.graph.nodes[node]["data"]
+        user.complete_task()
+        next_node, payload, size = route
+        self._send(node, next_node, size, event.time, payload)
+        self._start_next(node, event.time)
+        if self.work_stealing and user.active_task is None and not user.queue:
+            self._steal(node, event.time)
+
+    def _start_next(self, node, now):
+        """
+        Start the subtask at the head of a user's queue if the user is idle and its input arrived.
+        """
+        user = self.graph.nodes[node]["data"]
+        if user.active_task is not None or not user.queue or user.queue[0][0] not in self.arrived:
+            return
+        subtask, completion_time = user.process_next_task(now)
+        self.busy_until[node] = completion_time
+        waiting = self.waiting[node] - 1
+        if waiting:
+            self.waiting[node] = waiting
+        else:
+            del self.waiting[node]
+        self.event_manager.add_event(
+            completion_time,
+            "calculation",
+            node=node,
+            task=subtask,
+            edge=self.arrived.pop(subtask),
+            start=now,
+        )
+
+    def _steal(self, thief, now):
+        """
+        Move a waiting subtask from a backlogged user to an idle one, if that makes it finish earlier.
+
+        :return: True if a subtask was stolen.
+        """
+        users = self.graph.nodes
+        thief_user = users[thief]["data"]
+        speed = thief_user.gpu_power * 1e12
+        victims = heapq.nlargest(self.steal_candidates, self.waiting,
+                                 key=lambda node: users[node]["data"].backlog)
+        for victim in victims:
+            victim_user = users[victim]["data"]
+            # Projected finish of every queued subtask in the victim's queue
+            finish = max(self.busy_until.get(victim, now), now)
+            candidate = None
+            for subtask, _ in victim_user.queue:
+                finish += subtask["duration"]
+                if subtask in self.arrived:
+                    candidate = (subtask, finish)  # The last one queued has the most to gain
+            if candidate is None:
+                continue
+            subtask, victim_finish = candidate
+            size = subtask["data_size"]
+            thief_finish = now + self.link_model.transfer_time(victim, thief, size) + subtask["portion"] / speed
+            if thief_finish >= victim_finish:
+                continue
+
+            victim_user.remove_task(subtask)
+            self.arrived.pop(subtask)
+            waiting = self.waiting[victim] - 1
+            if waiting:
+                self.waiting[victim] = waiting
+            else:
+                del self.waiting[victim]
+            subtask.duration = subtask["portion"] / speed
+            thief_user.add_task(subtask, now)
+            self.migrating[subtask] = victim
+            self.steals += 1
+            self.stolen_mb += size
+            self._send(victim, thief, size, now, subtask)
+            return True
+        return False
+
+    def _schedule_arrival(self, time, source, destination, size, payload, start):
+        victim = self.migrating.pop(payload, None)
+        extra = {} if victim is None else {"stolen_from": victim}
+        self.event_manager.add_event(
+            time,
+            "data_transmission",
+            from_node=source,
+            to_node=destination,
+            size=size,
+            edge=(source, destination),
+            task=payload,
+            start=start,
+            **extra
+        )
+
+    def _send(self, source, destination, size, now, payload):
+        if self.network is None:
+            self._schedule_arrival(now + self.link_model.transfer_time(source, destination, size),
+                                   source, destination, size, payload, now)
+            return
+        self.network.add_flow(source, destination, size, now, payload)
+        self.peak_flows = max(self.peak_flows, len(self.network))
+        self._schedule_wakeup(now)  # Rates the new flow together with others started now
+
+    def _schedule_wakeup(self, time):
+        """
+        Make sure a "flow_completion" event is pending at or before a time.
+        """
+        if time is not None and (self._wakeup is None or time < self._wakeup):
+            self._wakeup = time
+            self.event_manager.add_event(time, "flow_completion")
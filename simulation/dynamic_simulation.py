@@ -1,106 +1,179 @@
 import matplotlib.pyplot as plt
+from matplotlib.animation import FuncAnimation
 from matplotlib.widgets import Button
-import networkx as nx
-import random
+import time as wallclock
+from simulation.engine import SimulationEngine
+from simulation.export import export_replay
+from simulation.layout import fixed_layout
+from simulation.renderer import GraphRenderer
 
 
-class DynamicSimulator:
+class DynamicSimulator(SimulationEngine):
     """
     Simulates the graph dynamically by processing events.
     """
-    def __init__(self, graph, event_manager):
+    def __init__(self, graph, event_manager, verbose=True, layout_seed=0, cluster_users=False, cache_dir=None):
         """
         Initialize the simulator.
 
         :param graph: The initial graph.
         :param event_manager: The event manager containing the global timeline of events.
-        """
-        self.graph = graph
-        self.event_manager = event_manager  # Store the event manager
+        :param verbose: Print a line for every processed event.
+        :param layout_seed: Seed of the node layout.
+        :param cluster_users: Group users under the enterprise they serve.
+        :param cache_dir: Directory of cached layouts, e.g. layout.DEFAULT_CACHE_DIR; None to always compute it.
+        """
+        super().__init__(graph, event_manager, verbose=verbose)
+        self.layout_seed = layout_seed
+        self.cluster_users = cluster_users
+        self.cache_dir = cache_dir
         self.positions = self._generate_fixed_positions()
-        
+        self.renderer = None
+
     def _generate_fixed_positions(self):
         """
-        Generate fixed positions for nodes: enterprises on top, users dispersed at the bottom.
-        """
-        positions = {}
-        users = [n for n, d in self.graph.nodes(data=True) if d["type"] == "user"]
-        enterprises = [n for n, d in self.graph.nodes(data=True) if d["type"] == "enterprise"]
-
-        # Position enterprises in a horizontal line at the top
-        for i, enterprise in enumerate(enterprises):
-            positions[enterprise] = (i * 2, 5)  # Space enterprises equally
+        Generate fixed positions for nodes: enterprises on top, users packed at the bottom.
 
-        # Position users dispersed randomly at the bottom
-        for user in users:
-            positions[user] = (random.uniform(-5, 10), random.uniform(-5, -3))
-
-        return positions
+        The layout is deterministic for a given graph and seed. With a
+        ``cache_dir`` it is cached on disk, so replays and exports of the same
+        graph share it.
+        """
+        return fixed_layout(self.graph, seed=self.layout_seed, cluster=self.cluster_users,
+                            cache_dir=self.cache_dir)
 
     def next_frame(self, event=None):
         """
         Process the next event in the global timeline and update the graph.
         """
-        next_event = self.event_manager.get_next_event()
+        next_event = self.step()
         if not next_event:
             print("Simulation complete.")
             return
 
-        if next_event["type"] == "data_transmission":
-            self._handle_data_transmission(next_event)
-        elif next_event["type"] == "calculation":
-            self._handle_calculation(next_event)
-
         self._draw_graph(next_event)
 
+    def advance_to(self, time, max_events=None):
+        """
+        Process the events scheduled at or before a simulation time.
+
+        :param time: Simulation time to stop at (inclusive).
+        :param max_events: Stop early after this many events.
+        :return: List of the processed events.
+        """
+        start = wallclock.perf_counter()
+        event_manager = self.event_manager
+        processed = []
+        while max_events is None or len(processed) < max_events:
+            event = event_manager.peek()
+            if event is None or event.time > time:
+                break
+            self.process_event(event_manager.get_next_event())
+            processed.append(event)
+        self.wall_time += wallclock.perf_counter() - start
+        return processed
+
+    def playback_frames(self, fps=30, speed=1.0, skip_frames=True, max_events_per_frame=None,
+                        clock=wallclock.perf_counter):
+        """
+        Generate animation frames by slicing the timeline in simulation time.
+
+        Each frame covers ``speed / fps`` seconds of simulation time and
+        processes every event in that slice. With skip_frames, the slice
+        follows the wall clock instead: if drawing a frame took longer than
+        1 / fps, the next frame covers the missed time too, so playback keeps
+        pace with ``speed`` and slow frames are dropped rather than queued.
+        Stretches of simulation time without events are jumped over.
+
+        :param fps: Target frames per second.
+        :param speed: Simulation seconds played per wall-clock second.
+        :param skip_frames: Merge frames that could not be drawn in time.
+        :param max_events_per_frame: Cap on events per frame; playback falls behind instead.
+        :param clock: Wall-clock function, in seconds.
+        :return: Generator of (events, simulation time) pairs, ending with the timeline.
+        """
+        frame_interval = 1.0 / fps
+        sim_time = self.current_time
+        last_frame = clock()
+        while True:
+            next_event = self.event_manager.peek()
+            if next_event is None:
+                return
+
+            now = clock()
+            elapsed = max(now - last_frame, frame_interval) if skip_frames else frame_interval
+            last_frame = now
+            target = max(sim_time + elapsed * speed, next_event.time)
+
+            events = self.advance_to(target, max_events_per_frame)
+            capped = max_events_per_frame is not None and len(events) == max_events_per_frame
+            sim_time = self.current_time if capped else target
+            yield events, sim_time
+
+    def animate(self, ax=None, fps=30, speed=1.0, skip_frames=True, max_events_per_frame=None):
+        """
+        Create a FuncAnimation that plays the timeline back.
+
+        Only the overlay artists are blitted on each frame; the graph itself is
+        drawn once. Keep a reference to the returned animation while it plays.
+
+        :param ax: Matplotlib Axes to draw into; defaults to the current Axes.
+        :param fps: Target frames per second.
+        :param speed: Simulation seconds played per wall-clock second.
+        :param skip_frames: Merge frames that could not be drawn in time.
+        :param max_events_per_frame: Cap on events per frame.
+        :return: The FuncAnimation.
+        """
+        ax = ax or plt.gca()
+        self.renderer = GraphRenderer(self.graph, self.positions, ax)
+        self.renderer.draw_static()
+
+        def draw_frame(frame):
+            events, sim_time = frame
+            return self.renderer.set_frame(events, current_time=sim_time)
+
+        return FuncAnimation(
+            ax.figure,
+            draw_frame,
+            frames=self.playback_frames(fps, speed, skip_frames, max_events_per_frame),
+            init_func=lambda: self.renderer.set_frame([], current_time=self.current_time),
+            interval=1000.0 / fps,
+            blit=True,
+            repeat=False,
+            cache_frame_data=False,
+        )
 
-
-    def _handle_data_transmission(self, event):
-        """
-        Handle the transmission of data.
+    def play(self, fps=30, speed=1.0, skip_frames=True, max_events_per_frame=None):
         """
-        from_node, to_node = event["from_node"], event["to_node"]
-        size = event["size"]
-
-        # Ensure the edge exists temporarily
-        if not self.graph.has_edge(from_node, to_node):
-            self.graph.add_edge(
-                from_node, to_node,
-                bandwidth=random.randint(10, 100)  # Assign random bandwidth
-            )
-
-        # Get bandwidth and calculate transmission time
-        bandwidth = self.graph.edges[from_node, to_node]["bandwidth"]
-        transmission_time = size / bandwidth
+        Play the simulation back as an animation instead of stepping it by hand.
 
-        print(f"Transmission from {from_node} to {to_node}, Size: {size:.2f} MB, "
-            f"Bandwidth: {bandwidth} Mbps, Time: {transmission_time:.2f} seconds.")
-
-            # Remove the edge after the event
-        #self.graph.remove_edge(from_node, to_node)
-
-    def _handle_calculation(self, event):
-        """
-        Handle the calculation event.
+        :param fps: Target frames per second.
+        :param speed: Simulation seconds played per wall-clock second.
+        :param skip_frames: Merge frames that could not be drawn in time.
+        :param max_events_per_frame: Cap on events per frame.
+        :return: The FuncAnimation, once the window is closed.
         """
-        node = event["node"]
-        user_data = self.graph.nodes[node]["data"]
+        fig, ax = plt.subplots(figsize=(12, 8))
+        animation = self.animate(ax, fps, speed, skip_frames, max_events_per_frame)
+        plt.show()
+        return animation
 
-        # Complete the current task
-        user_data.complete_task()
+    def export(self, path, fps=30, speed=1.0, workers=None, max_events_per_frame=None, figsize=(12, 8), dpi=100):
+        """
+        Render the timeline off-screen to an MP4, a GIF or a PNG sequence.
 
-        # Process the next task in the queue
-        next_task, completion_time = user_data.process_next_task(event["time"])
-        if next_task:
-            self.event_manager.add_event(
-                completion_time,
-                "calculation",
-                node=node,
-                task=next_task,
-            )
+        Frames are drawn with the Agg backend in worker processes from
+        snapshots of the event log, using this simulator's node positions.
 
-        print(f"Node {node} completed a task and is processing the next task, "
-            f"Queue length: {len(user_data.queue)}")
+        :param path: Output .mp4 or .gif file, or a directory for PNG frames.
+        :param fps: Frames per second of the output.
+        :param speed: Simulation seconds per second of output.
+        :param workers: Number of render processes; defaults to the CPU count.
+        :param max_events_per_frame: Cap on events per frame.
+        :param figsize: Figure size in inches.
+        :param dpi: Output resolution.
+        :return: Number of frames rendered.
+        """
+        return export_replay(self, path, fps, speed, workers, max_events_per_frame, figsize, dpi)
 
     def _handle_end_calculation(self, event):
         """
@@ -135,59 +208,20 @@ class DynamicSimulator:
         Add an edge temporarily to the graph for visualization.
         """
         if not self.graph.has_edge(*edge):
-            self.graph.add_edge(
-                edge[0], edge[1],
-                bandwidth=random.randint(10, 100),  # Random bandwidth
-                latency=random.randint(10, 50)     # Random latency
-        )
+            bandwidth, latency = self.link_model.link(*edge)
+            self.graph.add_edge(edge[0], edge[1], bandwidth=bandwidth, latency=latency * 1000)
 
     def _draw_graph(self, event):
         """
-        Draw the graph dynamically with updated edges and colors.
-        """
-        plt.clf()
-
-        # Highlight active edges and nodes
-        active_edges = [event["edge"]] if "edge" in event else []
-        active_node = event["node"] if "node" in event else None
-
-        edge_colors = ["blue" if edge in active_edges else "gray" for edge in self.graph.edges]
-        edge_widths = [2 if edge in active_edges else 0.5 for edge in self.graph.edges]
-
-        node_colors = []
-        for node, data in self.graph.nodes(data=True):
-            if node == active_node:
-                node_colors.append("yellow")
-            elif data["type"] == "enterprise":
-                node_colors.append("red")
-            else:
-                node_colors.append("green")
-
-        nx.draw(
-            self.graph,
-            pos=self.positions,
-            with_labels=True,
-            node_color=node_colors,
-            edge_color=edge_colors,
-            width=edge_widths,
-            node_size=800,
-        )
-
-        # Extract the current simulation time from the event
-        current_time = event["time"] if "time" in event else 0
-
-        # Add a legend showing the elapsed time and current event
-        legend_text = (f"Simulation Time: {current_time:.2f} seconds\n"
-                    f"Event: {event['type']}\n"
-                    f"Node: {active_node or 'None'}\n"
-                    f"Edge: {event.get('edge') or 'None'}")
-        plt.gca().legend([legend_text], loc='upper right', frameon=True, fontsize=10)
-
-        plt.draw()
-
-
-
+        Draw the graph with the nodes and edges touched by an event highlighted.
 
+        The layout is drawn once; later calls only update the highlighted
+        elements and the legend text.
+        """
+        if self.renderer is None:
+            self.renderer = GraphRenderer(self.graph, self.positions, plt.gca())
+            self.renderer.draw_static()
+        self.renderer.update([event], current_time=event.get("time", 0))
 
     def run(self):
         """
@@ -202,5 +236,7 @@ class DynamicSimulator:
         button.on_clicked(self.next_frame)
 
         # Initial draw
+        self.renderer = GraphRenderer(self.graph, self.positions, ax)
+        self.renderer.draw_static()
         self._draw_graph({"type": "Initialization"})
         plt.show()
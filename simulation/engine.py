@@ -0,0 +1,228 @@
+from collections import Counter
+import time as wallclock
+from models.link_model import LinkModel
+
+
+class SimulationResult:
+    """
+    Summary of a headless simulation run.
+    """
+    def __init__(self, processed_events, events_by_type, final_time, completion_times, wall_time):
+        """
+        :param processed_events: Number of events drained from the timeline.
+        :param events_by_type: Counter of processed events keyed by event type.
+        :param final_time: Simulation time of the last processed event (seconds).
+        :param completion_times: Simulation times at which tasks returned to their enterprise.
+        :param wall_time: Wall-clock time spent processing events (seconds).
+        """
+        self.processed_events = processed_events
+        self.events_by_type = events_by_type
+        self.final_time = final_time
+        self.completion_times = completion_times
+        self.wall_time = wall_time
+
+    @property
+    def completed_tasks(self):
+        return len(self.completion_times)
+
+    @property
+    def events_per_second(self):
+        return self.processed_events / self.wall_time if self.wall_time > 0 else float("inf")
+
+    def __repr__(self):
+        return (f"SimulationResult(events={self.processed_events}, "
+                f"completed_tasks={self.completed_tasks}, final_time={self.final_time:.2f}s)")
+
+
+class SimulationEngine:
+    """
+    Processes the event timeline without any rendering.
+
+    This is the headless core shared by batch runs and the interactive
+    DynamicSimulator, which only adds drawing on top of it.
+    """
+    def __init__(self, graph, event_manager, verbose=False, link_model=None):
+        """
+        Initialize the engine.
+
+        :param graph: The graph representing the network.
+        :param event_manager: The event manager containing the global timeline of events.
+        :param verbose: Print a line for every processed event.
+        :param link_model: LinkModel for transfer costs; defaults to the graph's shared model.
+        """
+        self.graph = graph
+        self.event_manager = event_manager
+        self.verbose = verbose
+        self.link_model = link_model or LinkModel.for_graph(graph)
+        self.current_time = 0
+        self.processed_events = 0
+        self.events_by_type = Counter()
+        self.completion_times = []
+        self.wall_time = 0.0
+        self._returned = None  # (enterprise, task) returned by the event being processed
+        self.handlers = {
+            "data_transmission": self._handle_data_transmission,
+            "calculation": self._handle_calculation,
+        }
+        self.observers = []
+
+    def add_observer(self, observer):
+        """
+        Register a callable that is given every event after it was handled.
+
+        Observers record what happened (e.g. a TaskTrace) without changing
+        how events are processed.
+
+        :param observer: Callable taking the processed Event.
+        """
+        self.observers.append(observer)
+
+    def process_event(self, event):
+        """
+        Dispatch a single event to its handler and advance the simulation clock.
+
+        :param event: The Event to process.
+        """
+        handler = self.handlers.get(event.type)
+        if handler is not None:
+            handler(event)
+        for observer in self.observers:
+            observer(event)
+        if self._returned is not None:
+            # Completed only now, so observers such as a TaskTrace have filled
+            # in the task's times before the enterprise may archive it
+            enterprise, task = self._returned
+            self._returned = None
+            enterprise.mark_task_completed(task)
+        if event.time > self.current_time:
+            self.current_time = event.time
+        self.processed_events += 1
+        self.events_by_type[event.type] += 1
+
+    def step(self):
+        """
+        Process the next event in the timeline.
+
+        :return: The processed event, or None if the timeline is empty.
+        """
+        event = self.event_manager.get_next_event()
+        if event is not None:
+            self.process_event(event)
+        return event
+
+    def run_until(self, time):
+        """
+        Process every event scheduled at or before a given simulation time.
+
+        Events created while processing are handled too if they fall inside
+        the window.
+
+        :param time: Simulation time to stop at (inclusive).
+        :return: A SimulationResult describing the run so far.
+        """
+        start = wallclock.perf_counter()
+        event_manager = self.event_manager
+        process_event = self.process_event
+        while True:
+            event = event_manager.peek()
+            if event is None or event.time > time:
+                break
+            process_event(event_manager.get_next_event())
+        self.wall_time += wallclock.perf_counter() - start
+        return self.results()
+
+    def run_to_completion(self):
+        """
+        Drain the whole timeline.
+
+        :return: A SimulationResult describing the run.
+        """
+        start = wallclock.perf_counter()
+        get_next_event = self.event_manager.get_next_event
+        process_event = self.process_event
+        event = get_next_event()
+        while event is not None:
+            process_event(event)
+            event = get_next_event()
+        self.wall_time += wallclock.perf_counter() - start
+        return self.results()
+
+    def results(self):
+        """
+        Get a summary of the events processed so far.
+
+        :return: A SimulationResult.
+        """
+        return SimulationResult(
+            processed_events=self.processed_events,
+            events_by_type=Counter(self.events_by_type),
+            final_time=self.current_time,
+            completion_times=list(self.completion_times),
+            wall_time=self.wall_time,
+        )
+
+    def _handle_data_transmission(self, event):
+        """
+        Handle the transmission of data.
+        """
+        from_node, to_node = event.from_node, event.to_node
+        size = event.size
+
+        # Ensure the edge exists temporarily, with the modelled link characteristics
+        if not self.graph.has_edge(from_node, to_node):
+            bandwidth, latency = self.link_model.link(from_node, to_node)
+            self.graph.add_edge(from_node, to_node, bandwidth=bandwidth, latency=latency * 1000)
+
+        # Data arriving back at an enterprise closes a task chain, once its
+        # last micro-batch is in
+        if self.graph.nodes[to_node]["type"] == "enterprise" and "batch" not in event:
+            self.completion_times.append(event.time)
+            task = event.task
+            if task is not None:
+                self._returned = (self.graph.nodes[to_node]["data"], task)
+
+        if self.verbose:
+            # Get bandwidth and calculate transmission time
+            bandwidth, _ = self.link_model.link(from_node, to_node)
+            transmission_time = self.link_model.transfer_time(from_node, to_node, size)
+
+            print(f"Transmission from {from_node} to {to_node}, Size: {size:.2f} MB, "
+                f"Bandwidth: {bandwidth} Mbps, Time: {transmission_time:.2f} seconds.")
+
+    def _handle_calculation(self, event):
+        """
+        Handle the calculation event.
+
+        Events scheduled by the allocator carry a ``start`` and end one
+        specific subtask, which is taken off its user (replayed events have
+        no subtask and change nothing). Events without a ``start`` complete
+        the user's active task and start the next in its queue.
+        """
+        if "batch" in event:
+            return  # The subtask still has micro-batches to compute
+
+        node = event.node
+        user_data = self.graph.nodes[node]["data"]
+        if event.start is not None:
+            if event.task is not None:
+                user_data.finish_task(event.task)
+            if self.verbose:
+                print(f"Node {node} completed a task, Queue length: {len(user_data.queue)}")
+            return
+
+        # Complete the current task
+        user_data.complete_task()
+
+        # Process the next task in the queue
+        next_task, completion_time = user_data.process_next_task(event.time)
+        if next_task:
+            self.event_manager.add_event(
+                completion_time,
+                "calculation",
+                node=node,
+                task=next_task,
+            )
+
+        if self.verbose:
+            print(f"Node {node} completed a task and is processing the next task, "
+                f"Queue length: {len(user_data.queue)}")
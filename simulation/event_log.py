@@ -0,0 +1,280 @@
+import json
+import os
+import numpy as np
+from models.event_manager import EventManager
+from models.records import Event
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = pq = None
+
+
+# One row per processed event. Node ids and event types are stored as
+# integer codes (-1 for "not set") into the tables of the sidecar file;
+# ``batch`` is the micro-batch of a partial pipelined event, -1 otherwise.
+EVENT_DTYPE = np.dtype([
+    ("time", "<f8"),
+    ("start", "<f8"),
+    ("size", "<f8"),
+    ("type", "<i2"),
+    ("from_node", "<i4"),
+    ("to_node", "<i4"),
+    ("node", "<i4"),
+    ("edge_from", "<i4"),
+    ("edge_to", "<i4"),
+    ("batch", "<i2"),
+])
+NODE_FIELDS = ("from_node", "to_node", "node", "edge_from", "edge_to")
+_HEADER_SIZE = 512  # Fixed .npy header size, so the row count can be patched in place
+
+
+def _npy_header(length):
+    """
+    Build a version 1.0 .npy header of exactly _HEADER_SIZE bytes for ``length`` rows.
+    """
+    header = repr({"descr": np.lib.format.dtype_to_descr(EVENT_DTYPE), "fortran_order": False, "shape": (length,)})
+    padding = _HEADER_SIZE - len(np.lib.format.MAGIC_PREFIX) - 4 - len(header) - 1
+    return (np.lib.format.MAGIC_PREFIX + bytes([1, 0]) + (_HEADER_SIZE - 10).to_bytes(2, "little")
+            + header.encode("latin1") + b" " * padding + b"\n")
+
+
+def _metadata_path(path):
+    return f"{path}.json"
+
+
+class EventLogWriter:
+    """
+    Records every processed event to a columnar trace on disk.
+
+    Register ``writer.observe`` with SimulationEngine.add_observer and close
+    the writer (or use it as a context manager) when the run is done.
+
+    With a path ending in .parquet the trace is written with pyarrow, one row
+    group per chunk. Otherwise it is a NumPy record file (.npy) that is
+    appended to chunk by chunk and can be opened zero-copy with mmap. Node
+    ids and event types are written to ``<path>.json`` either way.
+    """
+    def __init__(self, path, chunk_size=1 << 16):
+        """
+        :param path: Output file, .npy or .parquet.
+        :param chunk_size: Events buffered in memory before they are written.
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self.parquet = path.endswith(".parquet")
+        if self.parquet and pq is None:
+            raise RuntimeError("Writing Parquet traces needs pyarrow; use a .npy path instead.")
+        self.node_ids = []
+        self.node_index = {}
+        self.types = []
+        self.type_index = {}
+        self.length = 0
+        self._rows = []
+        if self.parquet:
+            self._file = None  # The ParquetWriter is created with the first chunk
+        else:
+            self._file = open(path, "wb")
+            self._file.write(_npy_header(0))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _code(self, node_id):
+        if node_id is None:
+            return -1
+        code = self.node_index.get(node_id)
+        if code is None:
+            code = self.node_index[node_id] = len(self.node_ids)
+            self.node_ids.append(node_id)
+        return code
+
+    def observe(self, event):
+        """
+        Append a processed event to the trace.
+
+        :param event: A processed Event.
+        """
+        type_code = self.type_index.get(event.type)
+        if type_code is None:
+            type_code = self.type_index[event.type] = len(self.types)
+            self.types.append(event.type)
+        code = self._code
+        edge = event.edge
+        self._rows.append((
+            event.time,
+            np.nan if event.start is None else event.start,
+            np.nan if event.size is None else event.size,
+            type_code,
+            code(event.from_node),
+            code(event.to_node),
+            code(event.node),
+            -1 if edge is None else code(edge[0]),
+            -1 if edge is None else code(edge[1]),
+            event.get("batch", -1),
+        ))
+        if len(self._rows) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the buffered events.
+        """
+        if not self._rows:
+            return
+        chunk = np.array(self._rows, dtype=EVENT_DTYPE)
+        self._rows = []
+        self.length += len(chunk)
+        if self.parquet:
+            table = pa.Table.from_arrays([pa.array(chunk[name]) for name in EVENT_DTYPE.names],
+                                         names=list(EVENT_DTYPE.names))
+            if self._file is None:
+                self._file = pq.ParquetWriter(self.path, table.schema)
+            self._file.write_table(table)
+        else:
+            chunk.tofile(self._file)
+
+    def close(self):
+        """
+        Flush the remaining events, finalize the file and write the node and type tables.
+        """
+        if self._file is False:
+            return
+        self.flush()
+        if self.parquet:
+            if self._file is not None:
+                self._file.close()
+        else:
+            self._file.seek(0)
+            self._file.write(_npy_header(self.length))
+            self._file.close()
+        self._file = False
+        with open(_metadata_path(self.path), "w") as f:
+            json.dump({"node_ids": self.node_ids, "types": self.types, "length": self.length}, f)
+
+
+class EventLog:
+    """
+    Read-only view of a trace written by EventLogWriter.
+
+    .npy traces are memory-mapped, so opening even a 10M-event trace only
+    reads the header; columns are views into the mapped file. Rows are in
+    processing order, so ``time`` is sorted and seek() is a binary search.
+    """
+    def __init__(self, records, node_ids, types):
+        """
+        :param records: Structured array with EVENT_DTYPE.
+        :param node_ids: Node id of every node code.
+        :param types: Event type of every type code.
+        """
+        self.records = records
+        self.node_ids = node_ids
+        self.types = types
+
+    @classmethod
+    def open(cls, path):
+        """
+        Open a trace, memory-mapped when it is a .npy file.
+
+        :param path: File written by EventLogWriter.
+        :return: An EventLog.
+        """
+        with open(_metadata_path(path)) as f:
+            metadata = json.load(f)
+        node_ids = [tuple(node) if isinstance(node, list) else node for node in metadata["node_ids"]]
+        if path.endswith(".parquet"):
+            if pq is None:
+                raise RuntimeError("Reading Parquet traces needs pyarrow.")
+            table = pq.read_table(path)
+            records = np.empty(table.num_rows, dtype=EVENT_DTYPE)
+            for name in EVENT_DTYPE.names:
+                records[name] = table.column(name).to_numpy()
+        elif os.path.getsize(path) > _HEADER_SIZE:
+            records = np.load(path, mmap_mode="r")
+        else:
+            records = np.empty(0, dtype=EVENT_DTYPE)  # numpy cannot map an empty file
+        return cls(records, node_ids, metadata["types"])
+
+    def __len__(self):
+        return len(self.records)
+
+    def column(self, name):
+        """
+        :param name: A field of EVENT_DTYPE.
+        :return: The column as a (zero-copy) view.
+        """
+        return self.records[name]
+
+    def type_code(self, event_type):
+        """
+        :param event_type: Event type name.
+        :return: Its code in the ``type`` column, or -1 if it never occurs.
+        """
+        return self.types.index(event_type) if event_type in self.types else -1
+
+    def seek(self, time):
+        """
+        Index of the first event at or after a simulation time.
+
+        :param time: Simulation time in seconds.
+        """
+        return int(np.searchsorted(self.records["time"], time, side="left"))
+
+    def event(self, index):
+        """
+        Decode one row back into an Event.
+
+        :param index: Row index.
+        """
+        return self._decode(self.records[index])
+
+    def events(self, start=0, stop=None):
+        """
+        Decode a range of rows lazily.
+
+        :param start: First row index.
+        :param stop: Row index to stop before; defaults to the end.
+        :return: Generator of Events.
+        """
+        stop = len(self.records) if stop is None else stop
+        for offset in range(start, stop, 1 << 16):
+            for row in self.records[offset:min(offset + (1 << 16), stop)]:
+                yield self._decode(row)
+
+    def _decode(self, row):
+        node_ids = self.node_ids
+        nodes = [None if code < 0 else node_ids[code] for code in
+                 (row["from_node"], row["to_node"], row["node"], row["edge_from"], row["edge_to"])]
+        start, size = float(row["start"]), float(row["size"])
+        partial = {"batch": int(row["batch"])} if row["batch"] >= 0 else {}
+        return Event(
+            float(row["time"]),
+            self.types[row["type"]],
+            from_node=nodes[0],
+            to_node=nodes[1],
+            node=nodes[2],
+            size=None if np.isnan(size) else size,
+            edge=None if nodes[3] is None else (nodes[3], nodes[4]),
+            start=None if np.isnan(start) else start,
+            **partial
+        )
+
+    def to_event_manager(self, start=0, stop=None):
+        """
+        Load a range of the trace into a fresh EventManager for replay.
+
+        Replaying through a SimulationEngine or DynamicSimulator on a graph
+        with no allocated tasks reproduces the run: the logged events already
+        include everything the original run scheduled.
+
+        :param start: First row index, e.g. from seek().
+        :param stop: Row index to stop before; defaults to the end.
+        :return: An EventManager holding the events.
+        """
+        event_manager = EventManager()
+        event_manager.add_events_bulk(self.events(start, stop))
+        return event_manager
@@ -0,0 +1,200 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+import shutil
+import subprocess
+import tempfile
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+import networkx as nx
+import numpy as np
+from PIL import Image
+from simulation.renderer import GraphRenderer
+
+
+FRAME_PATTERN = "frame_{:06d}.png"
+VIDEO_FORMATS = ("mp4", "gif")
+
+
+def output_format(path):
+    """
+    Infer the export format from an output path.
+
+    :param path: A .mp4 or .gif file, or a directory for a PNG sequence.
+    :return: "mp4", "gif" or "png".
+    """
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    return extension if extension in VIDEO_FORMATS else "png"
+
+
+def record_frames(simulator, fps=30, speed=1.0, max_events_per_frame=None):
+    """
+    Run the simulation and keep a compact snapshot of every frame.
+
+    A snapshot holds only what a frame shows, so the frames can be drawn
+    later, in any order and in other processes, without the simulator.
+
+    :param simulator: The DynamicSimulator to run.
+    :param fps: Frames per second of the output.
+    :param speed: Simulation seconds per second of output.
+    :param max_events_per_frame: Cap on events per frame.
+    :return: List of (simulation time, nodes, edges, status event) tuples.
+    """
+    frames = []
+    for events, sim_time in simulator.playback_frames(
+        fps, speed, skip_frames=False, max_events_per_frame=max_events_per_frame
+    ):
+        nodes, edges, last_event = GraphRenderer.summarize(events)
+        status = None
+        if last_event is not None:
+            status = {key: last_event.get(key) for key in ("type", "node", "edge") if key in last_event}
+        frames.append((sim_time, tuple(nodes), tuple(edges), status))
+    return frames
+
+
+def build_render_jobs(nodes, edges, positions, frames, frame_dir, chunks, figsize=(12, 8), dpi=100):
+    """
+    Split the frames into contiguous chunks, one render job each.
+
+    Every job carries the edges that appeared before its first frame, so a
+    worker can rebuild the graph as it looked at that point.
+
+    :param nodes: List of (node id, node type) pairs.
+    :param edges: Edges present before the simulation ran.
+    :param positions: Shared node layout.
+    :param frames: Frame snapshots from record_frames.
+    :param frame_dir: Directory the PNG frames are written to.
+    :param chunks: Number of jobs to create.
+    :param figsize: Figure size in inches.
+    :param dpi: Output resolution.
+    :return: List of job dicts for render_chunk.
+    """
+    known_edges = set(edges)
+    added_edges = []
+    jobs = []
+    for indices in np.array_split(np.arange(len(frames)), min(chunks, len(frames))):
+        start, stop = int(indices[0]), int(indices[-1]) + 1
+        jobs.append({
+            "nodes": nodes,
+            "edges": edges + added_edges,
+            "positions": positions,
+            "frames": list(zip(range(start, stop), frames[start:stop])),
+            "frame_dir": frame_dir,
+            "figsize": figsize,
+            "dpi": dpi,
+        })
+        for _, _, frame_edges, _ in frames[start:stop]:
+            for edge in frame_edges:
+                if edge not in known_edges:
+                    known_edges.add(edge)
+                    added_edges.append(edge)
+    return jobs
+
+
+def render_chunk(job):
+    """
+    Draw a run of frames with the Agg backend and write them as PNG files.
+
+    The static layout is drawn once per chunk; each frame only restores it
+    and draws the highlighted elements on top.
+
+    :param job: Job dict from build_render_jobs.
+    :return: Number of frames written.
+    """
+    graph = nx.DiGraph()
+    graph.add_nodes_from((node, {"type": node_type}) for node, node_type in job["nodes"])
+    graph.add_edges_from(job["edges"])
+
+    figure = Figure(figsize=job["figsize"], dpi=job["dpi"])
+    FigureCanvasAgg(figure)
+    renderer = GraphRenderer(graph, job["positions"], figure.subplots())
+    renderer.draw_static()
+
+    for index, (sim_time, nodes, edges, status) in job["frames"]:
+        # Highlighted edges exist in the simulated graph by the time they are used
+        graph.add_edges_from(edges)
+        renderer.set_highlight(nodes, edges, status, current_time=sim_time)
+        renderer.blit()
+        image = Image.fromarray(np.asarray(figure.canvas.buffer_rgba())).convert("RGB")
+        image.save(os.path.join(job["frame_dir"], FRAME_PATTERN.format(index)))
+    return len(job["frames"])
+
+
+def write_gif(frame_dir, num_frames, path, fps):
+    """
+    Assemble PNG frames into an animated GIF.
+
+    Frames are opened one at a time and closed once Pillow took them, so
+    long exports do not hold a file handle per frame.
+    """
+    with Image.open(os.path.join(frame_dir, FRAME_PATTERN.format(0))) as first:
+        first.save(path, save_all=True, append_images=_open_frames(frame_dir, 1, num_frames),
+                   duration=1000.0 / fps, loop=0)
+
+
+def _open_frames(frame_dir, start, stop):
+    for i in range(start, stop):
+        with Image.open(os.path.join(frame_dir, FRAME_PATTERN.format(i))) as frame:
+            yield frame
+
+
+def write_mp4(frame_dir, path, fps):
+    """
+    Assemble PNG frames into an H.264 MP4 with ffmpeg.
+    """
+    subprocess.run(
+        ["ffmpeg", "-y", "-loglevel", "error", "-framerate", str(fps),
+         "-i", os.path.join(frame_dir, FRAME_PATTERN.replace("{:06d}", "%06d")),
+         "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p", path],
+        check=True,
+    )
+
+
+def export_replay(simulator, path, fps=30, speed=1.0, workers=None, max_events_per_frame=None,
+                  figsize=(12, 8), dpi=100):
+    """
+    Render a simulation run off-screen to an MP4, a GIF or a PNG sequence.
+
+    The simulation is run once in this process and every frame is reduced to
+    a snapshot. The snapshots are then drawn in parallel worker processes
+    with the Agg backend, all using the simulator's node positions.
+
+    :param simulator: The DynamicSimulator to run; its timeline is consumed.
+    :param path: Output .mp4 or .gif file, or a directory for PNG frames.
+    :param fps: Frames per second of the output.
+    :param speed: Simulation seconds per second of output.
+    :param workers: Number of render processes; defaults to the CPU count.
+    :param max_events_per_frame: Cap on events per frame.
+    :param figsize: Figure size in inches.
+    :param dpi: Output resolution.
+    :return: Number of frames rendered.
+    """
+    export_format = output_format(path)
+    if export_format == "mp4" and shutil.which("ffmpeg") is None:
+        raise RuntimeError("MP4 export needs ffmpeg on the PATH; export a GIF or PNG sequence instead.")
+
+    nodes = [(node, data["type"]) for node, data in simulator.graph.nodes(data=True)]
+    edges = list(simulator.graph.edges)
+    frames = record_frames(simulator, fps, speed, max_events_per_frame)
+    if not frames:
+        raise ValueError("The event timeline is empty; there is nothing to export.")
+
+    workers = workers or os.cpu_count() or 1
+    frame_dir = path if export_format == "png" else tempfile.mkdtemp(prefix="replay_frames_")
+    os.makedirs(frame_dir, exist_ok=True)
+    try:
+        jobs = build_render_jobs(nodes, edges, simulator.positions, frames, frame_dir,
+                                 chunks=4 * workers if workers > 1 else 1, figsize=figsize, dpi=dpi)
+        if workers == 1:
+            rendered = sum(render_chunk(job) for job in jobs)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                rendered = sum(executor.map(render_chunk, jobs))
+
+        if export_format == "gif":
+            write_gif(frame_dir, rendered, path, fps)
+        elif export_format == "mp4":
+            write_mp4(frame_dir, path, fps)
+    finally:
+        if export_format != "png":
+            shutil.rmtree(frame_dir, ignore_errors=True)
+    return rendered
@@ -0,0 +1,165 @@
+import hashlib
+import os
+import numpy as np
+
+
+LAYOUT_VERSION = 1  # Bump when the layout algorithm changes, to invalidate cached layouts
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "task_offloading", "layouts")
+PACKINGS = ("hex", "grid")
+USER_BAND_ASPECT = 3.0  # Width / height of a user block
+BLOCK_GAP = 2.0  # Space between user clusters, in lattice units
+ENTERPRISE_GAP = 4.0  # Distance between the enterprise band and the first user row
+
+
+def layout_key(graph, seed=0, packing="hex", cluster=False):
+    """
+    Hash of everything a layout depends on.
+
+    :param graph: The graph to lay out.
+    :param seed: Seed of the user placement.
+    :param packing: "hex" or "grid".
+    :param cluster: Whether users are grouped by enterprise.
+    :return: Hex digest identifying the layout.
+    """
+    digest = hashlib.sha1(f"{LAYOUT_VERSION}|{seed}|{packing}|{cluster}".encode())
+    digest.update("\0".join(f"{node}\1{data['type']}" for node, data in graph.nodes(data=True)).encode())
+    if cluster:
+        digest.update("\0".join(f"{u}\1{v}" for u, v in graph.edges).encode())
+    return digest.hexdigest()
+
+
+def user_clusters(graph, users):
+    """
+    Group users by the first enterprise they are connected to.
+
+    :param graph: The graph to lay out.
+    :param users: User node ids, in layout order.
+    :return: (group of every user, enterprise of every group) where users without
+        an enterprise share a trailing group with enterprise None.
+    """
+    enterprise_group = {}
+    user_group = {}
+    for u, v in graph.edges:
+        for user, other in ((u, v), (v, u)):
+            if user not in user_group and graph.nodes[other]["type"] == "enterprise" \
+                    and graph.nodes[user]["type"] == "user":
+                user_group[user] = enterprise_group.setdefault(other, len(enterprise_group))
+    unassigned = len(enterprise_group)
+    groups = np.fromiter((user_group.get(user, unassigned) for user in users), dtype=np.int64, count=len(users))
+    return groups, [*enterprise_group, None]
+
+
+def pack_users(groups, num_groups, rng, packing="hex"):
+    """
+    Place users on a lattice, one roughly rectangular block per group.
+
+    Users are shuffled within their group by ``rng``, so the seed decides who
+    sits where while the overall shape stays fixed.
+
+    :param groups: Group index of every user.
+    :param num_groups: Number of groups.
+    :param rng: NumPy Generator.
+    :param packing: "hex" or "grid".
+    :return: (n, 2) array of user positions and the x-center of every group's block.
+    """
+    num_users = len(groups)
+    order = np.lexsort((rng.permutation(num_users), groups))
+    counts = np.bincount(groups, minlength=num_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    columns = np.maximum(1, np.ceil(np.sqrt(counts * USER_BAND_ASPECT))).astype(np.int64)
+    widths = np.where(counts > 0, columns, 0).astype(float)
+    offsets = np.concatenate(([0.0], np.cumsum(widths + BLOCK_GAP)[:-1]))
+
+    sorted_groups = groups[order]
+    local = np.arange(num_users) - starts[sorted_groups]
+    rows, cols = np.divmod(local, columns[sorted_groups])
+    if packing == "hex":
+        x = cols + 0.5 * (rows % 2)
+        y = -rows * (np.sqrt(3) / 2)
+    else:
+        x = cols.astype(float)
+        y = -rows.astype(float)
+
+    positions = np.empty((num_users, 2))
+    positions[order, 0] = offsets[sorted_groups] + x
+    positions[order, 1] = y - ENTERPRISE_GAP
+    centers = offsets + (widths - 1) / 2
+    return positions, centers
+
+
+def compute_layout(graph, seed=0, packing="hex", cluster=False):
+    """
+    Deterministic layout: users packed on a lattice, enterprises in a band above them.
+
+    With ``cluster``, users are grouped by the enterprise they serve and each
+    enterprise sits above its own block of users. Otherwise enterprises are
+    spread evenly over the width of the user band.
+
+    :param graph: The graph to lay out.
+    :param seed: Seed of the user placement.
+    :param packing: "hex" or "grid".
+    :param cluster: Group users by enterprise.
+    :return: (list of node ids, (n, 2) array of positions) in graph order.
+    """
+    if packing not in PACKINGS:
+        raise ValueError(f"Unknown packing {packing!r}; expected one of {PACKINGS}.")
+
+    nodes = list(graph.nodes)
+    is_user = np.fromiter((data["type"] == "user" for _, data in graph.nodes(data=True)),
+                          dtype=bool, count=len(nodes))
+    users = [node for node, user in zip(nodes, is_user) if user]
+    enterprises = [node for node, user in zip(nodes, is_user) if not user]
+    rng = np.random.default_rng(seed)
+
+    if cluster:
+        groups, group_enterprises = user_clusters(graph, users)
+    else:
+        groups, group_enterprises = np.zeros(len(users), dtype=np.int64), [None]
+    user_xy, centers = pack_users(groups, len(group_enterprises), rng, packing)
+
+    # Enterprises above their cluster when they have one, the rest spread over the band
+    enterprise_x = dict(zip(group_enterprises, centers.tolist()))
+    free = [enterprise for enterprise in enterprises if enterprise not in enterprise_x]
+    width = user_xy[:, 0].max() if len(users) else 2.0 * max(len(free) - 1, 0)
+    if free:
+        spread = np.linspace(0.0, width, len(free)) if len(free) > 1 else np.array([width / 2])
+        enterprise_x.update(zip(free, spread.tolist()))
+
+    positions = np.empty((len(nodes), 2))
+    positions[is_user] = user_xy
+    positions[~is_user, 0] = [enterprise_x[enterprise] for enterprise in enterprises]
+    positions[~is_user, 1] = 0.0
+    return nodes, positions
+
+
+def fixed_layout(graph, seed=0, packing="hex", cluster=False, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Get the layout of a graph, computing it only if it is not cached on disk yet.
+
+    Layouts are stored as .npy files named after layout_key, so every run,
+    process and plot of the same graph with the same seed shares one layout.
+
+    :param graph: The graph to lay out.
+    :param seed: Seed of the user placement.
+    :param packing: "hex" or "grid".
+    :param cluster: Group users by enterprise.
+    :param cache_dir: Directory of cached layouts; None disables the disk cache.
+    :return: Dict of node id to (x, y).
+    """
+    path = None
+    positions = None
+    if cache_dir is not None:
+        path = os.path.join(cache_dir, f"{layout_key(graph, seed, packing, cluster)}.npy")
+        if os.path.exists(path):
+            positions = np.load(path)
+
+    if positions is None:
+        _, positions = compute_layout(graph, seed, packing, cluster)
+        if path is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, "wb") as handle:
+                np.save(handle, positions)
+            os.replace(temporary, path)  # Atomic, so concurrent runs never read a partial file
+
+    return dict(zip(graph.nodes, zip(positions[:, 0].tolist(), positions[:, 1].tolist())))
@@ -1,11 +1,27 @@
+import csv
+import json
+import math
+import os
+import numpy as np
+from models.records import SubTask
+from simulation.trace import COMPUTE
+
+
 class Metrics:
-    
+    PERCENTILES = (50, 90, 99)
+
     def __init__(self):
         self.total_tasks = 0
         self.completed_tasks = 0
         self.total_gpu_time = 0
         self.total_transmission_time = 0
         self.total_time = 0
+        self.makespan = 0
+        self.throughput = 0
+        self.latency_percentiles = {}  # Percentile -> allocation-to-return time (seconds)
+        self.utilisation = {}  # User id -> fraction of the makespan spent computing
+        self.steals = 0  # Subtasks moved by work stealing
+        self.stolen_mb = 0.0  # Input data shipped for them
 
     def update_metrics(self, gpu_time, transmission_time):
         """
@@ -19,6 +35,52 @@ class Metrics:
         self.total_transmission_time += transmission_time
         self.total_time += gpu_time + transmission_time
 
+    def record_trace(self, trace, users=None):
+        """
+        Compute the metrics from a TaskTrace.
+
+        Replaces the per-task totals with the ones in the trace and adds
+        latency percentiles, makespan, throughput, per-user utilisation and
+        work stealing counts.
+
+        :param trace: The TaskTrace of a run.
+        :param users: User ids to report utilisation for, so idle users count
+            as 0; defaults to the users that computed something.
+        """
+        tasks = trace.task_columns()
+        activities = trace.activity_columns()
+        returned = ~np.isnan(tasks["returned"])
+        durations = activities["end"] - activities["start"]
+        compute = activities["kind"] == COMPUTE
+
+        self.total_tasks = max(self.total_tasks, len(trace))
+        self.completed_tasks = int(returned.sum())
+        self.total_gpu_time = float(durations[compute].sum())
+        self.total_transmission_time = float(durations[~compute].sum())
+        self.total_time = self.total_gpu_time + self.total_transmission_time
+        self.steals, self.stolen_mb = trace.steals, trace.stolen_mb
+        if not len(durations):
+            return
+
+        self.makespan = float(activities["end"].max() - tasks["allocated"].min())
+        self.throughput = self.completed_tasks / self.makespan if self.makespan > 0 else 0
+        latencies = tasks["returned"][returned] - tasks["allocated"][returned]
+        if latencies.size:
+            self.latency_percentiles = dict(zip(self.PERCENTILES, np.percentile(latencies, self.PERCENTILES).tolist()))
+
+        busy = trace.occupied_time(COMPUTE)  # Overlapping subtasks on a user count once
+        if users is None:
+            users = [trace.node_ids[i] for i in np.flatnonzero(busy)]
+        scale = 1.0 / self.makespan if self.makespan > 0 else 0.0
+        self.utilisation = {
+            user: float(busy[trace.node_index[user]]) * scale if user in trace.node_index else 0.0
+            for user in users
+        }
+
+    @property
+    def mean_utilisation(self):
+        return sum(self.utilisation.values()) / len(self.utilisation) if self.utilisation else 0.0
+
     def summarize(self):
         """
         Print a summary of the metrics.
@@ -29,7 +91,16 @@ class Metrics:
         print(f"Total GPU Time: {self.total_gpu_time:.2f} seconds")
         print(f"Total Transmission Time: {self.total_transmission_time:.2f} seconds")
         print(f"Total Time (GPU + Transmission): {self.total_time:.2f} seconds")
-        print(f"Completion Rate: {self.completed_tasks / self.total_tasks * 100:.2f}%\n")
+        print(f"Completion Rate: {self.completed_tasks / self.total_tasks * 100:.2f}%")
+        if self.makespan > 0:
+            print(f"Makespan: {self.makespan:.2f} seconds")
+            print(f"Throughput: {self.throughput:.4f} tasks/second")
+            for percentile, latency in self.latency_percentiles.items():
+                print(f"Latency p{percentile}: {latency:.2f} seconds")
+            print(f"Mean User Utilisation: {self.mean_utilisation * 100:.2f}%")
+        if self.steals:
+            print(f"Work Stealing: {self.steals} subtasks moved, {self.stolen_mb:.2f} MB shipped")
+        print()
 
 
 def calculate_metrics(graph, metrics):
@@ -42,10 +113,258 @@ def calculate_metrics(graph, metrics):
     for node, data in graph.nodes(data=True):
         if data["type"] == "enterprise":
             enterprise_node = data["data"]
-            metrics.total_tasks += len(enterprise_node.task_queue)
-            for task in enterprise_node.task_queue:
-                if task["completed"]:
-                    print(task)
-                    gpu_time = task.get("gpu_time", 0)
-                    transmission_time = task.get("transmission_time", 0)
-                    metrics.update_metrics(gpu_time, transmission_time)
+            metrics.total_tasks += enterprise_node.pending_count + enterprise_node.completed_count
+            for task in enterprise_node.completed:
+                metrics.update_metrics(task.get("gpu_time", 0), task.get("transmission_time", 0))
+            archive = enterprise_node.archive
+            if archive is not None and len(archive):
+                gpu_time = sum(archive.columns["gpu_time"])
+                transmission_time = sum(archive.columns["transmission_time"])
+                metrics.completed_tasks += len(archive)
+                metrics.total_gpu_time += gpu_time
+                metrics.total_transmission_time += transmission_time
+                metrics.total_time += gpu_time + transmission_time
+
+
+class LogHistogram:
+    """
+    HDR-style histogram with logarithmic buckets.
+
+    Bucket bounds grow by a constant factor, so every recorded value is
+    known to within ``relative_error`` while memory stays fixed at a few
+    thousand counters however many values are recorded. Values below
+    ``lowest`` or above ``highest`` land in an underflow or overflow bucket.
+    """
+    def __init__(self, lowest=1e-3, highest=1e7, relative_error=0.01):
+        """
+        :param lowest: Smallest value resolved, e.g. in seconds.
+        :param highest: Largest value resolved.
+        :param relative_error: Maximum relative error of reported quantiles.
+        """
+        self.lowest = lowest
+        self.highest = highest
+        self.growth = (1 + relative_error) / (1 - relative_error)
+        self._log_growth = math.log(self.growth)
+        self.counts = np.zeros(int(math.ceil(math.log(highest / lowest) / self._log_growth)) + 2, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _bucket(self, value):
+        if value < self.lowest:
+            return 0
+        return min(1 + int(math.log(value / self.lowest) / self._log_growth), len(self.counts) - 1)
+
+    def record(self, value):
+        """
+        :param value: Value to add.
+        """
+        self.counts[self._bucket(value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def record_many(self, values):
+        """
+        :param values: Array of values to add.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if not values.size:
+            return
+        buckets = np.zeros(values.shape, dtype=np.int64)
+        resolved = values >= self.lowest
+        buckets[resolved] = 1 + (np.log(values[resolved] / self.lowest) / self._log_growth).astype(np.int64)
+        self.counts += np.bincount(np.minimum(buckets, len(self.counts) - 1), minlength=len(self.counts))
+        self.count += values.size
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def merge(self, other):
+        """
+        Add the values of a histogram with the same bucket layout.
+
+        :param other: Another LogHistogram.
+        """
+        self.counts += other.counts
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q):
+        """
+        :param q: Quantile between 0 and 1.
+        :return: Estimated value at the quantile, or 0 if nothing was recorded.
+        """
+        if not self.count:
+            return 0.0
+        bucket = int(np.searchsorted(np.cumsum(self.counts), max(1, math.ceil(q * self.count))))
+        if bucket == 0:
+            value = self.min
+        elif bucket == len(self.counts) - 1:
+            value = self.max
+        else:
+            value = self.lowest * self.growth ** (bucket - 0.5)  # Geometric middle of the bucket
+        return min(max(value, self.min), self.max)
+
+
+class StreamingMetrics:
+    """
+    Online metrics for long runs, fed one event at a time.
+
+    Register ``metrics.observe`` with SimulationEngine.add_observer (this
+    works for DynamicSimulator too). Latencies go into a LogHistogram,
+    completions into a ring of time slots for windowed throughput, and busy
+    time and received data into per-node counters. Subtasks moved by work
+    stealing are counted with the data shipped for them. Apart from the tasks
+    currently in flight, memory does not grow with the number of tasks.
+    Snapshots can be appended to a JSON Lines or CSV file at a fixed
+    simulation-time interval.
+    """
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, window=60.0, slots=12, snapshot_path=None, snapshot_interval=None, histogram=None):
+        """
+        :param window: Length of the throughput window in simulation seconds.
+        :param slots: Number of slots the window is divided into.
+        :param snapshot_path: File to append snapshots to (.csv, otherwise JSON Lines).
+        :param snapshot_interval: Simulation seconds between snapshots.
+        :param histogram: LogHistogram for latencies; defaults to one resolving 1 ms to ~100 days.
+        """
+        if snapshot_interval is not None and snapshot_path is None:
+            raise ValueError("snapshot_interval needs a snapshot_path to write to.")
+        self.latency = histogram or LogHistogram()
+        self.window = window
+        self.slot_length = window / slots
+        self.slot_ids = np.full(slots, -1, dtype=np.int64)
+        self.slot_counts = np.zeros(slots, dtype=np.int64)
+        self.busy_time = {}  # Node id -> seconds spent computing
+        self.received = {}  # Node id -> MB received
+        self.completed_tasks = 0
+        self.steals = 0  # Subtasks moved to an idle user by work stealing
+        self.stolen_mb = 0.0  # Input data shipped for them
+        self.start_time = None
+        self.current_time = 0.0
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self._next_snapshot = snapshot_interval
+        self._in_flight = {}  # Task -> allocation time
+
+    def observe(self, event):
+        """
+        Update the aggregates with a processed event.
+
+        :param event: A processed Event.
+        """
+        time = event.time
+        if self.start_time is None:
+            self.start_time = time if event.start is None else min(time, event.start)
+        task = event.task
+        if event.type == "data_transmission" and task is not None:
+            if isinstance(task, SubTask):
+                if task.task is not None and task.task not in self._in_flight:
+                    self._in_flight[task.task] = time if event.start is None else event.start
+                self.received[event.to_node] = self.received.get(event.to_node, 0.0) + (event.size or 0.0)
+                if "stolen_from" in event:
+                    self.steals += 1
+                    self.stolen_mb += event.size or 0.0
+            elif "batch" not in event:  # Earlier micro-batches of a pipelined task
+                self._complete(task, time)
+        elif event.type == "calculation" and event.start is not None:
+            self.busy_time[event.node] = self.busy_time.get(event.node, 0.0) + (time - event.start)
+
+        if time > self.current_time:
+            self.current_time = time
+        if self.snapshot_interval is not None and time >= self._next_snapshot:
+            self.write_snapshot(self.snapshot_path)
+            self._next_snapshot = (math.floor(time / self.snapshot_interval) + 1) * self.snapshot_interval
+
+    def _complete(self, task, time):
+        self.completed_tasks += 1
+        allocated = self._in_flight.pop(task, None)
+        if allocated is not None:
+            self.latency.record(time - allocated)
+
+        slot_id = int(time // self.slot_length)
+        slot = slot_id % len(self.slot_ids)
+        if self.slot_ids[slot] != slot_id:
+            self.slot_ids[slot] = slot_id
+            self.slot_counts[slot] = 0
+        self.slot_counts[slot] += 1
+
+    @property
+    def in_flight(self):
+        return len(self._in_flight)
+
+    def throughput(self, now=None):
+        """
+        Completed tasks per second over the last ``window`` seconds.
+
+        :param now: End of the window; defaults to the latest event time.
+        """
+        now = self.current_time if now is None else now
+        current = int(now // self.slot_length)
+        recent = (self.slot_ids > current - len(self.slot_ids)) & (self.slot_ids <= current)
+        return float(self.slot_counts[recent].sum()) / self.window
+
+    def utilisation(self, now=None):
+        """
+        Fraction of the elapsed time every node spent computing.
+
+        :param now: End of the interval; defaults to the latest event time.
+        :return: Dict of node id to utilisation.
+        """
+        now = self.current_time if now is None else now
+        elapsed = now - (self.start_time or 0.0)
+        scale = 1.0 / elapsed if elapsed > 0 else 0.0
+        return {node: busy * scale for node, busy in self.busy_time.items()}
+
+    def snapshot(self):
+        """
+        :return: Dict of the current aggregates, with flat scalar fields first.
+        """
+        utilisation = self.utilisation()
+        values = list(utilisation.values())
+        snapshot = {
+            "time": self.current_time,
+            "completed_tasks": self.completed_tasks,
+            "in_flight": self.in_flight,
+            "throughput": self.throughput(),
+            "mean_latency": self.latency.mean,
+            "steals": self.steals,
+            "stolen_mb": self.stolen_mb,
+        }
+        for percentile in self.PERCENTILES:
+            snapshot[f"p{percentile}_latency"] = self.latency.quantile(percentile / 100)
+        snapshot["mean_utilisation"] = sum(values) / len(values) if values else 0.0
+        snapshot["max_utilisation"] = max(values) if values else 0.0
+        snapshot["utilisation"] = utilisation
+        return snapshot
+
+    def write_snapshot(self, path):
+        """
+        Append a snapshot to a file, as CSV (without per-node fields) or JSON Lines.
+
+        :param path: Destination path ending in .csv, or any other JSON Lines file.
+        :return: The snapshot that was written.
+        """
+        snapshot = self.snapshot()
+        if path.endswith(".csv"):
+            row = {key: value for key, value in snapshot.items() if not isinstance(value, dict)}
+            new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+            with open(path, "a", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=list(row.keys()))
+                if new_file:
+                    writer.writeheader()
+                writer.writerow(row)
+        else:
+            with open(path, "a") as f:
+                f.write(json.dumps(snapshot) + "\n")
+        return snapshot
@@ -0,0 +1,175 @@
+from array import array
+from collections import deque
+
+import numpy as np
+
+
+class OnlineScheduler:
+    """
+    Allocates tasks inside the event loop, as users free up.
+
+    Instead of placing every task on arrival (or all of them up front at
+    t=0), tasks wait in a FIFO of pending tasks and are handed to the
+    TaskAllocator only once ``chain_length`` users are available, i.e. have
+    at most ``max_backlog`` seconds of GPU work waiting in their queue. The
+    subtask a user is computing does not count, so a user takes its next
+    subtask while finishing the current one and is ready when the data
+    arrives. Available users are looked for among the pool's
+    ``candidate_factor * chain_length`` least loaded ones, and the allocator
+    picks the chain among them only. Decisions are made at the current simulation time with the
+    users' live load, so a chain goes to users that are actually free
+    instead of users that looked lightly loaded when the wave was planned.
+
+    By default pending tasks are dispatched whenever a user starts or
+    finishes a computation. With an ``interval``, they are instead
+    dispatched on periodic "schedule" events, which batches decisions. The
+    allocator must run its chains through a ChainExecutor, so queues drain
+    as the simulation proceeds and load is live.
+
+    For every task the scheduler records how long it waited to be dispatched
+    and its response time from submission until its result returned.
+    """
+    def __init__(self, graph, event_manager, allocator, chain_length=3, interval=None, max_backlog=0.0):
+        """
+        :param graph: The graph representing the network.
+        :param event_manager: The event manager holding the timeline.
+        :param allocator: TaskAllocator placing the dispatched tasks; needs an executor.
+        :param chain_length: Number of users in each task's chain.
+        :param interval: Seconds between "schedule" events; None to dispatch whenever a user frees up.
+        :param max_backlog: Seconds of queued GPU work under which a user counts as available.
+        """
+        if allocator.executor is None:
+            raise ValueError("Online scheduling needs an allocator that runs chains through an executor")
+        self.graph = graph
+        self.event_manager = event_manager
+        self.allocator = allocator
+        self.chain_length = chain_length
+        self.interval = interval
+        self.max_backlog = max_backlog
+        self.pending = deque()  # (enterprise, task, submission time), oldest first
+        self.submitted_at = {}  # Task -> submission time, until it returns
+        self.waiting_times = array("d")  # Submission to dispatch, per dispatched task
+        self.response_times = array("d")  # Submission to return, per returned task
+        self._next_tick = None  # Time of the pending "schedule" event
+
+    def attach(self, engine):
+        """
+        Dispatch pending tasks from an engine's event loop.
+
+        The scheduler observes processed events, so it sees the users' load
+        after the allocator's ChainExecutor handled them.
+
+        :param engine: SimulationEngine (or DynamicSimulator) processing the timeline.
+        """
+        engine.handlers["schedule"] = self.handle_schedule
+        engine.add_observer(self.observe)
+
+    def submit(self, enterprise, task, time):
+        """
+        Queue a task for allocation.
+
+        :param enterprise: Identifier of the enterprise that owns the task.
+        :param task: The Task.
+        :param time: Current simulation time.
+        """
+        self.pending.append((enterprise, task, time))
+        self.submitted_at[task] = time
+        if self.interval is None:
+            self.dispatch(time)
+        else:
+            self._schedule_tick(time)
+
+    def submit_pending(self, time=0.0):
+        """
+        Queue every pending task of the enterprises, e.g. a wave created before the run.
+
+        :param time: Current simulation time.
+        :return: Number of tasks queued.
+        """
+        tasks = self.allocator._collect_pending_tasks()
+        for enterprise, task in tasks:
+            self.pending.append((enterprise, task, time))
+            self.submitted_at[task] = time
+        if self.interval is None:
+            self.dispatch(time)
+        else:
+            self._schedule_tick(time)
+        return len(tasks)
+
+    def dispatch(self, time):
+        """
+        Allocate pending tasks, oldest first, while enough users are available.
+
+        :param time: Current simulation time.
+        :return: Number of tasks dispatched.
+        """
+        allocator, pool = self.allocator, self.allocator.user_pool
+        allocator.current_time = time
+        num_candidates = allocator.candidate_factor * self.chain_length
+        dispatched = 0
+        while self.pending:
+            # The pool's load counts the active subtask, so it only narrows the search
+            users = [user for user in pool.smallest(num_candidates) if queued_work(user) <= self.max_backlog]
+            if len(users) < self.chain_length:
+                break
+            enterprise, task, submitted = self.pending[0]
+            if not allocator.allocate_task(enterprise, task, self.chain_length, candidates=users):
+                break
+            self.pending.popleft()
+            self.waiting_times.append(time - submitted)
+            dispatched += 1
+        return dispatched
+
+    def handle_schedule(self, event):
+        """
+        Dispatch on a periodic scheduling event.
+
+        :param event: The "schedule" event.
+        """
+        self._next_tick = None
+        self.dispatch(event.time)
+        if self.pending and len(self.allocator.user_pool) >= self.chain_length:
+            self._schedule_tick(event.time)
+
+    def observe(self, event):
+        """
+        Record returned tasks and dispatch when a user started or finished a computation.
+
+        Users start computing when their input arrives or their previous
+        computation ends, so those are the events that can free them.
+
+        :param event: A processed Event.
+        """
+        if event.type == "data_transmission":
+            if "batch" not in event:
+                submitted = self.submitted_at.pop(event.task, None)
+                if submitted is not None:
+                    self.response_times.append(event.time - submitted)
+        elif event.type != "calculation":
+            return
+        if self.pending and self.interval is None:
+            self.dispatch(event.time)
+
+    def response_percentile(self, q):
+        """
+        :param q: Percentile in [0, 100].
+        :return: The percentile of the response times in seconds, or 0.0 before any task returned.
+        """
+        return float(np.percentile(self.response_times, q)) if len(self.response_times) else 0.0
+
+    def _schedule_tick(self, time):
+        """
+        Make sure a "schedule" event is pending after a time.
+        """
+        if self._next_tick is None:
+            self._next_tick = time + self.interval
+            self.event_manager.add_event(self._next_tick, "schedule")
+
+
+def queued_work(user):
+    """
+    :param user: A UserNode.
+    :return: Seconds of GPU work waiting in the user's queue, not counting its active subtask.
+    """
+    active = user.active_task
+    return user.backlog - active["duration"] if active is not None else user.backlog
@@ -0,0 +1,223 @@
+from matplotlib.collections import LineCollection
+import networkx as nx
+import numpy as np
+
+
+ENTERPRISE_COLOR = "red"
+USER_COLOR = "green"
+ACTIVE_NODE_COLOR = "yellow"
+EDGE_COLOR = "gray"
+ACTIVE_EDGE_COLOR = "blue"
+MAX_LABELLED_NODES = 200  # Above this, node labels are off unless requested
+EDGE_FOLD_SIZE = 64  # New edges drawn as an overlay before they are folded into the background
+
+
+class GraphRenderer:
+    """
+    Incremental renderer for the simulation graph.
+
+    The static layout (all nodes and the edges present when drawing starts)
+    is drawn once and cached as a background bitmap. Each frame restores that
+    bitmap and redraws only a few animated overlay artists: the highlighted
+    nodes, the highlighted edges, edges that appeared since the background was
+    captured, and the status text. The cost of a frame depends on what the
+    frame's events touch, not on the size of the graph.
+
+    When the renderer blits itself, new edges are folded into the background
+    once EDGE_FOLD_SIZE of them piled up, so the overlay of new edges stays
+    small. Under a blitting FuncAnimation, which owns the background, they
+    stay in the overlay.
+    """
+    def __init__(self, graph, positions, ax, with_labels=None, node_size=800):
+        """
+        :param graph: The graph to draw.
+        :param positions: Mapping of node id to (x, y).
+        :param ax: Matplotlib Axes to draw into.
+        :param with_labels: Draw node labels; defaults to True for small graphs.
+        :param node_size: Marker size of the nodes.
+        """
+        self.graph = graph
+        self.positions = positions
+        self.ax = ax
+        self.canvas = ax.figure.canvas
+        self.with_labels = graph.number_of_nodes() <= MAX_LABELLED_NODES if with_labels is None else with_labels
+        self.node_size = node_size
+        self.background = None
+        self.status_text = None  # The overlays exist once draw_static ran
+        self._drawn_edges = set()
+        self._edge_segments = []  # Segments of the static edge collection
+        self._new_edge_segments = []
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def draw_static(self):
+        """
+        Draw the static layout and create the animated overlay artists.
+        """
+        ax = self.ax
+        ax.clear()
+        ax.set_axis_off()
+
+        nodes = list(self.graph.nodes)
+        xy = np.array([self.positions[node] for node in nodes], dtype=float).reshape(-1, 2)
+        colors = [
+            ENTERPRISE_COLOR if self.graph.nodes[node]["type"] == "enterprise" else USER_COLOR
+            for node in nodes
+        ]
+        self.node_collection = ax.scatter(xy[:, 0], xy[:, 1], s=self.node_size, c=colors, zorder=2)
+
+        self._drawn_edges = set(self.graph.edges)
+        self._edge_segments = [self._segment(edge) for edge in self._drawn_edges]
+        self.edge_collection = LineCollection(self._edge_segments, colors=EDGE_COLOR, linewidths=0.5, zorder=1)
+        ax.add_collection(self.edge_collection)
+        if self.with_labels:
+            nx.draw_networkx_labels(self.graph, self.positions, ax=ax)
+        ax.autoscale_view()
+
+        # Overlays redrawn every frame
+        self.new_edge_collection = LineCollection([], colors=EDGE_COLOR, linewidths=0.5, zorder=1, animated=True)
+        self.active_edge_collection = LineCollection([], colors=ACTIVE_EDGE_COLOR, linewidths=2, zorder=1, animated=True)
+        self.active_node_collection = ax.scatter(
+            [], [], s=self.node_size, c=ACTIVE_NODE_COLOR, zorder=3, animated=True
+        )
+        ax.add_collection(self.new_edge_collection)
+        ax.add_collection(self.active_edge_collection)
+        self.status_text = ax.text(
+            0.99, 0.99, "", transform=ax.transAxes, ha="right", va="top", fontsize=10,
+            bbox={"boxstyle": "round", "facecolor": "white", "edgecolor": "0.8"}, animated=True,
+        )
+        self._new_edge_segments = []
+
+        self.canvas.draw()
+
+    @property
+    def animated_artists(self):
+        """
+        The overlay artists redrawn every frame.
+        """
+        return (self.new_edge_collection, self.active_edge_collection,
+                self.active_node_collection, self.status_text)
+
+    def update(self, events, current_time=None):
+        """
+        Highlight the nodes and edges touched by a batch of events and redraw the overlays.
+
+        :param events: Events processed since the previous frame.
+        :param current_time: Simulation time to display; defaults to the last event's time.
+        """
+        self.set_frame(events, current_time)
+        self.blit()
+
+    def set_frame(self, events, current_time=None):
+        """
+        Update the overlay artists for a batch of events without drawing them.
+
+        Used directly when something else (e.g. FuncAnimation) does the blitting.
+
+        :param events: Events processed since the previous frame.
+        :param current_time: Simulation time to display; defaults to the last event's time.
+        :return: The overlay artists.
+        """
+        return self.set_highlight(*self.summarize(events), current_time=current_time)
+
+    @staticmethod
+    def summarize(events):
+        """
+        Reduce a batch of events to what a frame shows.
+
+        :param events: Events processed since the previous frame.
+        :return: (touched nodes, touched edges, last event), without duplicates.
+        """
+        active_nodes, active_edges = {}, {}
+        last_event = None
+        for event in events:
+            last_event = event
+            node = event.get("node")
+            if node is not None:
+                active_nodes[node] = None
+            edge = event.get("edge")
+            if edge is not None:
+                active_edges[edge] = None
+        return list(active_nodes), list(active_edges), last_event
+
+    def set_highlight(self, nodes, edges, event=None, current_time=None):
+        """
+        Update the overlay artists to highlight the given nodes and edges.
+
+        :param nodes: Nodes to highlight.
+        :param edges: Edges to highlight. Edges that are in the graph but not
+            in the static layout yet are drawn from now on.
+        :param event: Event described in the status text.
+        :param current_time: Simulation time to display; defaults to the event's time.
+        :return: The overlay artists.
+        """
+        new_edges = False
+        for edge in edges:
+            if edge not in self._drawn_edges and self.graph.has_edge(*edge):
+                self._drawn_edges.add(edge)
+                self._new_edge_segments.append(self._segment(edge))
+                new_edges = True
+
+        if event is not None:
+            if current_time is None:
+                current_time = event.get("time", 0)
+            self.status_text.set_text(self._status(event, current_time, len(nodes) + len(edges)))
+        elif current_time is not None:
+            self.status_text.set_text(f"Simulation Time: {current_time:.2f} seconds")
+
+        self.active_node_collection.set_offsets(
+            np.array([self.positions[node] for node in nodes], dtype=float).reshape(-1, 2)
+        )
+        self.active_edge_collection.set_segments([self._segment(edge) for edge in edges])
+        if new_edges:
+            self.new_edge_collection.set_segments(self._new_edge_segments)
+        return self.animated_artists
+
+    def blit(self):
+        """
+        Restore the cached background and redraw only the overlay artists.
+        """
+        if self.background is None:
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self.background)
+        if len(self._new_edge_segments) >= EDGE_FOLD_SIZE:
+            self._fold_new_edges()
+        self._draw_overlays()
+        self.canvas.blit(self.ax.figure.bbox)
+
+    def _fold_new_edges(self):
+        """
+        Draw the new edges into the restored background and move them to the static edge collection.
+        """
+        self.ax.draw_artist(self.new_edge_collection)
+        self.background = self.canvas.copy_from_bbox(self.ax.figure.bbox)
+        self._edge_segments.extend(self._new_edge_segments)
+        self.edge_collection.set_segments(self._edge_segments)  # Kept for full redraws
+        self._new_edge_segments = []
+        self.new_edge_collection.set_segments(self._new_edge_segments)
+
+    def _draw_overlays(self):
+        for artist in self.animated_artists:
+            self.ax.draw_artist(artist)
+
+    def _on_draw(self, _event):
+        """
+        Re-capture the background after a full redraw (first draw, resize, ...).
+        """
+        if self.status_text is None:
+            return
+        self.background = self.canvas.copy_from_bbox(self.ax.figure.bbox)
+        self._draw_overlays()
+
+    def _segment(self, edge):
+        return (self.positions[edge[0]], self.positions[edge[1]])
+
+    @staticmethod
+    def _status(event, current_time, touched):
+        text = (f"Simulation Time: {current_time:.2f} seconds\n"
+                f"Event: {event['type']}\n"
+                f"Node: {event.get('node') or 'None'}\n"
+                f"Edge: {event.get('edge') or 'None'}")
+        if touched > 2:
+            text += f"\nElements touched: {touched}"
+        return text
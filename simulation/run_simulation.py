@@ -1,5 +1,10 @@
+from models.event_manager import EventManager
 from models.graph_builder import GraphBuilder
 from models.task_allocator import TaskAllocator
+from simulation.arrivals import TaskArrivalProcess, poisson_task_source
+from simulation.engine import SimulationEngine
+from simulation.metrics import Metrics, StreamingMetrics
+from simulation.trace import TaskTrace
 import random
 
 
@@ -10,14 +15,13 @@ def generate_tasks(graph, num_tasks_per_enterprise):
     :param graph: The graph representing the network.
     :param num_tasks_per_enterprise: Number of tasks to generate for each enterprise.
     """
-    for node, data in graph.nodes(data=True):
+    for _, data in graph.nodes(data=True):
         if data["type"] == "enterprise":
             enterprise_node = data["data"]
             for _ in range(num_tasks_per_enterprise):
                 complexity = random.uniform(1e9, 1e11)  # FLOPS
                 data_size = random.uniform(50, 500)  # MB
                 enterprise_node.create_task(complexity, data_size)
-                print(f"Task created for {node}: {complexity:.2e} FLOPS, {data_size:.2f} MB")
 
 
 
@@ -42,18 +46,77 @@ def run_simulation(num_users, num_enterprises, num_tasks_per_enterprise):
 
     # Step 3: Allocate tasks
     print("Allocating tasks...")
-    allocator = TaskAllocator(graph)
+    event_manager = EventManager()
+    allocator = TaskAllocator(graph, event_manager, verbose=False)
     allocator.allocate_tasks()
 
-    # Step 4: Collect and summarize results
-    print("Simulation complete. Summary:")
+    # Step 4: Process the timeline headlessly, tracing every task
+    print("Running simulation...")
+    engine = SimulationEngine(graph, event_manager)
+    trace = TaskTrace()
+    engine.add_observer(trace.observe)
+    result = engine.run_to_completion()
+
+    # Step 5: Collect and summarize results
+    print(f"Simulation complete: {result.processed_events} events, "
+          f"{result.completed_tasks} tasks returned, makespan {result.final_time:.2f} seconds. Summary:")
     for node, data in graph.nodes(data=True):
         if data["type"] == "enterprise":
-            pending_tasks = len(data["data"].get_pending_tasks())
-            completed_tasks = len(data["data"].task_queue) - pending_tasks
+            pending_tasks = data["data"].pending_count
+            completed_tasks = data["data"].completed_count
             print(
                 f"{node}: {completed_tasks} tasks completed, {pending_tasks} tasks pending."
             )
 
-    return graph
+    metrics = Metrics()
+    metrics.record_trace(trace, users=[node for node, data in graph.nodes(data=True) if data["type"] == "user"])
+    metrics.summarize()
+
+    return graph, result
+
+
+def run_streaming_simulation(num_users, num_enterprises, arrival_rate, horizon, seed=None,
+                             snapshot_path=None, snapshot_interval=None):
+    """
+    Run a long-horizon simulation where tasks arrive as a Poisson process.
+
+    Tasks are created lazily as simulation time reaches them instead of
+    being generated up front.
+
+    :param num_users: Number of user nodes.
+    :param num_enterprises: Number of enterprise nodes.
+    :param arrival_rate: Mean tasks per second for each enterprise.
+    :param horizon: Simulation time after which no new tasks arrive (seconds).
+    :param seed: Seed for the topology and the arrival streams.
+    :param snapshot_path: File to append periodic metric snapshots to (.csv or JSON Lines).
+    :param snapshot_interval: Simulation seconds between snapshots.
+    """
+    builder = GraphBuilder(archive_completed=True)
+    builder.create_random_graph(num_users, num_enterprises, connection_probability=0.3, seed=seed)
+    graph = builder.get_graph()
+
+    event_manager = EventManager()
+    allocator = TaskAllocator(graph, event_manager, verbose=False)
+    engine = SimulationEngine(graph, event_manager)
+
+    enterprises = [node for node, data in graph.nodes(data=True) if data["type"] == "enterprise"]
+    sources = {
+        enterprise: poisson_task_source(
+            arrival_rate,
+            seed=None if seed is None else seed + i + 1,
+            horizon=horizon,
+        )
+        for i, enterprise in enumerate(enterprises)
+    }
+    arrivals = TaskArrivalProcess(graph, event_manager, allocator, sources)
+    arrivals.attach(engine)
+    metrics = StreamingMetrics(snapshot_path=snapshot_path, snapshot_interval=snapshot_interval)
+    engine.add_observer(metrics.observe)
 
+    result = engine.run_to_completion()
+    print(f"Streaming simulation complete: {arrivals.arrived_tasks} tasks arrived, "
+          f"{result.completed_tasks} returned, {arrivals.dropped_tasks} dropped, "
+          f"makespan {result.final_time:.2f} seconds.")
+    print(f"Latency p50 {metrics.latency.quantile(0.5):.2f}s, p99 {metrics.latency.quantile(0.99):.2f}s, "
+          f"throughput {metrics.throughput():.2f} tasks/s over the last {metrics.window:.0f} seconds.")
+    return graph, result
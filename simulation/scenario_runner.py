@@ -0,0 +1,303 @@
+"""
+Run the scenarios described in configs/ as parallel headless simulations.
+
+Example, from the repository root:
+
+    python -m simulation.scenario_runner --replicates 8 --workers 8 --output results.json
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import itertools
+import json
+import os
+import random
+
+import numpy as np
+
+from models.event_manager import EventManager
+from models.graph_builder import GraphBuilder
+from models.task_allocator import TaskAllocator
+from simulation.chain_executor import ChainExecutor
+from simulation.engine import SimulationEngine
+from simulation.metrics import Metrics
+from simulation.online_scheduler import OnlineScheduler
+from simulation.trace import TaskTrace
+
+
+# Link characteristics assumed for each scenario "network_type"
+NETWORK_PROFILES = {
+    "WiFi": {"bandwidth_range": [10, 100], "latency_range": [10, 50]},
+    "4G": {"bandwidth_range": [5, 50], "latency_range": [30, 100]},
+    "5G": {"bandwidth_range": [50, 300], "latency_range": [5, 20]},
+}
+
+# Parameters a scenario may leave out
+DEFAULT_PARAMETERS = {
+    "num_users": 100,
+    "num_enterprises": 10,
+    "tasks_per_enterprise": 10,
+    "task_complexity": 10,  # Mean task complexity in units of 1e10 FLOPS
+    "data_size_range": [5, 50],  # MB
+    "connection_probability": 0.3,
+    "chain_length": 3,
+    "allocation_strategy": "shortest_queue",
+    "live_execution": False,  # Run chains through a ChainExecutor, each user working its queue in order
+    "contention": False,  # With live execution, share node bandwidth between concurrent transfers
+    "online": False,  # Dispatch tasks inside the event loop as users free up
+    "scheduling_interval": None,  # With "online", seconds between scheduling rounds; None to dispatch on free-up
+    "work_stealing": False,  # With live execution, let idle users take waiting subtasks from backlogged ones
+    "micro_batches": 1,  # Pipeline each task through its chain in this many micro-batches
+    "activation_sizes": None,  # MB sent on by each hop; None to ship the task's data size
+    "gpu_power_range": [1.5, 3.0],
+    "bandwidth_range": [10, 100],
+    "latency_range": [10, 50],
+}
+
+METRIC_NAMES = [
+    "makespan", "throughput", "mean_latency", "p50_latency", "p99_latency",
+    "mean_utilisation", "completed_tasks", "steals", "stolen_mb", "events", "wall_time",
+]
+
+
+def load_scenarios(scenario_path, config_path=None):
+    """
+    Load scenario definitions merged over the base configuration.
+
+    :param scenario_path: Path to a JSON list of scenarios.
+    :param config_path: Optional path to a JSON object of shared defaults.
+    :return: List of scenario dicts.
+    """
+    base = dict(DEFAULT_PARAMETERS)
+    if config_path:
+        with open(config_path) as f:
+            base.update(json.load(f))
+
+    with open(scenario_path) as f:
+        scenarios = json.load(f)
+
+    merged = []
+    for i, scenario in enumerate(scenarios):
+        parameters = dict(base)
+        network = NETWORK_PROFILES.get(scenario.get("network_type"))
+        if network:
+            parameters.update(network)
+        parameters.update(scenario)
+        parameters.setdefault("name", f"scenario_{i}")
+        merged.append(parameters)
+    return merged
+
+
+def expand_grid(scenario):
+    """
+    Expand list-valued parameters of a scenario into a parameter grid.
+
+    Keys ending in "_range" are (min, max) pairs and are never expanded.
+
+    :param scenario: Scenario dict, possibly with list-valued parameters.
+    :return: List of scenario dicts, one per grid point.
+    """
+    axes = [
+        key for key, value in scenario.items()
+        if isinstance(value, list) and not key.endswith("_range")
+    ]
+    if not axes:
+        return [dict(scenario)]
+
+    points = []
+    for values in itertools.product(*(scenario[key] for key in axes)):
+        point = dict(scenario)
+        point.update(zip(axes, values))
+        label = ", ".join(f"{key}={value}" for key, value in zip(axes, values))
+        point["name"] = f"{scenario['name']} [{label}]"
+        points.append(point)
+    return points
+
+
+def build_jobs(scenarios, replicates, seed):
+    """
+    Build one job per grid point and replicate.
+
+    Every grid point uses the same replicate seeds, so scenarios are
+    compared on common random numbers.
+
+    :param scenarios: List of scenario dicts.
+    :param replicates: Number of replicates per grid point.
+    :param seed: Base seed.
+    :return: List of parameter dicts, each with a "seed" and "replicate".
+    """
+    replicate_seeds = np.random.SeedSequence(seed).generate_state(replicates).tolist()
+    jobs = []
+    for scenario in scenarios:
+        for point in expand_grid(scenario):
+            for replicate, replicate_seed in enumerate(replicate_seeds):
+                jobs.append({**point, "seed": replicate_seed, "replicate": replicate})
+    return jobs
+
+
+def run_scenario(parameters):
+    """
+    Build, allocate and simulate one scenario replicate headlessly.
+
+    :param parameters: Scenario parameters including "seed".
+    :return: Dict of metrics for the run.
+    """
+    seed = parameters["seed"]
+    builder = GraphBuilder(columnar=parameters.get("columnar", False))
+    builder.create_random_graph(
+        parameters["num_users"],
+        parameters["num_enterprises"],
+        parameters["connection_probability"],
+        seed=seed,
+        gpu_power_range=parameters["gpu_power_range"],
+        bandwidth_range=parameters["bandwidth_range"],
+        latency_range=parameters["latency_range"],
+    )
+    graph = builder.get_graph()
+
+    rng = random.Random(seed)
+    mean_complexity = parameters["task_complexity"] * 1e10
+    for node, data in graph.nodes(data=True):
+        if data["type"] == "enterprise":
+            for _ in range(parameters["tasks_per_enterprise"]):
+                data["data"].create_task(
+                    rng.uniform(0.5, 1.5) * mean_complexity,
+                    rng.uniform(*parameters["data_size_range"]),
+                )
+
+    random.seed(seed)  # The allocator shuffles with the module-level RNG
+    event_manager = EventManager()
+    engine = SimulationEngine(graph, event_manager)
+    executor = None
+    online = parameters.get("online", False)
+    contention = parameters.get("contention", False)
+    work_stealing = parameters.get("work_stealing", False)
+    if online or parameters.get("live_execution", False):
+        executor = ChainExecutor(graph, event_manager, contention=contention, work_stealing=work_stealing)
+        executor.attach(engine)
+    elif contention or work_stealing:
+        raise ValueError("Contention and work stealing need live execution; set live_execution or online")
+    allocator = TaskAllocator(graph, event_manager, verbose=False, executor=executor,
+                              strategy=parameters.get("allocation_strategy", "shortest_queue"),
+                              micro_batches=parameters.get("micro_batches", 1),
+                              activation_sizes=parameters.get("activation_sizes"))
+    if online:
+        scheduler = OnlineScheduler(graph, event_manager, allocator, chain_length=parameters["chain_length"],
+                                    interval=parameters.get("scheduling_interval"))
+        scheduler.attach(engine)
+        scheduler.submit_pending()
+    else:
+        allocator.allocate_tasks(d=parameters["chain_length"])
+    trace = TaskTrace()
+    engine.add_observer(trace.observe)
+    result = engine.run_to_completion()
+
+    metrics = Metrics()
+    metrics.record_trace(trace, users=[node for node, data in graph.nodes(data=True) if data["type"] == "user"])
+    latencies = trace.latencies()
+    p50_latency = metrics.latency_percentiles.get(50, 0.0)
+    p99_latency = metrics.latency_percentiles.get(99, 0.0)
+    if online:
+        # The trace starts a task's clock at dispatch; count its wait for users too
+        latencies = np.asarray(scheduler.response_times)
+        p50_latency, p99_latency = scheduler.response_percentile(50), scheduler.response_percentile(99)
+    return {
+        "name": parameters["name"],
+        "replicate": parameters["replicate"],
+        "seed": seed,
+        "makespan": metrics.makespan,
+        "throughput": metrics.throughput,
+        "mean_latency": float(latencies.mean()) if latencies.size else 0.0,
+        "p50_latency": p50_latency,
+        "p99_latency": p99_latency,
+        "mean_utilisation": metrics.mean_utilisation,
+        "completed_tasks": metrics.completed_tasks,
+        "steals": metrics.steals,
+        "stolen_mb": metrics.stolen_mb,
+        "events": result.processed_events,
+        "wall_time": result.wall_time,
+    }
+
+
+def run_jobs(jobs, workers=None):
+    """
+    Run jobs across a process pool.
+
+    :param jobs: List of parameter dicts from build_jobs.
+    :param workers: Number of worker processes; defaults to the CPU count.
+    :return: List of per-run metric dicts, in job order.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [run_scenario(job) for job in jobs]
+    chunksize = max(1, len(jobs) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(run_scenario, jobs, chunksize=chunksize))
+
+
+def aggregate(runs):
+    """
+    Aggregate replicate metrics per scenario.
+
+    :param runs: List of per-run metric dicts.
+    :return: List of dicts with mean and standard deviation of every metric.
+    """
+    by_name = {}
+    for run in runs:
+        by_name.setdefault(run["name"], []).append(run)
+
+    summary = []
+    for name, group in by_name.items():
+        row = {"name": name, "replicates": len(group)}
+        for metric in METRIC_NAMES:
+            values = np.array([run[metric] for run in group], dtype=float)
+            row[f"{metric}_mean"] = float(values.mean())
+            row[f"{metric}_std"] = float(values.std(ddof=1)) if len(values) > 1 else 0.0
+        summary.append(row)
+    return summary
+
+
+def write_summary(summary, path):
+    """
+    Write aggregated results as JSON or CSV depending on the file extension.
+
+    :param summary: Output of aggregate.
+    :param path: Destination path ending in .json or .csv.
+    """
+    if path.endswith(".csv"):
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(summary[0].keys()))
+            writer.writeheader()
+            writer.writerows(summary)
+    else:
+        with open(path, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run simulation scenarios in parallel.")
+    parser.add_argument("--scenarios", default="configs/scenario.json", help="JSON list of scenarios.")
+    parser.add_argument("--config", default="configs/config.json", help="JSON object of shared defaults.")
+    parser.add_argument("--replicates", type=int, default=4, help="Replicates per grid point.")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed for replicate seeds.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores).")
+    parser.add_argument("--output", default=None, help="Write the summary to a .json or .csv file.")
+    args = parser.parse_args(argv)
+
+    scenarios = load_scenarios(args.scenarios, args.config)
+    jobs = build_jobs(scenarios, args.replicates, args.seed)
+    print(f"Running {len(jobs)} simulations...")
+    summary = aggregate(run_jobs(jobs, args.workers))
+
+    for row in summary:
+        print(f"{row['name']}: makespan {row['makespan_mean']:.2f}s "
+              f"(±{row['makespan_std']:.2f}), throughput {row['throughput_mean']:.3f} tasks/s, "
+              f"mean latency {row['mean_latency_mean']:.2f}s over {row['replicates']} replicates")
+
+    if args.output:
+        write_summary(summary, args.output)
+        print(f"Summary written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+from array import array
+import numpy as np
+from models.records import SubTask
+
+
+TRANSMIT = 0
+COMPUTE = 1
+
+
+class TaskTrace:
+    """
+    Compact per-task timing trace built from the processed events.
+
+    Register ``trace.observe`` with SimulationEngine.add_observer. Every
+    transfer and computation of a task becomes one row of typed-array
+    columns (task, kind, hop, node, start, end), and every task one row of
+    (enterprise, allocated, returned). A task is allocated when its first
+    transfer leaves the enterprise and returned when the result arrives
+    back. Only events carrying a ``start`` time describe an activity; others
+    are ignored. Pipelined micro-batches each get their own rows, so a task
+    returns when its last micro-batch arrives.
+
+    Observed tasks also get their ``gpu_time`` and ``transmission_time``
+    fields filled in. Transfers that move a stolen subtask (events with
+    ``stolen_from``) are counted in ``steals`` and ``stolen_mb``.
+    """
+    ACTIVITY_FIELDS = {"task": "q", "kind": "b", "hop": "h", "node": "q", "start": "d", "end": "d"}
+    TASK_FIELDS = {"enterprise": "q", "allocated": "d", "returned": "d"}
+
+    def __init__(self):
+        self.activities = {name: array(typecode) for name, typecode in self.ACTIVITY_FIELDS.items()}
+        self.tasks = {name: array(typecode) for name, typecode in self.TASK_FIELDS.items()}
+        self.node_ids = []
+        self.node_index = {}
+        self._task_rows = {}  # Task -> task row, until the task returned
+        self._hops = array("h")  # Hops reached so far, per task row
+        self.steals = 0
+        self.stolen_mb = 0.0
+
+    def __len__(self):
+        return len(self._hops)
+
+    def observe(self, event):
+        """
+        Record the activity an event completes.
+
+        :param event: A processed Event.
+        """
+        if event.start is None or event.task is None:
+            return
+        if event.type == "data_transmission":
+            self._record_transmission(event)
+        elif event.type == "calculation" and isinstance(event.task, SubTask):
+            self._record_computation(event)
+
+    def _record_transmission(self, event):
+        task = event.task
+        to_user = isinstance(task, SubTask)
+        if to_user:
+            task = task.task
+            if task is None:
+                return
+        row = self._task_row(task, event.from_node if to_user else event.to_node, event.start)
+        hop = self._hops[row]
+        if to_user:
+            if "stolen_from" in event:
+                self.steals += 1
+                self.stolen_mb += event.size or 0.0
+            # Pipelined chains interleave the transfers of different hops
+            if event.task.hop is not None:
+                hop = event.task.hop
+            self._hops[row] = max(self._hops[row], hop + 1)
+        self._append(row, TRANSMIT, hop, event.to_node, event.start, event.time)
+        task.transmission_time = (task.transmission_time or 0) + (event.time - event.start)
+        if not to_user:
+            self.tasks["returned"][row] = event.time
+            if "batch" not in event:
+                del self._task_rows[task]  # Its last activity; the row stays in the columns
+
+    def _record_computation(self, event):
+        task = event.task.task
+        if task is None:
+            return
+        row = self._task_row(task, None, event.start)
+        hop = event.task.hop if event.task.hop is not None else self._hops[row] - 1
+        self._append(row, COMPUTE, hop, event.node, event.start, event.time)
+        task.gpu_time = (task.gpu_time or 0) + (event.time - event.start)
+
+    def _task_row(self, task, enterprise, allocated):
+        row = self._task_rows.get(task)
+        if row is None:
+            row = self._task_rows[task] = len(self._hops)
+            self._hops.append(0)
+            self.tasks["enterprise"].append(-1 if enterprise is None else self._node(enterprise))
+            self.tasks["allocated"].append(allocated)
+            self.tasks["returned"].append(np.nan)
+        return row
+
+    def _node(self, node_id):
+        index = self.node_index.get(node_id)
+        if index is None:
+            index = self.node_index[node_id] = len(self.node_ids)
+            self.node_ids.append(node_id)
+        return index
+
+    def _append(self, row, kind, hop, node_id, start, end):
+        columns = self.activities
+        columns["task"].append(row)
+        columns["kind"].append(kind)
+        columns["hop"].append(hop)
+        columns["node"].append(self._node(node_id))
+        columns["start"].append(start)
+        columns["end"].append(end)
+
+    def activity_columns(self):
+        """
+        :return: Dict of NumPy copies of the activity columns.
+        """
+        return {name: np.array(column) for name, column in self.activities.items()}
+
+    def task_columns(self):
+        """
+        :return: Dict of NumPy copies of the task columns.
+        """
+        return {name: np.array(column) for name, column in self.tasks.items()}
+
+    def latencies(self):
+        """
+        :return: Array of allocation-to-return times of the returned tasks.
+        """
+        tasks = self.task_columns()
+        returned = ~np.isnan(tasks["returned"])
+        return tasks["returned"][returned] - tasks["allocated"][returned]
+
+    def busy_time(self, kind=COMPUTE):
+        """
+        Total time every node spent on one kind of activity.
+
+        :param kind: COMPUTE or TRANSMIT (time spent receiving).
+        :return: Array indexed like ``node_ids``.
+        """
+        activities = self.activity_columns()
+        selected = activities["kind"] == kind
+        return np.bincount(
+            activities["node"][selected],
+            weights=activities["end"][selected] - activities["start"][selected],
+            minlength=len(self.node_ids),
+        )
+
+    def occupied_time(self, kind=COMPUTE):
+        """
+        Time every node spent on at least one activity of a kind.
+
+        Unlike busy_time, overlapping activities on a node (e.g. subtasks a
+        static shortest_queue schedule runs side by side) count once.
+
+        :param kind: COMPUTE or TRANSMIT (time spent receiving).
+        :return: Array indexed like ``node_ids``.
+        """
+        activities = self.activity_columns()
+        selected = activities["kind"] == kind
+        nodes = activities["node"][selected]
+        if not nodes.size:
+            return np.zeros(len(self.node_ids))
+        origin = activities["start"][selected].min()
+        starts = activities["start"][selected] - origin
+        ends = activities["end"][selected] - origin
+        # Offset every node's intervals past the previous node's, so one
+        # running maximum of the end times restarts at each node
+        offsets = nodes * (ends.max() + 1.0)
+        order = np.lexsort((starts, nodes))
+        starts, ends = (starts + offsets)[order], (ends + offsets)[order]
+        covered = np.concatenate(([-np.inf], np.maximum.accumulate(ends)[:-1]))
+        return np.bincount(nodes[order], weights=np.maximum(ends - np.maximum(starts, covered), 0.0),
+                           minlength=len(self.node_ids))
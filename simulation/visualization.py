@@ -1,33 +1,40 @@
 import matplotlib.pyplot as plt
 import networkx as nx
+from simulation.layout import fixed_layout
+from simulation.renderer import MAX_LABELLED_NODES
 
 
-def plot_graph(graph):
+def plot_graph(graph, seed=0, cluster=True, cache_dir=None):
     """
     Plot the graph with node types and edge attributes.
 
     :param graph: The graph to plot.
+    :param seed: Seed of the node layout.
+    :param cluster: Group users under the enterprise they are connected to.
+    :param cache_dir: Directory of cached layouts, e.g. layout.DEFAULT_CACHE_DIR; None to always compute it.
     """
-    pos = nx.spring_layout(graph)
+    pos = fixed_layout(graph, seed=seed, cluster=cluster, cache_dir=cache_dir)
+    with_labels = graph.number_of_nodes() <= MAX_LABELLED_NODES
     node_colors = [
         "blue" if data["type"] == "user" else "green" for _, data in graph.nodes(data=True)
     ]
-    edge_labels = {
-        (u, v): f'{data["bandwidth"]} Mbps\n{data["latency"]} ms'
-        for u, v, data in graph.edges(data=True)
-    }
 
     plt.figure(figsize=(20, 10))
     nx.draw(
         graph,
         pos,
-        with_labels=True,
+        with_labels=with_labels,
         node_size=1000,
         node_color=node_colors,
         font_size=6,
         font_color="black",
     )
-    nx.draw_networkx_edge_labels(graph, pos, edge_labels=edge_labels, font_size=5)
+    if with_labels:
+        edge_labels = {
+            (u, v): f'{data["bandwidth"]} Mbps\n{data["latency"]} ms'
+            for u, v, data in graph.edges(data=True)
+        }
+        nx.draw_networkx_edge_labels(graph, pos, edge_labels=edge_labels, font_size=5)
     plt.title("Graph Visualization")
     plt.show()
 
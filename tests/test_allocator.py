@@ -1,6 +1,8 @@
 import unittest
+from models.event_manager import EventManager
 from models.graph_builder import GraphBuilder
 from models.task_allocator import TaskAllocator
+from simulation.engine import SimulationEngine
 
 class TestTaskAllocator(unittest.TestCase):
     def setUp(self):
@@ -37,5 +39,151 @@ class TestTaskAllocator(unittest.TestCase):
         uncompleted_tasks = [task for task in enterprise_data.task_queue if not task["completed"]]
         self.assertEqual(len(uncompleted_tasks), 1)
 
+class TestEarliestFinishAllocation(unittest.TestCase):
+    def setUp(self):
+        self.builder = GraphBuilder()
+        for i in range(3):
+            self.builder.add_user_node(f"slow_{i}", gpu_power=0.5, bandwidth=50, latency=10)
+        for i in range(3):
+            self.builder.add_user_node(f"fast_{i}", gpu_power=4.0 + i, bandwidth=50, latency=10)
+        self.builder.add_enterprise_node("enterprise_1")
+        self.graph = self.builder.get_graph()
+        self.enterprise = self.graph.nodes["enterprise_1"]["data"]
+
+    def _allocate(self, strategy, num_tasks):
+        for _ in range(num_tasks):
+            self.enterprise.create_task(complexity=1e12, data_size=10)
+        event_manager = EventManager()
+        allocator = TaskAllocator(self.graph, event_manager, verbose=False, strategy=strategy)
+        allocator.allocate_tasks(d=3)
+        return allocator, event_manager
+
+    def test_prefers_fast_users_and_splits_by_gpu_power(self):
+        allocator, _ = self._allocate("earliest_finish", 1)
+
+        chain = [node for node, data in self.graph.nodes(data=True)
+                 if data["type"] == "user" and data["data"].queue]
+        self.assertEqual(sorted(chain), ["fast_0", "fast_1", "fast_2"])
+
+        portions = {node: self.graph.nodes[node]["data"].queue[0][0]["portion"] for node in chain}
+        self.assertAlmostEqual(sum(portions.values()), 1e12)
+        self.assertAlmostEqual(portions["fast_2"] / portions["fast_0"], 6.0 / 4.0)
+
+    def test_lower_makespan_than_shortest_queue(self):
+        makespans = {}
+        for strategy in ("shortest_queue", "earliest_finish"):
+            self.setUp()
+            _, event_manager = self._allocate(strategy, 6)
+            result = SimulationEngine(self.graph, event_manager).run_to_completion()
+            makespans[strategy] = max(result.completion_times)
+        self.assertLess(makespans["earliest_finish"], makespans["shortest_queue"])
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            TaskAllocator(self.graph, EventManager(), strategy="random")
+
+class TestBatchAllocation(unittest.TestCase):
+    def setUp(self):
+        self.builder = GraphBuilder()
+        self.builder.create_random_graph(num_users=20, num_enterprises=2, connection_probability=0.3, seed=1)
+        self.graph = self.builder.get_graph()
+        for node, data in self.graph.nodes(data=True):
+            if data["type"] == "enterprise":
+                for _ in range(15):
+                    data["data"].create_task(complexity=1e11, data_size=10)
+
+    def test_batch_allocates_every_task_in_chains(self):
+        event_manager = EventManager()
+        allocator = TaskAllocator(self.graph, event_manager, verbose=False, strategy="earliest_finish")
+        self.assertEqual(allocator.allocate_batch(d=3), 30)
+
+        # A transmission and a calculation per hop, plus the return transmission
+        self.assertEqual(len(event_manager), 30 * 7)
+        queued = sum(len(data["data"].queue) for _, data in self.graph.nodes(data=True) if data["type"] == "user")
+        self.assertEqual(queued, 30 * 3)
+
+        result = SimulationEngine(self.graph, event_manager).run_to_completion()
+        self.assertEqual(result.completed_tasks, 30)
+
+    def test_too_few_users(self):
+        allocator = TaskAllocator(self.graph, EventManager(), verbose=False)
+        self.assertEqual(allocator.allocate_batch(d=25), 0)
+
+class TestBatchRanking(unittest.TestCase):
+    def setUp(self):
+        self.builder = GraphBuilder()
+        for i in range(3):
+            self.builder.add_user_node(f"user_{i}", gpu_power=1.0, bandwidth=50, latency=10)
+        self.builder.add_enterprise_node("enterprise_1")
+        self.graph = self.builder.get_graph()
+        self.graph.nodes["enterprise_1"]["data"].create_task(complexity=1e11, data_size=10)
+
+    def add_user(self, node_id, gpu_power, duration, start_time):
+        self.builder.add_user_node(node_id, gpu_power=gpu_power, bandwidth=50, latency=10)
+        user = self.graph.nodes[node_id]["data"]
+        user.add_task({"duration": duration}, start_time)
+        return user
+
+    def chain(self, strategy):
+        users = {node: data["data"] for node, data in self.graph.nodes(data=True) if data["type"] == "user"}
+        queued = {node: len(user.queue) for node, user in users.items()}
+        TaskAllocator(self.graph, EventManager(), verbose=False, strategy=strategy).allocate_batch(d=3)
+        return sorted(node for node, user in users.items() if len(user.queue) > queued[node])
+
+    def test_shortest_queue_ranks_by_queued_work(self):
+        self.add_user("booked", 1.0, duration=1.0, start_time=100.0)  # Little work, but free late
+        self.add_user("busy", 1.0, duration=5.0, start_time=0.0)
+        self.graph.nodes["user_0"]["data"].add_task({"duration": 2.0}, 0.0)
+        self.assertEqual(self.chain("shortest_queue"), ["booked", "user_1", "user_2"])
+
+    def test_earliest_finish_ranks_by_finish_time(self):
+        self.add_user("fast", 50.0, duration=0.1, start_time=0.0)  # Busy, but finishes a share first
+        self.assertEqual(self.chain("earliest_finish"), ["fast", "user_0", "user_1"])
+
+class TestPipelinedAllocation(unittest.TestCase):
+    def setUp(self):
+        self.builder = GraphBuilder()
+        for i in range(3):
+            self.builder.add_user_node(f"user_{i}", gpu_power=2.0, bandwidth=50, latency=10)
+        self.builder.add_enterprise_node("enterprise_1")
+        self.graph = self.builder.get_graph()
+        self.graph.nodes["enterprise_1"]["data"].create_task(complexity=4e12, data_size=100)
+
+    def _run(self, batch=False, **options):
+        event_manager = EventManager()
+        allocator = TaskAllocator(self.graph, event_manager, verbose=False, **options)
+        allocator.allocate_batch(d=3) if batch else allocator.allocate_tasks(d=3)
+        return SimulationEngine(self.graph, event_manager).run_to_completion()
+
+    def test_micro_batches_overlap_hops(self):
+        store_and_forward = max(self._run().completion_times)
+        self.setUp()
+        result = self._run(micro_batches=4)
+        self.assertLess(max(result.completion_times), store_and_forward)
+        # Partial micro-batches neither complete the task nor drain the queues early
+        self.assertEqual(result.completed_tasks, 1)
+        self.assertEqual(result.events_by_type["data_transmission"], 4 * 4)
+        self.assertTrue(all(data["data"].active_task is None and not data["data"].queue
+                            for _, data in self.graph.nodes(data=True) if data["type"] == "user"))
+
+    def test_batch_matches_per_task_timing(self):
+        per_task = max(self._run(micro_batches=4, activation_sizes=[20, 20, 5]).completion_times)
+        self.setUp()
+        self.assertAlmostEqual(max(self._run(batch=True, micro_batches=4, activation_sizes=[20, 20, 5]).completion_times),
+                               per_task)
+
+    def test_smaller_activations_shorten_the_chain(self):
+        full = max(self._run(micro_batches=2).completion_times)
+        self.setUp()
+        self.assertLess(max(self._run(micro_batches=2, activation_sizes=[10, 10, 10]).completion_times), full)
+
+    def test_invalid_options(self):
+        with self.assertRaises(ValueError):
+            TaskAllocator(self.graph, EventManager(), micro_batches=0)
+        with self.assertRaises(ValueError):
+            TaskAllocator(self.graph, EventManager(), micro_batches=2, executor=object())
+        with self.assertRaises(ValueError):
+            self._run(activation_sizes=[10, 10])
+
 if __name__ == "__main__":
     unittest.main()
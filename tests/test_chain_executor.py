@@ -0,0 +1,91 @@
+import random
+import unittest
+from models.event_manager import EventManager
+from models.graph_builder import GraphBuilder
+from models.task_allocator import TaskAllocator
+from simulation.arrivals import TaskArrivalProcess, poisson_task_source
+from simulation.chain_executor import ChainExecutor
+from simulation.engine import SimulationEngine
+from simulation.metrics import Metrics, StreamingMetrics
+from simulation.trace import TaskTrace
+
+class TestChainExecutor(unittest.TestCase):
+    def build(self, tasks_per_enterprise):
+        builder = GraphBuilder()
+        for i in range(6):
+            builder.add_user_node(f"user_{i}", gpu_power=2.0, bandwidth=50, latency=10)
+        builder.add_enterprise_node("enterprise_1")
+        graph = builder.get_graph()
+        for _ in range(tasks_per_enterprise):
+            graph.nodes["enterprise_1"]["data"].create_task(complexity=1e10, data_size=100)
+        return graph
+
+    def run_graph(self, graph, contention, live=True):
+        random.seed(0)
+        event_manager = EventManager()
+        engine = SimulationEngine(graph, event_manager)
+        executor = None
+        if live:
+            executor = ChainExecutor(graph, event_manager, contention=contention)
+            executor.attach(engine)
+        TaskAllocator(graph, event_manager, verbose=False, executor=executor).allocate_tasks(d=3)
+        trace = TaskTrace()
+        engine.add_observer(trace.observe)
+        return engine.run_to_completion(), trace, executor
+
+    def test_lone_chain_matches_static_schedule(self):
+        static, _, _ = self.run_graph(self.build(1), contention=False, live=False)
+        for contention in (False, True):
+            live, _, executor = self.run_graph(self.build(1), contention=contention)
+            self.assertAlmostEqual(max(live.completion_times), max(static.completion_times))
+            self.assertEqual(live.completed_tasks, 1)
+            self.assertFalse(executor.routes)
+
+    def test_concurrent_chains_share_capacity(self):
+        dedicated, dedicated_trace, _ = self.run_graph(self.build(4), contention=False)
+        contended, trace, executor = self.run_graph(self.build(4), contention=True)
+        self.assertEqual(contended.completed_tasks, 4)
+        self.assertEqual(len(executor.network), 0)
+        # Both run users' queues in order; the chains now also share their links
+        self.assertGreater(trace.latencies().max(), dedicated_trace.latencies().max())
+        self.assertGreater(max(contended.completion_times), max(dedicated.completion_times))
+        self.assertFalse(executor.arrived)
+
+    def test_work_stealing_shortens_makespan(self):
+        makespan = {}
+        for work_stealing in (False, True):
+            builder = GraphBuilder()
+            builder.create_random_graph(30, 2, 0.3, seed=4)
+            graph = builder.get_graph()
+            random.seed(0)
+            event_manager = EventManager()
+            engine = SimulationEngine(graph, event_manager)
+            executor = ChainExecutor(graph, event_manager, contention=False, work_stealing=work_stealing)
+            executor.attach(engine)
+            allocator = TaskAllocator(graph, event_manager, verbose=False, executor=executor)
+            enterprises = [node for node, data in graph.nodes(data=True) if data["type"] == "enterprise"]
+            sources = {enterprise: poisson_task_source(rate=2.0, seed=i + 41, horizon=100)
+                       for i, enterprise in enumerate(enterprises)}
+            arrivals = TaskArrivalProcess(graph, event_manager, allocator, sources)
+            arrivals.attach(engine)
+            trace = TaskTrace()
+            engine.add_observer(trace.observe)
+            streaming = StreamingMetrics()
+            engine.add_observer(streaming.observe)
+            result = engine.run_to_completion()
+
+            self.assertEqual(result.completed_tasks, arrivals.arrived_tasks)
+            self.assertFalse(executor.routes or executor.arrived or executor.waiting or executor.migrating)
+            users = [data["data"] for _, data in graph.nodes(data=True) if data["type"] == "user"]
+            self.assertTrue(all(user.backlog == 0.0 and not user.queue for user in users))
+            metrics = Metrics()
+            metrics.record_trace(trace)
+            self.assertEqual(metrics.steals, executor.steals)
+            self.assertEqual(streaming.steals, executor.steals)
+            self.assertAlmostEqual(metrics.stolen_mb, executor.stolen_mb)
+            makespan[work_stealing] = result.final_time
+        self.assertGreater(executor.steals, 0)
+        self.assertLess(makespan[True], makespan[False])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import itertools
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from models.event_manager import EventManager
+from models.graph_builder import GraphBuilder
+from models.task_allocator import TaskAllocator
+from PIL import Image
+from simulation.dynamic_simulation import DynamicSimulator
+from simulation.export import FRAME_PATTERN, write_gif
+
+class SimulatorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.builder = GraphBuilder()
+        for i in range(4):
+            self.builder.add_user_node(f"user_{i}", gpu_power=2.0, bandwidth=50, latency=10)
+        self.builder.add_enterprise_node("enterprise_0")
+        self.graph = self.builder.get_graph()
+        enterprise = self.graph.nodes["enterprise_0"]["data"]
+        for _ in range(5):
+            enterprise.create_task(complexity=1e11, data_size=20)
+
+        self.event_manager = EventManager()
+        TaskAllocator(self.graph, self.event_manager, verbose=False).allocate_tasks()
+        self.total_events = len(self.event_manager)
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        self.simulator = DynamicSimulator(self.graph, self.event_manager, verbose=False, cache_dir=self.cache_dir)
+
+class TestLayoutCache(SimulatorTestCase):
+    def test_layout_is_cached_only_when_asked(self):
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        uncached = DynamicSimulator(self.graph, EventManager(), verbose=False)
+        self.assertIsNone(uncached.cache_dir)
+        self.assertEqual(uncached.positions, self.simulator.positions)
+
+class TestPlayback(SimulatorTestCase):
+    def test_frames_cover_fixed_time_slices(self):
+        frames = list(self.simulator.playback_frames(fps=10, speed=2.0, skip_frames=False))
+
+        self.assertEqual(len(self.event_manager), 0)
+        self.assertEqual(self.simulator.results().completed_tasks, 5)
+        for events, sim_time in frames:
+            self.assertTrue(all(event.time <= sim_time for event in events))
+        # Consecutive non-empty slices are 0.2 s of simulation time apart unless idle time was skipped
+        times = [sim_time for _, sim_time in frames]
+        self.assertTrue(all(later - earlier >= 0.2 - 1e-9 for earlier, later in zip(times, times[1:])))
+
+    def test_slow_frames_are_merged(self):
+        slow_clock = itertools.count(step=1.0).__next__  # Every frame takes one wall-clock second
+        fast = list(self.simulator.playback_frames(fps=10, speed=1.0, skip_frames=False))
+
+        self.setUp()
+        slow = list(self.simulator.playback_frames(fps=10, speed=1.0, clock=slow_clock))
+
+        self.assertLess(len(slow), len(fast))
+        self.assertEqual(sum(len(events) for events, _ in slow), sum(len(events) for events, _ in fast))
+
+    def test_max_events_per_frame(self):
+        frames = list(self.simulator.playback_frames(max_events_per_frame=1))
+
+        self.assertTrue(all(len(events) == 1 for events, _ in frames))
+        self.assertEqual(self.simulator.processed_events, len(frames))
+
+    def test_animation_draws_frames(self):
+        fig, ax = plt.subplots()
+        animation = self.simulator.animate(ax, fps=30, speed=50.0)
+        for frame in animation.new_frame_seq():
+            animation._draw_next_frame(frame, blit=False)
+        plt.close(fig)
+
+        self.assertEqual(len(self.event_manager), 0)
+        self.assertGreaterEqual(self.simulator.processed_events, self.total_events)
+
+class TestExport(SimulatorTestCase):
+    def setUp(self):
+        super().setUp()
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+    def test_png_sequence_in_parallel(self):
+        frame_dir = os.path.join(self.output_dir, "frames")
+        rendered = self.simulator.export(frame_dir, fps=10, speed=5.0, workers=2, figsize=(4, 3), dpi=50)
+
+        self.assertEqual(len(self.event_manager), 0)
+        self.assertEqual(sorted(os.listdir(frame_dir)), [f"frame_{i:06d}.png" for i in range(rendered)])
+        with Image.open(os.path.join(frame_dir, "frame_000000.png")) as image:
+            self.assertEqual(image.size, (200, 150))
+
+    def test_gif(self):
+        path = os.path.join(self.output_dir, "replay.gif")
+        rendered = self.simulator.export(path, fps=10, speed=5.0, workers=1, figsize=(4, 3), dpi=50)
+
+        with Image.open(path) as image:
+            self.assertEqual(image.n_frames, rendered)
+
+    def test_gif_closes_its_frames(self):
+        for i in range(5):
+            Image.new("RGB", (8, 8), (50 * i, 0, 0)).save(os.path.join(self.output_dir, FRAME_PATTERN.format(i)))
+        files, open_image = [], Image.open
+        def open_frame(path):
+            image = open_image(path)
+            files.append(image.fp)
+            return image
+        path = os.path.join(self.output_dir, "frames.gif")
+        with mock.patch("simulation.export.Image.open", open_frame):
+            write_gif(self.output_dir, 5, path, fps=10)
+
+        self.assertEqual(len(files), 5)
+        self.assertTrue(all(handle.closed for handle in files))
+        with Image.open(path) as image:
+            self.assertEqual(image.n_frames, 5)
+
+    @unittest.skipUnless(shutil.which("ffmpeg"), "ffmpeg is not installed")
+    def test_mp4(self):
+        path = os.path.join(self.output_dir, "replay.mp4")
+        self.simulator.export(path, fps=10, speed=5.0, workers=2, figsize=(4, 3), dpi=50)
+
+        self.assertGreater(os.path.getsize(path), 0)
+
+if __name__ == "__main__":
+    unittest.main()
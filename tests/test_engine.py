@@ -0,0 +1,81 @@
+import unittest
+from models.event_manager import EventManager
+from models.graph_builder import GraphBuilder
+from models.task_allocator import TaskAllocator
+from simulation.arrivals import TaskArrivalProcess, poisson_task_source
+from simulation.engine import SimulationEngine
+
+class TestSimulationEngine(unittest.TestCase):
+    def setUp(self):
+        self.builder = GraphBuilder()
+        for i in range(4):
+            self.builder.add_user_node(f"user_{i}", gpu_power=2.0, bandwidth=50, latency=10)
+        self.builder.add_enterprise_node("enterprise_0")
+        self.graph = self.builder.get_graph()
+        enterprise = self.graph.nodes["enterprise_0"]["data"]
+        for _ in range(3):
+            enterprise.create_task(complexity=1e11, data_size=20)
+
+        self.event_manager = EventManager()
+        TaskAllocator(self.graph, self.event_manager, verbose=False).allocate_tasks()
+        self.engine = SimulationEngine(self.graph, self.event_manager)
+
+    def test_run_to_completion(self):
+        result = self.engine.run_to_completion()
+
+        self.assertEqual(len(self.event_manager), 0)
+        self.assertEqual(result.completed_tasks, 3)
+        self.assertGreater(result.events_by_type["calculation"], 0)
+        self.assertGreaterEqual(result.final_time, max(result.completion_times))
+
+    def test_scheduled_calculation_finishes_its_subtask(self):
+        builder = GraphBuilder()
+        for i in range(3):
+            builder.add_user_node(f"user_{i}", gpu_power=2.0, bandwidth=50, latency=10)
+        builder.add_enterprise_node("enterprise_0")
+        graph = builder.get_graph()
+        graph.nodes["enterprise_0"]["data"].create_task(complexity=1e11, data_size=20)
+        event_manager = EventManager()
+        TaskAllocator(graph, event_manager, verbose=False).allocate_tasks(d=3)
+        engine = SimulationEngine(graph, event_manager)
+
+        calculations = []
+        def check(event):
+            if event.type == "calculation":
+                user = graph.nodes[event.node]["data"]
+                calculations.append(event)
+                self.assertEqual(user.backlog, 0.0)
+                self.assertIsNone(user.active_task)
+                self.assertFalse(user.queue)
+        engine.add_observer(check)
+        result = engine.run_to_completion()
+
+        # One calculation per subtask, and the run ends with the result's return
+        self.assertEqual(len(calculations), 3)
+        self.assertEqual(result.final_time, max(result.completion_times))
+
+    def test_run_until(self):
+        horizon = self.event_manager.peek()["time"]
+        result = self.engine.run_until(horizon)
+
+        self.assertGreaterEqual(result.processed_events, 1)
+        self.assertGreater(self.event_manager.peek()["time"], horizon)
+
+    def test_streaming_arrivals(self):
+        event_manager = EventManager()
+        allocator = TaskAllocator(self.graph, event_manager, verbose=False)
+        engine = SimulationEngine(self.graph, event_manager)
+        source = poisson_task_source(rate=2.0, seed=3, horizon=20)
+        arrivals = TaskArrivalProcess(self.graph, event_manager, allocator, {"enterprise_0": source})
+        arrivals.attach(engine)
+
+        # Only the next arrival is ever waiting on the timeline
+        self.assertEqual(len(event_manager), 1)
+
+        result = engine.run_to_completion()
+        self.assertGreater(arrivals.arrived_tasks, 10)
+        self.assertEqual(result.events_by_type["task_arrival"], arrivals.arrived_tasks)
+        self.assertEqual(result.completed_tasks, arrivals.arrived_tasks)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+from models.enterprise_node import EnterpriseNode
+
+class TestEnterpriseNode(unittest.TestCase):
+    def setUp(self):
+        self.enterprise = EnterpriseNode("enterprise_1")
+        self.tasks = [self.enterprise.create_task(complexity=1e10, data_size=i) for i in range(4)]
+
+    def test_completion_moves_task_out_of_pending(self):
+        self.enterprise.mark_task_completed(self.tasks[1])
+        self.enterprise.mark_task_completed(self.tasks[1])  # Completing twice is a no-op
+
+        self.assertEqual(self.enterprise.pending_count, 3)
+        self.assertEqual(self.enterprise.completed_count, 1)
+        self.assertNotIn(self.tasks[1], self.enterprise.get_pending_tasks())
+        self.assertEqual([t["data_size"] for t in self.enterprise.task_queue], [0, 1, 2, 3])
+        self.assertIn("Pending Tasks: 3", repr(self.enterprise))
+
+    def test_completed_tasks_stay_in_creation_order(self):
+        for task in (self.tasks[3], self.tasks[0], self.tasks[2]):
+            self.enterprise.mark_task_completed(task)
+        self.assertEqual([t["id"] for t in self.enterprise.completed], [0, 2, 3])
+        self.assertEqual([t["id"] for t in self.enterprise.task_queue], [0, 1, 2, 3])
+
+    def test_archived_tasks_are_not_kept_as_dicts(self):
+        enterprise = EnterpriseNode("enterprise_2", archive_completed=True)
+        tasks = [enterprise.create_task(complexity=1e10, data_size=5) for _ in range(3)]
+        for task in tasks[:2]:
+            enterprise.mark_task_completed(task)
+
+        self.assertEqual(enterprise.completed, [])
+        self.assertEqual(len(enterprise.archive), 2)
+        self.assertEqual(list(enterprise.archive.columns["id"]), [0, 1])
+        self.assertEqual(enterprise.pending_count, 1)
+
+if __name__ == "__main__":
+    unittest.main()
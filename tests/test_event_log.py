@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from models.event_manager import EventManager
+from models.graph_builder import GraphBuilder
+from models.task_allocator import TaskAllocator
+from simulation.engine import SimulationEngine
+from simulation.event_log import EventLog, EventLogWriter
+
+class TestEventLog(unittest.TestCase):
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.output_dir, "trace.npy")
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+    def build_graph(self, with_tasks):
+        builder = GraphBuilder()
+        builder.create_random_graph(20, 2, 0.3, seed=7)
+        graph = builder.get_graph()
+        if with_tasks:
+            for node, data in graph.nodes(data=True):
+                if data["type"] == "enterprise":
+                    for _ in range(10):
+                        data["data"].create_task(complexity=5e10, data_size=15)
+        return graph
+
+    def record_run(self, chunk_size=7, micro_batches=1):
+        graph = self.build_graph(with_tasks=True)
+        event_manager = EventManager()
+        TaskAllocator(graph, event_manager, verbose=False, micro_batches=micro_batches).allocate_batch()
+        engine = SimulationEngine(graph, event_manager)
+        with EventLogWriter(self.path, chunk_size=chunk_size) as writer:
+            engine.add_observer(writer.observe)
+            result = engine.run_to_completion()
+        return result
+
+    def test_round_trip_is_memory_mapped(self):
+        result = self.record_run()
+        log = EventLog.open(self.path)
+
+        self.assertIsInstance(log.records, np.memmap)
+        self.assertEqual(len(log), result.processed_events)
+        self.assertTrue(np.all(np.diff(log.column("time")) >= 0))
+        transmissions = log.column("type") == log.type_code("data_transmission")
+        self.assertEqual(int(transmissions.sum()), result.events_by_type["data_transmission"])
+
+        event = next(e for e in log.events() if e.type == "data_transmission")
+        self.assertEqual(event.edge, (event.from_node, event.to_node))
+        self.assertIsNotNone(event.start)
+
+    def test_replay_without_allocation(self):
+        result = self.record_run()
+        log = EventLog.open(self.path)
+
+        replay = SimulationEngine(self.build_graph(with_tasks=False), log.to_event_manager()).run_to_completion()
+
+        self.assertEqual(replay.processed_events, result.processed_events)
+        self.assertEqual(replay.completion_times, result.completion_times)
+
+    def test_replay_keeps_micro_batches(self):
+        result = self.record_run(micro_batches=3)
+        log = EventLog.open(self.path)
+        partial = (log.column("batch") >= 0) & (log.column("type") == log.type_code("data_transmission"))
+        self.assertEqual(int(partial.sum()), 2 * result.events_by_type["data_transmission"] // 3)
+
+        replay = SimulationEngine(self.build_graph(with_tasks=False), log.to_event_manager()).run_to_completion()
+        self.assertEqual(replay.completed_tasks, 20)
+        self.assertEqual(replay.completion_times, result.completion_times)
+
+    def test_seek(self):
+        self.record_run()
+        log = EventLog.open(self.path)
+        middle = float(log.column("time")[len(log) // 2])
+
+        index = log.seek(middle)
+        remaining = log.to_event_manager(start=index)
+
+        self.assertEqual(log.event(index).time, middle)
+        self.assertEqual(len(remaining), len(log) - index)
+        self.assertEqual(remaining.peek().time, middle)
+
+    def test_empty_trace(self):
+        with EventLogWriter(self.path):
+            pass
+
+        self.assertEqual(len(EventLog.open(self.path)), 0)
+
+if __name__ == "__main__":
+    unittest.main()
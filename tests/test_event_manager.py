@@ -0,0 +1,44 @@
+import unittest
+from models.event_manager import EventManager
+
+class TestEventManager(unittest.TestCase):
+    def setUp(self):
+        self.manager = EventManager()
+
+    def test_events_come_out_in_time_order(self):
+        for t in [5, 1, 3, 2, 4]:
+            self.manager.add_event(t, "calculation", node=f"user_{t}")
+
+        times = []
+        while len(self.manager):
+            times.append(self.manager.get_next_event()["time"])
+        self.assertEqual(times, [1, 2, 3, 4, 5])
+        self.assertIsNone(self.manager.get_next_event())
+
+    def test_equal_timestamps_keep_insertion_order(self):
+        for i in range(5):
+            self.manager.add_event(1.0, "calculation", node=f"user_{i}")
+
+        nodes = [self.manager.get_next_event()["node"] for _ in range(5)]
+        self.assertEqual(nodes, [f"user_{i}" for i in range(5)])
+
+    def test_bulk_load_and_peek(self):
+        self.manager.add_event(2.0, "calculation", node="user_0")
+        self.manager.add_events_bulk(
+            {"time": t, "type": "data_transmission"} for t in [3.0, 0.5, 1.0]
+        )
+
+        self.assertEqual(len(self.manager), 4)
+        self.assertEqual(self.manager.peek()["time"], 0.5)
+        self.assertEqual(len(self.manager), 4)
+
+    def test_pop_until(self):
+        for t in [0.5, 1.0, 1.5, 2.0]:
+            self.manager.add_event(t, "calculation")
+
+        popped = self.manager.pop_until(1.5)
+        self.assertEqual([e["time"] for e in popped], [0.5, 1.0, 1.5])
+        self.assertEqual(len(self.manager), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import random
+import unittest
+from models.flow_network import FlowNetwork
+from models.graph_builder import GraphBuilder
+from models.link_model import LinkModel
+
+class TestFlowNetwork(unittest.TestCase):
+    def setUp(self):
+        builder = GraphBuilder()
+        builder.add_user_node("user_1", gpu_power=2.0, bandwidth=100, latency=10)
+        builder.add_user_node("user_2", gpu_power=2.0, bandwidth=40, latency=10)
+        builder.add_user_node("user_3", gpu_power=2.0, bandwidth=10, latency=10)
+        builder.add_enterprise_node("enterprise_1")
+        builder.add_enterprise_node("enterprise_2")
+        self.graph = builder.get_graph()
+        self.model = LinkModel(self.graph)
+        self.network = FlowNetwork(self.model)
+
+    def test_single_flow_matches_link_model(self):
+        flow = self.network.add_flow("enterprise_1", "user_2", 80, now=1.0)
+        self.network.update(1.0)
+        self.assertEqual(flow.rate, 40.0)
+        self.assertAlmostEqual(flow.finish + flow.latency,
+                               1.0 + self.model.transfer_time("enterprise_1", "user_2", 80))
+
+    def test_flows_into_one_node_share_its_downlink(self):
+        first = self.network.add_flow("enterprise_1", "user_2", 40, now=0.0)
+        second = self.network.add_flow("enterprise_2", "user_2", 20, now=0.0)
+        self.network.update(0.0)
+        self.assertEqual((first.rate, second.rate), (20.0, 20.0))
+
+        # The smaller transfer ends at t=1, then the other gets the whole downlink
+        self.assertEqual(self.network.pop_completed(1.0), [second])
+        self.assertEqual(first.rate, 40.0)
+        self.assertAlmostEqual(first.finish, 1.5)
+
+    def test_max_min_gives_spare_capacity_to_unconstrained_flows(self):
+        self.model.bandwidth[self.model.index["enterprise_1"]] = 60.0
+        network = FlowNetwork(self.model)
+        flows = [network.add_flow("enterprise_1", user, 100, now=0.0) for user in ("user_1", "user_2", "user_3")]
+        network.update(0.0)
+        # user_3 is held back by its own 10 Mbps link; the others split the rest of the uplink
+        self.assertEqual([flow.rate for flow in flows], [25.0, 25.0, 10.0])
+
+    def test_incremental_rates_match_full_solution(self):
+        rng = random.Random(3)
+        nodes = list(self.graph.nodes)
+        self.model.bandwidth[self.model.index["enterprise_1"]] = 50.0
+        network = FlowNetwork(self.model)
+        flows, now = [], 0.0
+        for _ in range(300):
+            now += rng.random() * 0.05
+            network.pop_completed(now)
+            flows = [flow for flow in flows if flow.active]
+            if flows and rng.random() < 0.3:
+                network.remove_flows([flows.pop(rng.randrange(len(flows)))])
+            else:
+                source, destination = rng.sample(nodes, 2)
+                flows.append(network.add_flow(source, destination, rng.uniform(1, 20), now))
+            network.update(now)
+
+            reference = FlowNetwork(self.model)
+            copies = [reference.add_flow(flow.source, flow.destination, 1.0, now) for flow in flows]
+            reference.update(now)
+            for flow, copy in zip(flows, copies):
+                self.assertAlmostEqual(flow.rate, copy.rate, places=6)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -23,6 +23,14 @@ class TestGraphBuilder(unittest.TestCase):
         connected = any(graph.has_edge(u, e) for u in user_nodes for e in enterprise_nodes)
         self.assertTrue(connected)
 
+    def test_create_random_graph_is_seeded(self):
+        edges = []
+        for _ in range(2):
+            builder = GraphBuilder()
+            builder.create_random_graph(num_users=50, num_enterprises=4, connection_probability=0.2, seed=7)
+            edges.append(sorted(builder.get_graph().edges(data="bandwidth")))
+        self.assertEqual(edges[0], edges[1])
+
     def test_add_edge_properties(self):
         # Add nodes and edges manually
         self.builder.add_user_node("user_1", gpu_power=3.0, bandwidth=50, latency=10)
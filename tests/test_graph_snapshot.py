@@ -0,0 +1,61 @@
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from models.event_manager import EventManager
+from models.graph_builder import GraphBuilder
+from models.task_allocator import TaskAllocator
+from simulation.engine import SimulationEngine
+
+class TestGraphSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.builder = GraphBuilder()
+        self.builder.create_random_graph(50, 4, 0.3, seed=11)
+        self.graph = self.builder.get_graph()
+        self.path = tempfile.mkdtemp()
+        self.builder.save(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def assertSameTopology(self, graph):
+        self.assertEqual(list(graph.nodes), list(self.graph.nodes))
+        for node, data in self.graph.nodes(data=True):
+            loaded = graph.nodes[node]
+            self.assertEqual(loaded["type"], data["type"])
+            if data["type"] == "user":
+                self.assertEqual(loaded["data"].node_id, node)
+                self.assertEqual(loaded["data"].gpu_power, data["data"].gpu_power)
+                self.assertEqual(loaded["data"].bandwidth, data["data"].bandwidth)
+                self.assertEqual(loaded["data"].latency, data["data"].latency)
+        self.assertEqual(sorted(graph.edges(data=True)), sorted(self.graph.edges(data=True)))
+
+    def test_round_trip(self):
+        for columnar in (False, True):
+            loaded = GraphBuilder.load(self.path, columnar=columnar)
+            self.assertSameTopology(loaded.get_graph())
+
+    def test_load_is_lazy_and_memory_mapped(self):
+        loaded = GraphBuilder.load(self.path)
+
+        self.assertIsNone(loaded._graph)
+        self.assertIsInstance(loaded.snapshot["indices"], np.memmap)
+        self.assertIsInstance(loaded.store.gpu_power, np.memmap)
+        self.assertEqual(len(loaded.snapshot["indptr"]), self.graph.number_of_nodes() + 1)
+        self.assertEqual(len(loaded.snapshot["indices"]), self.graph.number_of_edges())
+
+    def test_loaded_topology_simulates(self):
+        loaded = GraphBuilder.load(self.path)
+        loaded.add_user_node("user_extra", gpu_power=2.0, bandwidth=50, latency=10)
+        graph = loaded.get_graph()
+        graph.nodes["enterprise_0"]["data"].create_task(complexity=1e11, data_size=20)
+
+        event_manager = EventManager()
+        TaskAllocator(graph, event_manager, verbose=False).allocate_tasks()
+        result = SimulationEngine(graph, event_manager).run_to_completion()
+
+        self.assertEqual(result.completed_tasks, 1)
+        self.assertEqual(graph.nodes["user_extra"]["data"].gpu_power, 0.1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from models.graph_builder import GraphBuilder
+from simulation.layout import compute_layout, fixed_layout, layout_key
+
+class TestLayout(unittest.TestCase):
+    def setUp(self):
+        self.builder = GraphBuilder()
+        self.builder.create_random_graph(200, 4, 0.3, seed=1)
+        self.graph = self.builder.get_graph()
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_layout_is_deterministic_and_seeded(self):
+        _, first = compute_layout(self.graph, seed=3)
+        _, again = compute_layout(self.graph, seed=3)
+        _, other = compute_layout(self.graph, seed=4)
+
+        np.testing.assert_array_equal(first, again)
+        self.assertFalse(np.array_equal(first, other))
+
+    def test_nodes_do_not_overlap(self):
+        for packing in ("hex", "grid"):
+            for cluster in (False, True):
+                _, positions = compute_layout(self.graph, packing=packing, cluster=cluster)
+                self.assertEqual(len(np.unique(positions.round(6), axis=0)), self.graph.number_of_nodes())
+
+    def test_enterprises_form_a_band_above_users(self):
+        nodes, positions = compute_layout(self.graph)
+        is_user = np.array([self.graph.nodes[node]["type"] == "user" for node in nodes])
+
+        self.assertTrue(np.all(positions[~is_user, 1] == 0))
+        self.assertLess(positions[is_user, 1].max(), 0)
+
+    def test_clusters_sit_under_their_enterprise(self):
+        positions = fixed_layout(self.graph, cluster=True, cache_dir=None)
+        for enterprise in ("enterprise_0", "enterprise_3"):
+            members = [
+                user for user in self.graph.nodes
+                if self.graph.nodes[user]["type"] == "user"
+                and next(iter(v for _, v in self.graph.out_edges(user)), None) == enterprise
+            ]
+            xs = [positions[user][0] for user in members]
+            self.assertLessEqual(min(xs), positions[enterprise][0])
+            self.assertGreaterEqual(max(xs), positions[enterprise][0])
+
+    def test_layout_is_cached_on_disk(self):
+        positions = fixed_layout(self.graph, seed=2, cache_dir=self.cache_dir)
+        path = os.path.join(self.cache_dir, f"{layout_key(self.graph, seed=2)}.npy")
+        self.assertTrue(os.path.exists(path))
+
+        # A cached layout is read back rather than recomputed
+        np.save(path, np.zeros((self.graph.number_of_nodes(), 2)))
+        cached = fixed_layout(self.graph, seed=2, cache_dir=self.cache_dir)
+        self.assertEqual(cached["user_0"], (0.0, 0.0))
+        self.assertNotEqual(positions["user_0"], (0.0, 0.0))
+
+if __name__ == "__main__":
+    unittest.main()
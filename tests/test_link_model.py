@@ -0,0 +1,38 @@
+import unittest
+import numpy as np
+from models.graph_builder import GraphBuilder
+from models.link_model import LinkModel
+
+class TestLinkModel(unittest.TestCase):
+    def setUp(self):
+        self.builder = GraphBuilder()
+        self.builder.add_user_node("user_1", gpu_power=2.0, bandwidth=100, latency=10)
+        self.builder.add_user_node("user_2", gpu_power=2.0, bandwidth=40, latency=30)
+        self.builder.add_enterprise_node("enterprise_1")
+        self.builder.add_edge("user_1", "enterprise_1", bandwidth=20, latency=5)
+        self.graph = self.builder.get_graph()
+        self.model = LinkModel(self.graph)
+
+    def test_edge_attributes_override_node_attributes(self):
+        self.assertEqual(self.model.link("user_1", "enterprise_1"), (20.0, 0.005))
+        self.assertEqual(self.model.link("enterprise_1", "user_1"), (20.0, 0.005))
+
+    def test_links_derived_from_nodes(self):
+        # Slower endpoint's bandwidth, latencies add up
+        self.assertEqual(self.model.link("user_1", "user_2"), (40.0, 0.04))
+        self.assertAlmostEqual(self.model.transfer_time("user_2", "enterprise_1", 80), 0.03 + 2.0)
+
+    def test_vectorized_matches_scalar(self):
+        pairs = [("user_1", "enterprise_1"), ("user_1", "user_2"), ("enterprise_1", "user_2")]
+        sources = [self.model.index[a] for a, _ in pairs]
+        destinations = [self.model.index[b] for _, b in pairs]
+        expected = [self.model.transfer_time(a, b, 10) for a, b in pairs]
+        np.testing.assert_allclose(self.model.transfer_times(sources, destinations, 10), expected)
+
+    def test_shared_model_is_cached_on_graph(self):
+        self.assertIs(LinkModel.for_graph(self.graph), LinkModel.for_graph(self.graph))
+        self.builder.add_user_node("user_3", gpu_power=2.0, bandwidth=40, latency=30)
+        self.assertIn("user_3", LinkModel.for_graph(self.graph).index)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
 import unittest
+from models.records import Event, SubTask, Task
 from simulation.metrics import Metrics
+from simulation.trace import TaskTrace
 
 class TestMetrics(unittest.TestCase):
     def setUp(self):
@@ -41,5 +43,25 @@ class TestMetrics(unittest.TestCase):
         self.assertIn("Completed Tasks: 1", output)
         self.assertIn("Total GPU Time: 20.00 seconds", output)
 
+    def test_record_trace(self):
+        trace = TaskTrace()
+        for i, (start, duration) in enumerate([(0.0, 4.0), (5.0, 8.0)]):
+            task = Task(i, complexity=1e11, data_size=10)
+            subtask = SubTask(1e11, 10, duration, task)
+            trace.observe(Event(start + 1, "data_transmission", from_node="enterprise_0", to_node="user_0",
+                                task=subtask, start=start))
+            trace.observe(Event(start + 1 + duration, "calculation", node="user_0", task=subtask, start=start + 1))
+            trace.observe(Event(start + 2 + duration, "data_transmission", from_node="user_0",
+                                to_node="enterprise_0", task=task, start=start + 1 + duration))
+
+        self.metrics.record_trace(trace, users=["user_0", "user_1"])
+
+        self.assertEqual(self.metrics.completed_tasks, 2)
+        self.assertEqual(self.metrics.total_gpu_time, 12)
+        self.assertEqual(self.metrics.total_transmission_time, 4)
+        self.assertEqual(self.metrics.makespan, 15)
+        self.assertEqual(self.metrics.latency_percentiles[50], 8)
+        self.assertEqual(self.metrics.utilisation, {"user_0": 0.8, "user_1": 0.0})
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import numpy as np
+from models.graph_builder import GraphBuilder
+from models.user_node import UserNode
+
+class TestNodeStore(unittest.TestCase):
+    def setUp(self):
+        self.builder = GraphBuilder(columnar=True)
+        self.builder.add_user_node("user_1", gpu_power=2.0, bandwidth=50, latency=10)
+        self.builder.add_user_node("user_2", gpu_power=4.0, bandwidth=80, latency=30)
+        self.builder.add_enterprise_node("enterprise_1")
+        self.graph = self.builder.get_graph()
+        self.store = self.builder.store
+
+    def test_views_match_object_nodes(self):
+        view = self.graph.nodes["user_1"]["data"]
+        plain = UserNode("user_1", gpu_power=2.0, bandwidth=50, latency=10)
+
+        self.assertIsInstance(view, UserNode)
+        self.assertEqual(view.node_id, "user_1")
+        self.assertAlmostEqual(view.gpu_power, plain.gpu_power)
+        self.assertEqual(view.bandwidth, 50)
+        np.testing.assert_allclose(self.store.latency, [10, 30])
+
+    def test_queue_state_is_mirrored_in_columns(self):
+        view = self.graph.nodes["user_2"]["data"]
+        view.add_task({"duration": 2.0}, 0)
+        view.add_task({"duration": 3.0}, 0)
+        self.assertEqual(self.store.queue_length.tolist(), [0, 2])
+        self.assertEqual(self.store.free_at.tolist(), [0.0, 5.0])
+
+        task, completion_time = view.process_next_task(1.0)
+        self.assertEqual(completion_time, 3.0)
+        self.assertEqual(view.get_priority(), 5.0)
+        self.assertTrue(self.store.active[1])
+
+        view.complete_task()
+        self.assertFalse(self.store.active[1])
+        self.assertEqual(view.get_priority(), 3.0)
+        self.assertEqual(self.store.backlog.tolist(), [0.0, 3.0])
+
+    def test_enterprise_counters(self):
+        enterprise = self.graph.nodes["enterprise_1"]["data"]
+        task = enterprise.create_task(complexity=1e10, data_size=10)
+        enterprise.create_task(complexity=1e10, data_size=10)
+        enterprise.mark_task_completed(task)
+
+        self.assertEqual(len(enterprise.get_pending_tasks()), 1)
+        self.assertEqual(self.store.enterprises.column("task_count")[0], 2)
+        self.assertEqual(self.store.enterprises.column("completed_count")[0], 1)
+
+    def test_columns_grow_past_capacity(self):
+        builder = GraphBuilder(columnar=True)
+        for i in range(3000):
+            builder.add_user_node(f"user_{i}", gpu_power=2.0, bandwidth=50, latency=10)
+        self.assertEqual(len(builder.store.gpu_power), 3000)
+        self.assertEqual(builder.graph.nodes["user_2999"]["data"].node_id, "user_2999")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import random
+import unittest
+import numpy as np
+from models.event_manager import EventManager
+from models.graph_builder import GraphBuilder
+from models.task_allocator import TaskAllocator
+from simulation.arrivals import TaskArrivalProcess, poisson_task_source
+from simulation.chain_executor import ChainExecutor
+from simulation.engine import SimulationEngine
+from simulation.online_scheduler import OnlineScheduler
+from simulation.trace import TaskTrace
+
+class TestOnlineScheduler(unittest.TestCase):
+    def setUp(self):
+        builder = GraphBuilder()
+        for i in range(6):
+            builder.add_user_node(f"user_{i}", gpu_power=1.0 + i, bandwidth=50, latency=10)
+        builder.add_enterprise_node("enterprise_0")
+        self.graph = builder.get_graph()
+        self.users = [data["data"] for _, data in self.graph.nodes(data=True) if data["type"] == "user"]
+
+    def start(self, interval=None, strategy="shortest_queue"):
+        random.seed(0)
+        self.event_manager = EventManager()
+        self.engine = SimulationEngine(self.graph, self.event_manager)
+        executor = ChainExecutor(self.graph, self.event_manager, contention=False)
+        executor.attach(self.engine)
+        self.allocator = TaskAllocator(self.graph, self.event_manager, verbose=False, executor=executor,
+                                       strategy=strategy)
+        scheduler = OnlineScheduler(self.graph, self.event_manager, self.allocator, interval=interval)
+        scheduler.attach(self.engine)
+        return scheduler
+
+    def test_wave_waits_for_free_users(self):
+        enterprise = self.graph.nodes["enterprise_0"]["data"]
+        for _ in range(8):
+            enterprise.create_task(complexity=1e11, data_size=20)
+        scheduler = self.start()
+
+        # Six users fit two chains; the other tasks wait for them
+        self.assertEqual(scheduler.submit_pending(), 8)
+        self.assertEqual(len(scheduler.pending), 6)
+        self.assertTrue(all(len(user.queue) == 1 for user in self.users))
+
+        result = self.engine.run_to_completion()
+        self.assertEqual(result.completed_tasks, 8)
+        self.assertFalse(scheduler.pending or scheduler.submitted_at)
+        self.assertEqual(len(scheduler.response_times), 8)
+        self.assertEqual(sorted(scheduler.waiting_times)[:2], [0.0, 0.0])
+        self.assertGreater(max(scheduler.waiting_times), 0.0)
+        self.assertTrue(all(user.backlog == 0.0 and not user.queue for user in self.users))
+
+    def test_periodic_scheduling(self):
+        enterprise = self.graph.nodes["enterprise_0"]["data"]
+        for _ in range(5):
+            enterprise.create_task(complexity=1e11, data_size=20)
+        scheduler = self.start(interval=0.5)
+        scheduler.submit_pending()
+        self.assertEqual(len(scheduler.pending), 5)  # Nothing is dispatched before the first tick
+
+        result = self.engine.run_to_completion()
+        self.assertEqual(result.completed_tasks, 5)
+        self.assertGreater(result.events_by_type["schedule"], 1)
+        self.assertTrue(all(wait > 0 and wait % 0.5 < 1e-9 for wait in scheduler.waiting_times))
+
+    def test_lower_tail_latency_under_sustained_load(self):
+        p99, makespan = {}, {}
+        for online in (False, True):
+            builder = GraphBuilder()
+            builder.create_random_graph(30, 2, 0.3, seed=1)
+            self.graph = builder.get_graph()
+            scheduler = self.start()
+            enterprises = [node for node, data in self.graph.nodes(data=True) if data["type"] == "enterprise"]
+            sources = {enterprise: poisson_task_source(rate=2.0, seed=i + 1, horizon=100)
+                       for i, enterprise in enumerate(enterprises)}
+            arrivals = TaskArrivalProcess(self.graph, self.event_manager, self.allocator, sources,
+                                          scheduler=scheduler if online else None)
+            arrivals.attach(self.engine)
+            trace = TaskTrace()
+            self.engine.add_observer(trace.observe)
+            result = self.engine.run_to_completion()
+            self.assertEqual(result.completed_tasks, arrivals.arrived_tasks)
+            # Allocated on arrival, a task's first transfer starts when it arrives
+            p99[online] = np.percentile(scheduler.response_times if online else trace.latencies(), 99)
+            makespan[online] = result.final_time
+        self.assertLess(p99[True], p99[False])
+        self.assertLess(makespan[True], makespan[False])
+
+    def test_chain_only_uses_available_users(self):
+        builder = GraphBuilder()
+        for i in range(3):
+            builder.add_user_node(f"user_{i}", gpu_power=1.0, bandwidth=50, latency=10)
+        builder.add_user_node("fast", gpu_power=50.0, bandwidth=50, latency=10)
+        builder.add_enterprise_node("enterprise_0")
+        self.graph = builder.get_graph()
+        self.graph.nodes["enterprise_0"]["data"].create_task(complexity=1e11, data_size=20)
+        fast = self.graph.nodes["fast"]["data"]
+        scheduler = self.start(strategy="earliest_finish")
+        fast.add_task({"duration": 0.1}, 0)  # Queued work, though it would still finish first
+
+        self.assertEqual(scheduler.submit_pending(), 1)
+        self.assertFalse(scheduler.pending)
+        self.assertEqual(len(fast.queue), 1)
+        self.assertTrue(all(len(self.graph.nodes[f"user_{i}"]["data"].queue) == 1 for i in range(3)))
+
+    def test_failed_allocation_keeps_the_task_pending(self):
+        self.graph.nodes["enterprise_0"]["data"].create_task(complexity=1e11, data_size=20)
+        scheduler = self.start()
+        self.allocator.allocate_task = lambda *args, **kwargs: False
+        scheduler.submit_pending()
+        self.assertEqual(len(scheduler.pending), 1)
+        self.assertEqual(len(scheduler.waiting_times), 0)
+        self.assertEqual(len(scheduler.submitted_at), 1)
+
+    def test_needs_an_executor(self):
+        allocator = TaskAllocator(self.graph, EventManager(), verbose=False)
+        with self.assertRaises(ValueError):
+            OnlineScheduler(self.graph, allocator.event_manager, allocator)
+
+if __name__ == "__main__":
+    unittest.main()
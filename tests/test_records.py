@@ -0,0 +1,45 @@
+import unittest
+from models.event_manager import EventManager
+from models.records import Event, Task
+
+class TestRecords(unittest.TestCase):
+    def test_event_behaves_like_a_dict(self):
+        event = Event(1.5, "calculation", node="user_1", complexity=1e10)
+
+        self.assertEqual(event["time"], 1.5)
+        self.assertIn("node", event)
+        self.assertNotIn("edge", event)
+        self.assertIsNone(event.get("edge"))
+        self.assertEqual(event.get("edge", "None"), "None")
+        self.assertEqual(event["complexity"], 1e10)
+        with self.assertRaises(KeyError):
+            event["from_node"]
+        self.assertEqual(event.to_dict(), {"time": 1.5, "type": "calculation", "node": "user_1", "complexity": 1e10})
+
+    def test_task_fields_are_assignable(self):
+        task = Task(0, complexity=1e10, data_size=5)
+        self.assertFalse(task["completed"])
+        task["completed"] = True
+        self.assertTrue(task.completed)
+        with self.assertRaises(KeyError):
+            task["unknown"] = 1
+
+    def test_records_are_compared_by_identity(self):
+        task, twin = Task(0, complexity=1e10, data_size=5), Task(0, complexity=1e10, data_size=5)
+        self.assertNotEqual(task, twin)
+        self.assertEqual(task.to_dict(), twin.to_dict())
+        self.assertEqual(len({task, twin}), 2)
+        task.completed = True  # Mutating a record keeps it findable in sets and dicts
+        self.assertIn(task, {task: None})
+
+    def test_event_manager_stores_records(self):
+        manager = EventManager()
+        manager.add_event(2.0, "data_transmission", from_node="a", to_node="b")
+        manager.add_events_bulk([{"time": 1.0, "type": "calculation", "node": "b"}])
+
+        first = manager.get_next_event()
+        self.assertIsInstance(first, Event)
+        self.assertEqual(first["node"], "b")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+from models.graph_builder import GraphBuilder
+from simulation.renderer import EDGE_FOLD_SIZE, GraphRenderer
+
+class TestGraphRenderer(unittest.TestCase):
+    def setUp(self):
+        self.builder = GraphBuilder()
+        self.builder.add_user_node("user_1", gpu_power=2.0, bandwidth=50, latency=10)
+        self.builder.add_user_node("user_2", gpu_power=2.0, bandwidth=50, latency=10)
+        self.builder.add_enterprise_node("enterprise_1")
+        self.builder.add_edge("user_1", "enterprise_1", bandwidth=50, latency=10)
+        self.graph = self.builder.get_graph()
+        positions = {"user_1": (0, 0), "user_2": (1, 0), "enterprise_1": (0, 5)}
+        self.fig, ax = plt.subplots()
+        self.renderer = GraphRenderer(self.graph, positions, ax)
+        self.renderer.draw_static()
+
+    def tearDown(self):
+        plt.close(self.fig)
+
+    def test_static_layout_is_captured_once(self):
+        self.assertIsNotNone(self.renderer.background)
+        self.assertEqual(len(self.renderer.edge_collection.get_segments()), 1)
+
+    def test_update_only_touches_event_elements(self):
+        self.graph.add_edge("user_1", "user_2")
+        self.renderer.update([
+            {"time": 1.0, "type": "data_transmission", "edge": ("user_1", "user_2")},
+            {"time": 2.0, "type": "calculation", "node": "user_2", "edge": ("user_1", "user_2")},
+        ])
+
+        self.assertEqual(self.renderer.active_node_collection.get_offsets().tolist(), [[1.0, 0.0]])
+        # The same edge touched twice is highlighted once
+        self.assertEqual(len(self.renderer.active_edge_collection.get_segments()), 1)
+        self.assertEqual(len(self.renderer.new_edge_collection.get_segments()), 1)
+        self.assertIn("Simulation Time: 2.00 seconds", self.renderer.status_text.get_text())
+
+    def test_draw_callback_is_connected_once(self):
+        self.renderer.draw_static()
+        self.renderer.draw_static()
+        self.assertEqual(len(self.fig.canvas.callbacks.callbacks["draw_event"]), 1)
+
+    def test_new_edges_are_folded_into_the_background(self):
+        positions = dict(self.renderer.positions)
+        for i in range(EDGE_FOLD_SIZE):
+            self.builder.add_user_node(f"extra_{i}", gpu_power=2.0, bandwidth=50, latency=10)
+            positions[f"extra_{i}"] = (i / EDGE_FOLD_SIZE, 2.0)
+        self.renderer = GraphRenderer(self.graph, positions, self.renderer.ax)
+        self.renderer.draw_static()
+
+        for i in range(EDGE_FOLD_SIZE):
+            edge = ("enterprise_1", f"extra_{i}")
+            self.graph.add_edge(*edge)
+            self.renderer.update([{"time": float(i), "type": "data_transmission", "edge": edge}])
+        self.assertEqual(len(self.renderer.new_edge_collection.get_segments()), 0)
+        self.assertEqual(len(self.renderer.edge_collection.get_segments()), 1 + EDGE_FOLD_SIZE)
+
+        # The folded edges are part of the background now, with the overlays empty
+        self.renderer.update([])
+        height = self.fig.canvas.get_width_height()[1]
+        x, y = self.renderer.ax.transData.transform((0.25, 3.5))  # Midpoint of the edge to extra_32
+        pixels = np.asarray(self.fig.canvas.buffer_rgba())
+        row, column = int(round(height - y)), int(round(x))
+        self.assertLess(pixels[row - 1:row + 2, column - 1:column + 2, :3].min(), 200)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+from simulation.scenario_runner import build_jobs, expand_grid, aggregate, run_jobs
+
+class TestScenarioRunner(unittest.TestCase):
+    def setUp(self):
+        self.scenario = {
+            "name": "Sweep",
+            "num_users": [8, 12],
+            "num_enterprises": 2,
+            "tasks_per_enterprise": 3,
+            "task_complexity": 1,
+            "data_size_range": [5, 10],
+            "connection_probability": 0.5,
+            "chain_length": 3,
+            "gpu_power_range": [1.5, 3.0],
+            "bandwidth_range": [10, 100],
+            "latency_range": [10, 50],
+        }
+
+    def test_expand_grid_skips_ranges(self):
+        points = expand_grid(self.scenario)
+        self.assertEqual([p["num_users"] for p in points], [8, 12])
+        self.assertEqual(points[0]["bandwidth_range"], [10, 100])
+
+    def test_replicates_share_seeds_across_grid_points(self):
+        jobs = build_jobs([self.scenario], replicates=3, seed=1)
+        self.assertEqual(len(jobs), 6)
+        self.assertEqual([j["seed"] for j in jobs[:3]], [j["seed"] for j in jobs[3:]])
+
+    def test_runs_are_reproducible_and_aggregated(self):
+        jobs = build_jobs([self.scenario], replicates=2, seed=1)
+        first = run_jobs(jobs, workers=1)
+        second = run_jobs(jobs, workers=1)
+        self.assertEqual([r["makespan"] for r in first], [r["makespan"] for r in second])
+
+        summary = aggregate(first)
+        self.assertEqual(len(summary), 2)
+        self.assertEqual(summary[0]["completed_tasks_mean"], 6)
+
+    def test_contention_never_beats_dedicated_links(self):
+        jobs = build_jobs([dict(self.scenario, num_users=8, live_execution=True)], replicates=1, seed=1)
+        dedicated = run_jobs(jobs, workers=1)[0]
+        contended = run_jobs([dict(jobs[0], contention=True)], workers=1)[0]
+        self.assertEqual(contended["completed_tasks"], 6)
+        self.assertGreaterEqual(contended["makespan"], dedicated["makespan"])
+
+    def test_contention_and_stealing_need_live_execution(self):
+        for option in ("contention", "work_stealing"):
+            jobs = build_jobs([dict(self.scenario, num_users=8, **{option: True})], replicates=1, seed=1)
+            with self.assertRaises(ValueError):
+                run_jobs(jobs, workers=1)
+
+    def test_online_dispatch_completes_every_task(self):
+        jobs = build_jobs([dict(self.scenario, num_users=8, online=True)], replicates=1, seed=1)
+        result = run_jobs(jobs, workers=1)[0]
+        self.assertEqual(result["completed_tasks"], 6)
+        self.assertGreaterEqual(result["p99_latency"], result["p50_latency"])
+
+    def test_work_stealing_is_reported(self):
+        # Every hop ships the task's fixed data size, so each steal moves 10 MB
+        scenario = dict(self.scenario, num_users=12, tasks_per_enterprise=20, task_complexity=10,
+                        data_size_range=[10, 10], live_execution=True)
+        jobs = build_jobs([scenario], replicates=1, seed=1)
+        result = run_jobs([dict(jobs[0], work_stealing=True)], workers=1)[0]
+        self.assertEqual(result["completed_tasks"], 40)
+        self.assertGreater(result["steals"], 0)
+        self.assertAlmostEqual(result["stolen_mb"], 10 * result["steals"])
+        self.assertIn("steals_mean", aggregate([result])[0])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from models.event_manager import EventManager
+from models.graph_builder import GraphBuilder
+from models.task_allocator import TaskAllocator
+from simulation.engine import SimulationEngine
+from simulation.metrics import LogHistogram, StreamingMetrics
+from simulation.trace import TaskTrace
+
+class TestLogHistogram(unittest.TestCase):
+    def test_quantiles_within_relative_error(self):
+        values = np.random.default_rng(0).lognormal(mean=2.0, sigma=1.5, size=100_000)
+        histogram = LogHistogram(relative_error=0.01)
+        histogram.record_many(values)
+
+        for q in (0.5, 0.95, 0.99):
+            self.assertAlmostEqual(histogram.quantile(q) / np.quantile(values, q), 1.0, delta=0.011)
+        self.assertAlmostEqual(histogram.mean, values.mean())
+
+    def test_record_matches_record_many(self):
+        values = [0.0, 0.0005, 1.0, 2.5, 1e9]
+        one_by_one, bulk = LogHistogram(), LogHistogram()
+        for value in values:
+            one_by_one.record(value)
+        bulk.record_many(values)
+
+        np.testing.assert_array_equal(one_by_one.counts, bulk.counts)
+        self.assertEqual(bulk.quantile(1.0), 1e9)
+        self.assertEqual(bulk.quantile(0.0), 0.0)
+
+class TestStreamingMetrics(unittest.TestCase):
+    def setUp(self):
+        self.builder = GraphBuilder()
+        self.builder.create_random_graph(30, 3, 0.2, seed=4)
+        self.graph = self.builder.get_graph()
+        for node, data in self.graph.nodes(data=True):
+            if data["type"] == "enterprise":
+                for _ in range(20):
+                    data["data"].create_task(complexity=5e10, data_size=10)
+        self.event_manager = EventManager()
+        TaskAllocator(self.graph, self.event_manager, verbose=False, strategy="earliest_finish").allocate_tasks()
+        self.engine = SimulationEngine(self.graph, self.event_manager)
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+    def test_matches_trace(self):
+        metrics = StreamingMetrics(window=1e9)
+        trace = TaskTrace()
+        self.engine.add_observer(metrics.observe)
+        self.engine.add_observer(trace.observe)
+        self.engine.run_to_completion()
+
+        latencies = trace.latencies()
+        self.assertEqual(metrics.completed_tasks, 60)
+        self.assertEqual(metrics.in_flight, 0)
+        self.assertAlmostEqual(metrics.latency.quantile(0.5) / np.quantile(latencies, 0.5), 1.0, delta=0.02)
+        self.assertAlmostEqual(metrics.throughput(), 60 / 1e9)
+        busy = trace.busy_time()
+        for node, utilisation in metrics.utilisation().items():
+            self.assertAlmostEqual(utilisation * (metrics.current_time - metrics.start_time),
+                                   busy[trace.node_index[node]])
+
+    def test_periodic_snapshots(self):
+        json_path = os.path.join(self.output_dir, "metrics.jsonl")
+        csv_path = os.path.join(self.output_dir, "metrics.csv")
+        json_metrics = StreamingMetrics(snapshot_path=json_path, snapshot_interval=0.5)
+        csv_metrics = StreamingMetrics(snapshot_path=csv_path, snapshot_interval=0.5)
+        self.engine.add_observer(json_metrics.observe)
+        self.engine.add_observer(csv_metrics.observe)
+        self.engine.run_to_completion()
+
+        with open(json_path) as f:
+            snapshots = [json.loads(line) for line in f]
+        with open(csv_path) as f:
+            rows = list(csv.DictReader(f))
+        self.assertGreater(len(snapshots), 1)
+        self.assertEqual(len(rows), len(snapshots))
+        times = [snapshot["time"] for snapshot in snapshots]
+        self.assertEqual(times, sorted(times))
+        self.assertIn("utilisation", snapshots[-1])
+        self.assertNotIn("utilisation", rows[-1])
+        self.assertIn("p99_latency", rows[-1])
+
+if __name__ == "__main__":
+    unittest.main()
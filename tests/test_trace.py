@@ -0,0 +1,120 @@
+import unittest
+import numpy as np
+from models.event_manager import EventManager
+from models.graph_builder import GraphBuilder
+from models.task_allocator import TaskAllocator
+from simulation.engine import SimulationEngine
+from simulation.metrics import Metrics, calculate_metrics
+from simulation.trace import COMPUTE, TRANSMIT, TaskTrace
+
+class TestTaskTrace(unittest.TestCase):
+    def setUp(self):
+        self.builder = GraphBuilder()
+        for i in range(6):
+            self.builder.add_user_node(f"user_{i}", gpu_power=2.0, bandwidth=50, latency=10)
+        self.builder.add_enterprise_node("enterprise_0")
+        self.graph = self.builder.get_graph()
+        self.enterprise = self.graph.nodes["enterprise_0"]["data"]
+        self.tasks = [self.enterprise.create_task(complexity=1e11, data_size=20) for _ in range(4)]
+        self.event_manager = EventManager()
+        self.allocator = TaskAllocator(self.graph, self.event_manager, verbose=False)
+
+    def run_traced(self):
+        engine = SimulationEngine(self.graph, self.event_manager)
+        trace = TaskTrace()
+        engine.add_observer(trace.observe)
+        engine.run_to_completion()
+        return trace
+
+    def test_every_hop_is_recorded(self):
+        self.allocator.allocate_tasks(d=3)
+        trace = self.run_traced()
+
+        activities = trace.activity_columns()
+        self.assertEqual(len(trace), 4)
+        for row in range(4):
+            mine = activities["task"] == row
+            self.assertEqual(activities["hop"][mine & (activities["kind"] == TRANSMIT)].tolist(), [0, 1, 2, 3])
+            self.assertEqual(activities["hop"][mine & (activities["kind"] == COMPUTE)].tolist(), [0, 1, 2])
+            # Each activity starts after the previous one ended
+            self.assertTrue(np.all(activities["start"][mine][1:] >= activities["end"][mine][:-1] - 1e-9))
+        self.assertTrue(np.all(trace.latencies() > 0))
+
+    def test_tasks_get_gpu_and_transmission_time(self):
+        self.allocator.allocate_tasks(d=3)
+        self.run_traced()
+
+        user_power = self.graph.nodes["user_0"]["data"].gpu_power * 1e12
+        for task in self.tasks:
+            self.assertAlmostEqual(task["gpu_time"], 1e11 / user_power)
+            self.assertGreater(task["transmission_time"], 0)
+
+        metrics = Metrics()
+        calculate_metrics(self.graph, metrics)
+        self.assertEqual(metrics.completed_tasks, 4)
+        self.assertGreater(metrics.total_gpu_time, 0)
+
+    def test_archived_tasks_count_in_metrics(self):
+        totals = []
+        for archive_completed in (False, True):
+            builder = GraphBuilder(archive_completed=archive_completed)
+            for i in range(6):
+                builder.add_user_node(f"user_{i}", gpu_power=2.0, bandwidth=50, latency=10)
+            builder.add_enterprise_node("enterprise_0")
+            self.graph = builder.get_graph()
+            enterprise = self.graph.nodes["enterprise_0"]["data"]
+            for _ in range(4):
+                enterprise.create_task(complexity=1e11, data_size=20)
+            self.event_manager = EventManager()
+            TaskAllocator(self.graph, self.event_manager, verbose=False).allocate_tasks(d=3)
+            enterprise.create_task(complexity=1e11, data_size=20)  # Left pending
+            self.run_traced()
+
+            metrics = Metrics()
+            calculate_metrics(self.graph, metrics)
+            totals.append((metrics.total_tasks, metrics.completed_tasks, metrics.total_gpu_time,
+                           metrics.total_transmission_time))
+        self.assertEqual(totals[1][:2], (5, 4))
+        self.assertGreater(totals[1][3], 0)
+        np.testing.assert_allclose(totals[1], totals[0])
+
+    def test_returned_tasks_are_released(self):
+        self.allocator.allocate_tasks(d=3)
+        trace = self.run_traced()
+        self.assertEqual(len(trace), 4)
+        self.assertEqual(trace._task_rows, {})
+
+    def test_overlapping_computations_count_once_in_utilisation(self):
+        for _ in range(8):
+            self.enterprise.create_task(complexity=1e12, data_size=20)
+        self.allocator.allocate_tasks(d=6)  # Every chain runs through every user
+        trace = self.run_traced()
+
+        activities = trace.activity_columns()
+        occupied = trace.occupied_time()
+        busy = trace.busy_time()
+        for node in range(len(trace.node_ids)):
+            mine = (activities["node"] == node) & (activities["kind"] == COMPUTE)
+            covered, end = 0.0, -np.inf
+            for start, stop in sorted(zip(activities["start"][mine], activities["end"][mine])):
+                covered += max(0.0, stop - max(start, end))
+                end = max(end, stop)
+            self.assertAlmostEqual(occupied[node], covered)
+        self.assertGreater(busy.sum(), occupied.sum())  # The static schedule overlaps subtasks
+
+        metrics = Metrics()
+        metrics.record_trace(trace)
+        self.assertTrue(all(0 < utilisation <= 1 for utilisation in metrics.utilisation.values()))
+
+    def test_batch_allocation_is_traced_like_sequential(self):
+        self.allocator.allocate_tasks(d=3)
+        sequential = self.run_traced().latencies()
+
+        self.setUp()
+        self.allocator.allocate_batch(d=3)
+        batch = self.run_traced().latencies()
+
+        np.testing.assert_allclose(np.sort(batch), np.sort(sequential))
+
+if __name__ == "__main__":
+    unittest.main()
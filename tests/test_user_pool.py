@@ -0,0 +1,95 @@
+import unittest
+from models.user_node import UserNode
+from models.user_pool import UserPool
+
+class TestUserPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = UserPool()
+        self.users = [UserNode(f"user_{i}", gpu_power=2.0, bandwidth=50, latency=10) for i in range(5)]
+        for user in self.users:
+            self.pool.add(user)
+
+    def test_smallest_follows_load_changes(self):
+        self.users[0].add_task({"duration": 1.0}, 0)
+        self.users[1].add_task({"duration": 1.0}, 0)
+        self.users[1].add_task({"duration": 1.0}, 0)
+
+        chosen = [user.node_id for user in self.pool.smallest(3)]
+        self.assertEqual(chosen, ["user_2", "user_3", "user_4"])
+
+        # Draining user_1 makes it a candidate again
+        self.users[1].queue.clear()
+        self.users[1].complete_task()
+        self.assertIn("user_1", [user.node_id for user in self.pool.smallest(4)])
+
+    def test_load_is_queued_work_not_queue_length(self):
+        self.users[0].add_task({"duration": 600.0}, 0)
+        self.users[1].add_task({"duration": 1.0}, 0)
+        self.users[1].add_task({"duration": 1.0}, 5.0)
+        self.assertEqual(self.users[1].free_at, 6.0)
+
+        chosen = [user.node_id for user in self.pool.smallest(4)]
+        self.assertEqual(chosen, ["user_2", "user_3", "user_4", "user_1"])
+
+        self.users[0].process_next_task(0)
+        self.assertEqual(self.users[0].get_priority(), 600.0)
+        self.users[0].complete_task()
+        self.assertEqual(self.users[0].get_priority(), 0.0)
+
+    def test_remove_task(self):
+        first, second = {"duration": 2.0}, {"duration": 3.0}
+        self.users[0].add_task(first, 0)
+        self.users[0].add_task(second, 0)
+        self.users[0].remove_task(first)
+        self.assertEqual(self.users[0].get_priority(), 3.0)
+        self.assertEqual(self.users[0].free_at, 3.0)
+        self.assertEqual([task for task, _ in self.users[0].queue], [second])
+        with self.assertRaises(ValueError):
+            self.users[0].remove_task(first)
+
+        for user in self.users[1:]:
+            user.add_task({"duration": 1.0}, 0)
+        self.users[0].remove_task(second)
+        self.assertEqual(self.users[0].get_priority(), 0.0)
+        self.assertEqual([user.node_id for user in self.pool.smallest(1)], ["user_0"])
+
+    def test_finish_task_out_of_order(self):
+        first, second = {"duration": 2.0}, {"duration": 3.0}
+        self.users[0].add_task(first, 0)
+        self.users[0].add_task(second, 0)
+        self.users[0].finish_task(second)  # Static schedules may overlap subtasks
+        self.assertEqual(self.users[0].get_priority(), 2.0)
+        self.assertEqual(self.users[0].free_at, 5.0)
+        self.users[0].finish_task(first)
+        self.assertEqual(self.users[0].get_priority(), 0.0)
+        with self.assertRaises(ValueError):
+            self.users[0].finish_task(first)
+
+    def test_smallest_does_not_remove_users(self):
+        self.assertEqual(len(self.pool.smallest(10)), 5)
+        self.assertEqual(len(self.pool.smallest(10)), 5)
+
+    def test_users_shared_between_pools(self):
+        second = UserPool()
+        for user in self.users:
+            second.add(user)
+        self.pool.add(self.users[0])  # Re-adding does not register the pool twice
+        self.assertEqual(self.users[0].pools, [self.pool, second])
+
+        self.users[0].add_task({"duration": 1.0}, 0)
+        self.assertNotIn("user_0", [user.node_id for user in self.pool.smallest(4)])
+        self.assertNotIn("user_0", [user.node_id for user in second.smallest(4)])
+
+        second.remove(self.users[1])
+        self.assertEqual(self.users[1].pools, [self.pool])
+        self.users[1].add_task({"duration": 2.0}, 0)
+        self.assertEqual([user.node_id for user in self.pool.smallest(5)][-2:], ["user_0", "user_1"])
+
+    def test_compaction_keeps_one_entry_per_user(self):
+        for _ in range(100):
+            self.users[0].add_task({"duration": 1.0}, 0)
+        self.assertLessEqual(len(self.pool._heap), 2 * len(self.pool) + 64)
+        self.assertEqual(len(self.pool), 5)
+
+if __name__ == "__main__":
+    unittest.main()